@@ -0,0 +1,151 @@
+#   Copyright 2025 Akshat Deepak Joshi
+
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+
+#       http://www.apache.org/licenses/LICENSE-2.0
+
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+"""
+Event loop latency benchmark for the knowledge base data routes.
+
+Simulates the ``/api/customer-engagement/{user_id}`` handler under a mixed
+load of one large tenant and many small tenants, once calling the
+synchronous KnowledgeBaseService directly inside the coroutine (the old
+route behaviour) and once through AsyncKnowledgeBaseService. Reports
+p50/p99 latency for small-tenant requests, which are the ones stalled when
+the event loop is blocked parsing the large tenant's file.
+
+Usage:
+    python benchmarks/async_route_latency.py [--large-interactions 50000]
+"""
+
+import argparse
+import asyncio
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, List
+
+# Add the project root to the Python path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from smallbizpal.shared.services.async_knowledge_base import (  # noqa: E402
+    AsyncKnowledgeBaseService,
+)
+from smallbizpal.shared.services.knowledge_base import (  # noqa: E402
+    KnowledgeBaseService,
+)
+
+
+def populate(kb: KnowledgeBaseService, large_interactions: int, small_tenants: int):
+    """Create one large tenant and several small tenants."""
+    data = kb._load_data("large")
+    data["customer_interactions"] = [
+        {
+            "type": "inquiry",
+            "question": f"Question number {i} about opening hours and pricing",
+            "timestamp": "2025-06-01T10:00:00",
+        }
+        for i in range(large_interactions)
+    ]
+    kb._save_data("large", data)
+    for i in range(small_tenants):
+        kb.store_customer_interaction(f"small{i}", {"type": "inquiry"})
+
+
+async def run_load(
+    handler: Callable[[str], Awaitable[None]],
+    small_tenants: int,
+    requests: int,
+    interval: float,
+) -> List[float]:
+    """Issue interleaved large/small requests; return small-tenant latencies."""
+    latencies: List[float] = []
+
+    async def timed(user_id: str, arrived: float) -> None:
+        await handler(user_id)
+        if user_id != "large":
+            latencies.append((time.perf_counter() - arrived) * 1000)
+
+    # Requests arrive on a fixed schedule; latency is measured from arrival,
+    # so time spent waiting for a blocked event loop is included.
+    tasks = []
+    started = time.perf_counter()
+    for i in range(requests):
+        arrival = started + i * interval
+        delay = arrival - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        user_id = "large" if i % 10 == 0 else f"small{i % small_tenants}"
+        tasks.append(asyncio.create_task(timed(user_id, arrival)))
+    await asyncio.gather(*tasks)
+    return latencies
+
+
+def summarize(latencies: List[float]) -> Dict[str, float]:
+    """Compute p50/p99/max in milliseconds."""
+    ordered = sorted(latencies)
+    p99_index = min(len(ordered) - 1, int(len(ordered) * 0.99))
+    return {
+        "p50": statistics.median(ordered),
+        "p99": ordered[p99_index],
+        "max": ordered[-1],
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--large-interactions", type=int, default=50000)
+    parser.add_argument("--small-tenants", type=int, default=20)
+    parser.add_argument("--requests", type=int, default=300)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument(
+        "--interval-ms", type=float, default=10.0, help="Time between requests"
+    )
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        kb = KnowledgeBaseService(temp_dir)
+        populate(kb, args.large_interactions, args.small_tenants)
+        akb = AsyncKnowledgeBaseService(kb, max_concurrency=args.concurrency)
+
+        async def blocking_handler(user_id: str) -> None:
+            kb.get_customer_interactions(user_id)
+            kb.get_performance_data(user_id)
+
+        async def async_handler(user_id: str) -> None:
+            await akb.aget_customer_interactions(user_id)
+            await akb.aget_performance_data(user_id)
+
+        print(
+            f"Large tenant: {args.large_interactions} interactions, "
+            f"{args.small_tenants} small tenants, {args.requests} requests"
+        )
+        for name, handler in [
+            ("sync in event loop", blocking_handler),
+            ("async facade", async_handler),
+        ]:
+            latencies = asyncio.run(
+                run_load(
+                    handler, args.small_tenants, args.requests, args.interval_ms / 1000
+                )
+            )
+            stats = summarize(latencies)
+            print(
+                f"{name:>20}: small-tenant p50={stats['p50']:.1f}ms "
+                f"p99={stats['p99']:.1f}ms max={stats['max']:.1f}ms"
+            )
+        akb.shutdown()
+
+
+if __name__ == "__main__":
+    main()
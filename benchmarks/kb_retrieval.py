@@ -0,0 +1,166 @@
+#   Copyright 2025 Akshat Deepak Joshi
+
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+
+#       http://www.apache.org/licenses/LICENSE-2.0
+
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+"""
+Recall and latency benchmark for kb_proxy retrieval.
+
+Builds a business profile of realistic fields padded with filler fields and
+marketing assets, then asks paraphrased customer questions whose answer is a
+known field. Compares the old ``search_private_kb`` behaviour (returning the
+whole profile as JSON) with BM25, dense-vector and hybrid retrieval, reporting
+recall@k, p50/p99 latency and the characters handed to the model per query.
+
+Usage:
+    python benchmarks/kb_retrieval.py [--filler-fields 200] [--assets 500]
+"""
+
+import argparse
+import json
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Tuple
+
+# Add the project root to the Python path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from smallbizpal.shared.services.knowledge_base import (  # noqa: E402
+    KnowledgeBaseService,
+)
+from smallbizpal.shared.services.retrieval import (  # noqa: E402
+    HybridRetriever,
+    KnowledgeRetriever,
+    VectorRetriever,
+)
+
+PROFILE = {
+    "business_name": "Blue Door Coffee",
+    "delivery": "We offer delivery within 5 km on Saturday and Sunday",
+    "opening_hours": "Weekdays 7am-6pm, weekends 9am-3pm",
+    "parking": "Free street parking on Elm Street",
+    "payment_methods": "Cash, credit cards and Apple Pay accepted",
+    "pets_policy": "Dogs are welcome on the patio",
+    "wifi": "Free wifi for customers",
+    "catering": "Catering for offices and events with 48 hours notice",
+    "allergens": "Gluten-free and vegan pastries baked daily",
+    "location": "12 Harbour Road, next to the ferry terminal",
+}
+
+# Paraphrased questions and the field that answers them
+QUERIES: List[Tuple[str, str]] = [
+    ("do you deliver on weekends?", "delivery"),
+    ("can I pay by card", "payment_methods"),
+    ("where can I park my car", "parking"),
+    ("when are you open on weekdays", "opening_hours"),
+    ("can I bring my dog", "pets_policy"),
+    ("is there wireless internet", "wifi"),
+    ("do you cater for office events", "catering"),
+    ("anything gluten free or vegan", "allergens"),
+    ("what is your address near the ferry", "location"),
+    ("do you have deliveries", "delivery"),
+]
+
+
+def populate(kb: KnowledgeBaseService, filler_fields: int, assets: int) -> None:
+    """Store the profile, filler fields and marketing assets for one user."""
+    profile = dict(PROFILE)
+    for i in range(filler_fields):
+        profile[f"note_{i}"] = f"Internal note {i} about supplier invoice {i * 7}"
+    kb.update_business_profile("bench", profile)
+    with kb.transaction("bench") as tx:
+        for i in range(assets):
+            tx.store_marketing_asset(
+                {
+                    "platform": "instagram",
+                    "content_type": "social_post",
+                    "content": f"Post {i}: try seasonal drink number {i} today",
+                }
+            )
+
+
+def run(search: Callable[[str], List[str]]) -> Dict[str, float]:
+    """Run every query; compute recall@k, latency and returned characters."""
+    latencies = []
+    found = 0
+    chars = []
+    for query, field in QUERIES:
+        started = time.perf_counter()
+        texts = search(query)
+        latencies.append((time.perf_counter() - started) * 1000)
+        found += any(
+            text.startswith(f"{field}:") or f'"{field}":' in text for text in texts
+        )
+        chars.append(sum(len(text) for text in texts))
+    ordered = sorted(latencies)
+    return {
+        "recall": found / len(QUERIES),
+        "p50": statistics.median(ordered),
+        "p99": ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))],
+        "chars": statistics.mean(chars),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--filler-fields", type=int, default=200)
+    parser.add_argument("--assets", type=int, default=500)
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--max-chars", type=int, default=2000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        kb = KnowledgeBaseService(temp_dir)
+        populate(kb, args.filler_fields, args.assets)
+        bm25 = KnowledgeRetriever(kb)
+        vector = VectorRetriever(kb)
+        hybrid = HybridRetriever([bm25, vector])
+
+        def return_everything(query: str) -> List[str]:
+            profile = kb.get_business_profile("bench")
+            return [json.dumps(profile.get_all_data(), indent=2)]
+
+        def retrieve(retriever) -> Callable[[str], List[str]]:
+            return lambda query: [
+                snippet["text"]
+                for snippet in retriever.search(
+                    "bench", query, top_k=args.top_k, max_chars=args.max_chars
+                )
+            ]
+
+        # Build the indexes outside the timed runs
+        started = time.perf_counter()
+        bm25.search("bench", "warm up")
+        vector.search("bench", "warm up")
+        print(
+            f"{args.filler_fields + len(PROFILE)} fields, {args.assets} assets; "
+            f"index build {(time.perf_counter() - started) * 1000:.0f}ms"
+        )
+        for name, search in [
+            ("return everything", return_everything),
+            ("bm25", retrieve(bm25)),
+            ("vector", retrieve(vector)),
+            ("hybrid", retrieve(hybrid)),
+        ]:
+            stats = run(search)
+            print(
+                f"{name:>18}: recall@{args.top_k}={stats['recall']:.2f} "
+                f"p50={stats['p50']:.2f}ms p99={stats['p99']:.2f}ms "
+                f"chars={stats['chars']:.0f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -12,10 +12,19 @@
 #   See the License for the specific language governing permissions and
 #   limitations under the License.
 
+from typing import Optional
+
 from google.adk.agents import LlmAgent
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.models import LlmRequest, LlmResponse
+from google.genai import types
+
+from smallbizpal.shared.services import knowledge_base_service
+from smallbizpal.shared.services.faq import FAQMatcher
 
 from .config import (
     CUSTOMER_ENGAGEMENT_CONFIG,
+    FAQ_MIN_CONFIDENCE,
 )
 
 from .tools import (
@@ -23,6 +32,49 @@ from .tools import (
     schedule_meeting,
 )
 
+faq_matcher = FAQMatcher(min_confidence=FAQ_MIN_CONFIDENCE)
+
+
+def faq_fast_path_callback(
+    callback_context: CallbackContext, llm_request: LlmRequest
+) -> Optional[LlmResponse]:
+    """
+    Before-model callback that answers common questions from the FAQ index.
+    When the customer's latest message is a short, single question that
+    confidently matches one the business profile answers (hours, location,
+    pricing, ...), the precomputed answer is returned and the model is
+    skipped. Anything else, including messages with contact details or a
+    booking request and turns continuing after a tool call, goes to the model
+    as usual so leads and meetings are still recorded.
+    """
+    try:
+        if not llm_request.contents:
+            return None
+
+        latest = llm_request.contents[-1]
+        if latest.role != "user" or not latest.parts:
+            return None
+        if any(part.function_response for part in latest.parts):
+            return None  # The model is processing a tool result
+
+        message = " ".join(part.text for part in latest.parts if part.text)
+        if not message:
+            return None
+
+        user_id = callback_context._invocation_context.session.user_id
+        answer = faq_matcher.answer(message, knowledge_base_service.get_faq(user_id))
+        if answer is None:
+            return None
+
+        return LlmResponse(
+            content=types.Content(role="model", parts=[types.Part(text=answer)])
+        )
+
+    except Exception as e:
+        print(f"Error in faq_fast_path_callback: {e}")
+        return None
+
+
 root_agent = LlmAgent(
     name=CUSTOMER_ENGAGEMENT_CONFIG["name"],
     model=CUSTOMER_ENGAGEMENT_CONFIG["model"],
@@ -32,4 +84,5 @@ root_agent = LlmAgent(
         ask_internal_kb,
         schedule_meeting,
     ],
+    before_model_callback=faq_fast_path_callback,
 )
@@ -19,6 +19,12 @@ AGENT_NAME = "CustomerEngagementAgent"
 MODEL_NAME = "gemini-2.5-flash"
 DESCRIPTION = "AI-powered customer engagement agent that helps convert website visitors and social media interactions into qualified leads through helpful conversations and meeting scheduling."
 
+# FAQ Fast Path Settings
+# Smallest similarity between a customer message and a canonical FAQ question
+# for the precomputed answer to be sent without calling the model. Kept high:
+# a loose match answers the wrong question and skips lead capture.
+FAQ_MIN_CONFIDENCE = 0.8
+
 # Customer Engagement Agent Configuration
 CUSTOMER_ENGAGEMENT_CONFIG = {
     "name": AGENT_NAME,
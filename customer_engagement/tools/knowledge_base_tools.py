@@ -17,6 +17,7 @@ from google.adk.tools import ToolContext
 
 # Import the proxy agent that has access to the private KB
 from smallbizpal.agents.kb_proxy import kb_proxy_agent
+from smallbizpal.shared.services import answer_cache, knowledge_base_service
 
 
 # TODO: Remove this once we have a proper A2A implementation
@@ -25,6 +26,10 @@ def ask_internal_kb(query: str, tool_context: ToolContext) -> str:
     Asks the internal knowledge base for information about the business.
     This uses A2A communication to securely access private business data.
 
+    Answers are cached per business, keyed by the normalized question and
+    the profile version, so repeated FAQ-style questions skip retrieval
+    until the profile is updated or the cached answer expires.
+
     Args:
         query: The customer's question about the business.
 
@@ -34,8 +39,14 @@ def ask_internal_kb(query: str, tool_context: ToolContext) -> str:
     try:
         # For MVP, we'll use a direct call to the KB proxy
         # In production, this would use A2A protocol
-        from smallbizpal.agents.kb_proxy.tools import search_private_kb
-        return search_private_kb(query, tool_context)
+        from smallbizpal.agents.kb_proxy.tools import answer_from_kb
+        user_id = tool_context._invocation_context.session.user_id
+        version = knowledge_base_service.get_profile_version(user_id)
+        answer = answer_cache.get(user_id, query, version)
+        if answer is None:
+            answer = answer_from_kb(user_id, query)
+            answer_cache.put(user_id, query, version, answer)
+        return answer
     except Exception as e:
         return f"I apologize, but I'm having trouble accessing our business information right now. Please try again later or contact us directly. Error: {str(e)}"
 
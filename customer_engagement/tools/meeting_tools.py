@@ -12,12 +12,12 @@
 #   See the License for the specific language governing permissions and
 #   limitations under the License.
 
-import json
-from datetime import datetime
-from pathlib import Path
+from datetime import UTC, datetime
 
 from google.adk.tools import ToolContext
 
+from smallbizpal.shared.services import lead_store
+
 
 def schedule_meeting(
     name: str, email: str, topic: str, tool_context: ToolContext, preferred_time: str = ""
@@ -38,36 +38,19 @@ def schedule_meeting(
     try:
         user_id = tool_context._invocation_context.session.user_id
         
-        # Create user-specific leads directory if it doesn't exist
-        leads_dir = Path("data") / user_id / "leads"
-        leads_dir.mkdir(parents=True, exist_ok=True)
-
         # Create lead record
         lead_data = {
             "name": name,
             "email": email,
             "topic": topic,
             "preferred_time": preferred_time,
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": datetime.now(UTC).isoformat(),
             "status": "new",
             "source": "customer_engagement_agent",
         }
 
-        # Save to user-specific leads file
-        leads_file = leads_dir / "leads.json"
-        leads = []
-
-        if leads_file.exists():
-            try:
-                with open(leads_file, "r") as f:
-                    leads = json.load(f)
-            except (json.JSONDecodeError, FileNotFoundError):
-                leads = []
-
-        leads.append(lead_data)
-
-        with open(leads_file, "w") as f:
-            json.dump(leads, f, indent=2)
+        # Append to the user's lead log (also counts it in the daily rollup)
+        lead_store.append(user_id, lead_data)
 
         # Also store in customer interactions for the knowledge base
         try:
@@ -79,7 +62,7 @@ def schedule_meeting(
                 "customer_email": email,
                 "topic": topic,
                 "preferred_time": preferred_time,
-                "timestamp": datetime.now().isoformat(),
+                "timestamp": datetime.now(UTC).isoformat(),
                 "status": "scheduled",
             }
             knowledge_base_service.store_customer_interaction(user_id, interaction_data)
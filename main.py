@@ -1,13 +1,19 @@
 import os
-from pathlib import Path
-from typing import List, Dict, Any
+from contextlib import asynccontextmanager
+from datetime import datetime
+from typing import List, Dict, Any, Optional
 
 import uvicorn
-from fastapi import HTTPException
+from fastapi import HTTPException, Query, Request, Response
+from fastapi.responses import FileResponse, StreamingResponse
 from google.adk.cli.fast_api import get_fast_api_app
 
-# Import the knowledge base service
+# Import the knowledge base service and its async facade
+from smallbizpal.shared.services.async_knowledge_base import async_knowledge_base_service
 from smallbizpal.shared.services.knowledge_base import knowledge_base_service
+from smallbizpal.shared.services.answer_cache import answer_cache
+from smallbizpal.shared.services.export import EXPORT_DATASETS, export_records, ndjson_lines
+from smallbizpal.shared.services.report_store import report_store
 
 # Get the directory where main.py is located
 AGENT_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -27,56 +33,128 @@ app = get_fast_api_app(
     web=SERVE_WEB_INTERFACE,
 )
 
+_adk_lifespan = app.router.lifespan_context
+
+@asynccontextmanager
+async def lifespan(app_instance):
+    """Run the ADK lifespan and store buffered knowledge base writes on shutdown."""
+    async with _adk_lifespan(app_instance) as state:
+        try:
+            yield state
+        finally:
+            await async_knowledge_base_service.aflush()
+
+app.router.lifespan_context = lifespan
+
 # API Routes for accessing stored data
 
+def _etag_matches(request: Request, etag: str) -> bool:
+    """Check whether the client's If-None-Match header covers the current ETag."""
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return False
+    tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+    return "*" in tags or etag in tags
+
+async def _conditional(request: Request, response: Response, user_id: str, sections: List[str]) -> Optional[Response]:
+    """Tag the response with the sections' ETag; return a 304 if the client has it.
+
+    The ETag is computed before the data is read, so a write in between
+    only makes the next poll fetch the data again.
+    """
+    etag = f'"{await async_knowledge_base_service.aget_etag(user_id, sections)}"'
+    if _etag_matches(request, etag):
+        return Response(status_code=304, headers={"ETag": etag})
+    response.headers["ETag"] = etag
+    return None
+
 @app.get("/api/marketing-content/{user_id}")
-async def get_marketing_content(user_id: str) -> Dict[str, Any]:
-    """Get all marketing content for a specific user."""
+async def get_marketing_content(
+    user_id: str,
+    request: Request,
+    response: Response,
+    limit: int = Query(50, ge=1, le=500),
+    cursor: Optional[str] = None,
+    platform: Optional[str] = None,
+    content_type: Optional[str] = None,
+    asset_type: Optional[str] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    order: str = Query("asc", pattern="^(asc|desc)$"),
+    fields: Optional[str] = Query(None, description="Comma-separated asset fields to return"),
+) -> Dict[str, Any]:
+    """Get one page of marketing content for a specific user, ordered by creation time.
+
+    Pass the returned ``next_cursor`` as ``cursor`` to fetch the following page.
+    """
     try:
-        marketing_assets = knowledge_base_service.get_marketing_assets(user_id)
+        not_modified = await _conditional(request, response, user_id, ["marketing_assets"])
+        if not_modified:
+            return not_modified
+        page = await async_knowledge_base_service.aquery_marketing_assets(
+            user_id,
+            platform=platform,
+            content_type=content_type or asset_type,
+            start=start,
+            end=end,
+            limit=limit,
+            cursor=cursor,
+            descending=order == "desc",
+            fields=[field.strip() for field in fields.split(",") if field.strip()] if fields else None,
+        )
         return {
             "user_id": user_id,
-            "marketing_assets": marketing_assets,
-            "count": len(marketing_assets)
+            "marketing_assets": page["items"],
+            "count": len(page["items"]),
+            "next_cursor": page["next_cursor"]
         }
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error retrieving marketing content: {str(e)}")
 
 @app.get("/api/reports/{user_id}")
-async def get_reports(user_id: str) -> Dict[str, Any]:
-    """Get all reports for a specific user."""
+async def get_reports(
+    user_id: str,
+    limit: int = Query(50, ge=1, le=500),
+    cursor: Optional[str] = None,
+    order: str = Query("desc", pattern="^(asc|desc)$"),
+) -> Dict[str, Any]:
+    """Get one page of report metadata for a specific user, newest first by default.
+
+    Only the user's report index is read; fetch a report's content from
+    ``/api/reports/{user_id}/{filename}``.
+    """
     try:
-        reports_dir = Path("data") / user_id / "reports"
-        reports = []
-        
-        if reports_dir.exists():
-            for report_file in reports_dir.glob("*.md"):
-                try:
-                    with open(report_file, "r", encoding="utf-8") as f:
-                        content = f.read()
-                    reports.append({
-                        "filename": report_file.name,
-                        "content": content,
-                        "created_date": report_file.name.split("_")[0] if "_" in report_file.name else "unknown",
-                    })
-                except Exception as e:
-                    # Skip files that can't be read
-                    continue
-        
+        page = await async_knowledge_base_service.run(
+            report_store.list_reports, user_id, limit=limit, cursor=cursor, descending=order == "desc"
+        )
         return {
             "user_id": user_id,
-            "reports": reports,
-            "count": len(reports)
+            "reports": page["items"],
+            "count": len(page["items"]),
+            "next_cursor": page["next_cursor"]
         }
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error retrieving reports: {str(e)}")
 
+@app.get("/api/reports/{user_id}/{filename}")
+async def get_report(user_id: str, filename: str) -> FileResponse:
+    """Get the markdown content of one report, streamed straight from its file."""
+    path = await async_knowledge_base_service.run(report_store.get_report_path, user_id, filename)
+    if path is None:
+        raise HTTPException(status_code=404, detail=f"Report not found: {filename}")
+    return FileResponse(path, media_type="text/markdown; charset=utf-8")
+
 @app.get("/api/customer-engagement/{user_id}")
-async def get_customer_engagement(user_id: str) -> Dict[str, Any]:
+async def get_customer_engagement(user_id: str, request: Request, response: Response) -> Dict[str, Any]:
     """Get all customer interactions and engagement data for a specific user."""
     try:
-        customer_interactions = knowledge_base_service.get_customer_interactions(user_id)
-        performance_data = knowledge_base_service.get_performance_data(user_id)
+        not_modified = await _conditional(request, response, user_id, ["customer_interactions", "performance_data"])
+        if not_modified:
+            return not_modified
+        customer_interactions = await async_knowledge_base_service.aget_customer_interactions(user_id)
+        performance_data = await async_knowledge_base_service.aget_performance_data(user_id)
         
         return {
             "user_id": user_id,
@@ -89,12 +167,15 @@ async def get_customer_engagement(user_id: str) -> Dict[str, Any]:
         raise HTTPException(status_code=500, detail=f"Error retrieving customer engagement data: {str(e)}")
 
 @app.get("/api/business-profile/{user_id}")
-async def get_business_profile(user_id: str) -> Dict[str, Any]:
+async def get_business_profile(user_id: str, request: Request, response: Response) -> Dict[str, Any]:
     """Get business profile data for a specific user (admin access only)."""
     try:
+        not_modified = await _conditional(request, response, user_id, ["business_profile", "profile_meta"])
+        if not_modified:
+            return not_modified
         # Get the business profile using the knowledge base service
-        business_profile = knowledge_base_service.get_business_profile(user_id)
-        profile_summary = knowledge_base_service.get_profile_summary(user_id)
+        business_profile = await async_knowledge_base_service.aget_business_profile(user_id)
+        profile_summary = await async_knowledge_base_service.aget_profile_summary(user_id)
         
         if business_profile is None:
             return {
@@ -115,11 +196,39 @@ async def get_business_profile(user_id: str) -> Dict[str, Any]:
             "summary": profile_summary,
             "last_updated": business_profile.updated_at.isoformat() if business_profile.updated_at else None,
             "total_updates": business_profile.total_updates,
-            "total_fields": len(business_data)
+            "total_fields": len(business_data),
+            "profile_version": profile_summary["version"]
         }
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error retrieving business profile: {str(e)}")
 
+@app.get("/api/export/{user_id}/{dataset}.ndjson")
+async def export_dataset(user_id: str, dataset: str, since: Optional[str] = None) -> StreamingResponse:
+    """Stream a user's interactions, assets, leads or reports as NDJSON.
+
+    Each line carries a ``_cursor``; pass the last one as ``since`` to export only newer records.
+    """
+    if dataset not in EXPORT_DATASETS:
+        raise HTTPException(status_code=404, detail=f"Unknown export dataset: {dataset}")
+    try:
+        records = await async_knowledge_base_service.run(
+            export_records, async_knowledge_base_service.service, user_id, dataset, since
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    # Starlette iterates the blocking generator in its threadpool, one line at a time
+    return StreamingResponse(ndjson_lines(records), media_type="application/x-ndjson")
+
+@app.get("/api/cache-stats")
+async def get_cache_stats() -> Dict[str, Any]:
+    """Get hit/miss/eviction counters of the knowledge base file cache."""
+    return knowledge_base_service.cache_stats()
+
+@app.get("/api/answer-cache-stats")
+async def get_answer_cache_stats(user_id: Optional[str] = None) -> Dict[str, Any]:
+    """Get hit/miss counters of the customer answer cache, overall or for one user."""
+    return answer_cache.stats(user_id)
+
 # You can add more FastAPI routes or configurations below if needed
 # Example:
 # @app.get("/hello")
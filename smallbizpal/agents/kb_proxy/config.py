@@ -19,6 +19,14 @@ AGENT_NAME = "KBProxyAgent"
 MODEL_NAME = "gemini-2.5-flash"
 DESCRIPTION = "Proxy agent that searches the private knowledge base for customer engagement queries"
 
+# Retrieval Settings for search_private_kb
+# Ranking used: "bm25" (lexical), "vector" (semantic) or "hybrid" (both, fused)
+RETRIEVAL_MODE = "hybrid"
+# Maximum number of knowledge base snippets returned per query
+RETRIEVAL_TOP_K = 5
+# Character budget for all returned snippets together
+RETRIEVAL_MAX_CHARS = 2000
+
 # KB Proxy Agent Configuration
 KB_PROXY_CONFIG = {
     "name": AGENT_NAME,
@@ -12,8 +12,9 @@
 #   See the License for the specific language governing permissions and
 #   limitations under the License.
 
-from .knowledge_search_tools import search_private_kb
+from .knowledge_search_tools import answer_from_kb, search_private_kb
 
 __all__ = [
+    "answer_from_kb",
     "search_private_kb",
 ]
@@ -12,44 +12,71 @@
 #   See the License for the specific language governing permissions and
 #   limitations under the License.
 
-import json
-
 from google.adk.tools import ToolContext
 
-from smallbizpal.shared.services import knowledge_base_service
+from smallbizpal.agents.kb_proxy.config import (
+    RETRIEVAL_MAX_CHARS,
+    RETRIEVAL_MODE,
+    RETRIEVAL_TOP_K,
+)
+from smallbizpal.shared.services import (
+    hybrid_retriever,
+    knowledge_retriever,
+    vector_retriever,
+)
 
+RETRIEVERS = {
+    "bm25": knowledge_retriever,
+    "vector": vector_retriever,
+    "hybrid": hybrid_retriever,
+}
 
-def search_private_kb(query: str, tool_context: ToolContext) -> str:
+
+NO_BUSINESS_INFORMATION = (
+    "No business information available. Please complete the business profile setup."
+)
+
+
+def answer_from_kb(user_id: str, query: str) -> str:
     """
-    Searches the private knowledge base for information relevant to the query.
+    Retrieves the business information relevant to a query for a user.
 
-    For MVP, this simply returns the entire business profile data.
-    Later this will be upgraded to vector search with RAG.
+    Ranks every business profile field and stored marketing asset against the
+    query (lexically with BM25, semantically with dense vectors, or both, as
+    set by RETRIEVAL_MODE) and returns only the best matches, within the
+    character budget set in the KB proxy config.
 
     Args:
+        user_id: The ID of the user.
         query: The search query from the customer engagement agent
-        tool_context: The context of the tool.
 
     Returns:
-        Complete business profile data from the knowledge base
+        The most relevant business information, one snippet per line
     """
-    try:
-        user_id = tool_context._invocation_context.session.user_id
+    snippets = RETRIEVERS[RETRIEVAL_MODE].search(
+        user_id, query, top_k=RETRIEVAL_TOP_K, max_chars=RETRIEVAL_MAX_CHARS
+    )
+
+    if not snippets:
+        return NO_BUSINESS_INFORMATION
 
-        # Get business profile from knowledge base service
-        business_profile = knowledge_base_service.get_business_profile(user_id)
+    return "\n".join(f"- {snippet['text']}" for snippet in snippets)
 
-        if not business_profile:
-            return "No business information available. Please complete the business profile setup."
 
-        # Get all business data
-        business_data = business_profile.get_all_data()
+def search_private_kb(query: str, tool_context: ToolContext) -> str:
+    """
+    Searches the private knowledge base for information relevant to the query.
 
-        if not business_data:
-            return "No business information available. Please complete the business profile setup."
+    Args:
+        query: The search query from the customer engagement agent
+        tool_context: The context of the tool.
 
-        # For MVP: Simply return the entire business profile as JSON string
-        return json.dumps(business_data, indent=2)
+    Returns:
+        The most relevant business information, one snippet per line
+    """
+    try:
+        user_id = tool_context._invocation_context.session.user_id
+        return answer_from_kb(user_id, query)
 
     except Exception as e:
         return f"Error accessing knowledge base: {str(e)}"
@@ -20,6 +20,17 @@ from google.adk.tools import ToolContext
 
 from smallbizpal.shared.services import knowledge_base_service
 
+# Asset fields returned by list_marketing_assets (plus metadata on request)
+LISTED_ASSET_FIELDS = (
+    "id",
+    "content",
+    "content_type",
+    "asset_type",
+    "platform",
+    "created_at",
+    "status",
+)
+
 
 def store_marketing_asset(
     content: str,
@@ -66,7 +77,7 @@ def store_marketing_asset(
             "content": content.strip(),
             "content_type": content_type,
             "platform": platform,
-            "created_at": datetime.now(),
+            "created_at": datetime.now(UTC),
             "metadata": metadata or {},
             "status": "active",
             "version": "1.0",
@@ -114,14 +125,18 @@ def list_marketing_assets(
     content_type: Optional[str] = None,
     platform: Optional[str] = None,
     include_metadata: bool = True,
+    limit: int = 20,
+    cursor: Optional[str] = None,
 ) -> Dict[str, Any]:
-    """Retrieve marketing assets from the knowledge base.
+    """Retrieve marketing assets from the knowledge base, newest first.
 
     Args:
         tool_context: The context of the tool.
         content_type: Filter by content type (optional)
         platform: Filter by platform (optional)
         include_metadata: Whether to include detailed metadata
+        limit: Maximum number of assets to return
+        cursor: The next_cursor of a previous call, to get older assets (optional)
 
     Returns:
         Dictionary with list of matching marketing assets
@@ -129,38 +144,34 @@ def list_marketing_assets(
     try:
         user_id = tool_context._invocation_context.session.user_id
 
-        # Get all marketing assets from knowledge base
-        all_assets = knowledge_base_service.get_marketing_assets(user_id)
+        # Filtering, ordering and projection are done by the storage layer
+        fields = list(LISTED_ASSET_FIELDS)
+        if include_metadata:
+            fields.append("metadata")
+        page = knowledge_base_service.query_marketing_assets(
+            user_id,
+            platform=platform,
+            content_type=content_type,
+            limit=limit,
+            cursor=cursor,
+            descending=True,
+            fields=fields,
+        )
 
-        if not all_assets:
+        if not page["items"] and not (content_type or platform or cursor):
             return {
                 "assets": [],
                 "total_count": 0,
                 "message": "No marketing assets found",
             }
 
-        # Apply filters
-        filtered_assets = all_assets
-
-        if content_type:
-            filtered_assets = [
-                asset
-                for asset in filtered_assets
-                if asset.get("content_type") == content_type
-            ]
-
-        if platform:
-            filtered_assets = [
-                asset for asset in filtered_assets if asset.get("platform") == platform
-            ]
-
         # Format response
         response_assets = []
-        for asset in filtered_assets:
+        for asset in page["items"]:
             formatted_asset = {
                 "id": asset.get("id"),
                 "content": asset.get("content"),
-                "content_type": asset.get("content_type"),
+                "content_type": asset.get("content_type") or asset.get("asset_type"),
                 "platform": asset.get("platform"),
                 "created_at": asset.get("created_at"),
                 "status": asset.get("status", "active"),
@@ -171,12 +182,10 @@ def list_marketing_assets(
 
             response_assets.append(formatted_asset)
 
-        # Sort by creation date (newest first)
-        response_assets.sort(key=lambda x: x.get("created_at", ""), reverse=True)
-
         return {
             "assets": response_assets,
             "total_count": len(response_assets),
+            "next_cursor": page["next_cursor"],
             "filters_applied": {"content_type": content_type, "platform": platform},
             "message": f"Retrieved {len(response_assets)} marketing assets",
         }
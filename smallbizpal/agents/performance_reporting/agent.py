@@ -19,7 +19,7 @@ from google.adk.agents import LlmAgent
 from .config import (
     PERFORMANCE_REPORTING_CONFIG,
 )
-from .tools import collect_metrics, store_report
+from .tools import collect_metrics, collect_metrics_range, store_report
 
 performance_reporting_agent = LlmAgent(
     name=PERFORMANCE_REPORTING_CONFIG["name"],
@@ -28,7 +28,7 @@ performance_reporting_agent = LlmAgent(
     instruction=PERFORMANCE_REPORTING_CONFIG["instruction"].format(
         date=datetime.now().strftime("%Y-%m-%d")
     ),
-    tools=[collect_metrics, store_report],
+    tools=[collect_metrics, collect_metrics_range, store_report],
     output_key="performance_report",
 )
 
@@ -0,0 +1,300 @@
+#   Copyright 2025 Akshat Deepak Joshi
+
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+
+#       http://www.apache.org/licenses/LICENSE-2.0
+
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+"""
+Nightly daily-report generation for every tenant of a data directory.
+
+Tenants are processed in a process pool with a bounded number of reports in
+flight. Each worker reads metrics straight from the storage layer (the same
+``daily_metrics`` the agent's ``collect_metrics`` tool uses), renders the
+report and writes it with ``save_report``, the storage logic behind the
+``store_report`` tool. Reports are rendered from a template by default; the
+"agent" renderer asks the reporting model to write them from the metrics.
+
+Progress is recorded by appending each finished tenant's result as a line
+to a checkpoint file, so an interrupted run resumes with the tenants that
+are not done yet.
+"""
+
+import asyncio
+import json
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from datetime import date
+from pathlib import Path
+from typing import IO, Any, Callable, Dict, Iterator, List, Optional, Set
+
+from smallbizpal.shared.services.knowledge_base import (
+    KnowledgeBaseService,
+    create_knowledge_base_service,
+)
+from smallbizpal.shared.services.lead_store import LEADS_LOG_FILE_NAME, LeadStore
+from smallbizpal.shared.services.report_store import ReportStore
+
+from .config import MODEL_NAME
+from .report_template import render_report
+from .tools.metrics_tools import daily_metrics
+from .tools.report_storage_tools import save_report
+
+RENDERERS = ("template", "agent")
+
+AGENT_REPORT_INSTRUCTION = """
+You write daily performance reports for small business owners.
+You are given one day's metrics as JSON. Reply with only the report in markdown.
+Only include sections and fields that have non-empty or non-zero values.
+Be concise, clear and actionable, and use business-friendly language.
+"""
+
+# Per-process services, created by the pool initializer
+_worker: Dict[str, Any] = {}
+
+
+def tenant_ids(data_dir: Path) -> List[str]:
+    """List the tenants of a data directory: users with stored data or leads."""
+    kb_service = create_knowledge_base_service(
+        base_storage_path=str(data_dir), write_behind=False
+    )
+    try:
+        tenants = set(kb_service.stored_user_ids())
+    finally:
+        kb_service.close()
+    tenants.update(
+        path.parent.parent.name
+        for path in data_dir.glob(f"*/leads/{LEADS_LOG_FILE_NAME}")
+    )
+    return sorted(tenants)
+
+
+def checkpoint_path(data_dir: Path, report_date: date) -> Path:
+    """Get the default checkpoint file of a run (a file, so not a tenant)."""
+    return data_dir / f".nightly_reports_{report_date.isoformat()}.jsonl"
+
+
+def load_checkpoint(path: Path) -> Dict[str, Dict[str, Any]]:
+    """Read the results recorded by earlier runs, keyed by tenant.
+
+    A tenant's last recorded result wins; a line torn by an interrupted
+    write is skipped.
+    """
+    results: Dict[str, Dict[str, Any]] = {}
+    try:
+        f = open(path, "r")
+    except FileNotFoundError:
+        return results
+    with f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue
+            if isinstance(entry, dict) and "tenant" in entry:
+                results[entry.pop("tenant")] = entry
+    return results
+
+
+def _record_result(f: IO[bytes], user_id: str, result: Dict[str, Any]) -> None:
+    """Append a finished tenant's result to an open checkpoint file."""
+    f.write((json.dumps({"tenant": user_id, **result}) + "\n").encode())
+    f.flush()
+
+
+def _init_worker(data_dir: str) -> None:
+    """Create the storage services of a worker process."""
+    _worker["kb_service"] = create_knowledge_base_service(
+        base_storage_path=data_dir, write_behind=False
+    )
+    _worker["leads"] = LeadStore(base_storage_path=data_dir)
+    _worker["reports"] = ReportStore(base_storage_path=data_dir)
+
+
+async def _render_with_agent(user_id: str, metrics: Dict[str, Any]) -> str:
+    """Ask the reporting model to write a report from a day's metrics."""
+    from google.adk.agents import LlmAgent
+    from google.adk.runners import Runner
+    from google.adk.sessions import InMemorySessionService
+    from google.genai import types
+
+    agent = LlmAgent(
+        name="NightlyReportWriter",
+        model=MODEL_NAME,
+        instruction=AGENT_REPORT_INSTRUCTION,
+    )
+    runner = Runner(
+        app_name="nightly_reports",
+        agent=agent,
+        session_service=InMemorySessionService(),
+    )
+    session = await runner.session_service.create_session(
+        app_name="nightly_reports", user_id=user_id
+    )
+    message = types.Content(
+        role="user", parts=[types.Part(text=json.dumps(metrics, indent=2))]
+    )
+    report = ""
+    async for event in runner.run_async(
+        user_id=user_id, session_id=session.id, new_message=message
+    ):
+        if event.is_final_response() and event.content:
+            report = "".join(part.text for part in event.content.parts if part.text)
+    return report
+
+
+def generate_report(
+    user_id: str,
+    report_date: date,
+    renderer: str = "template",
+    kb_service: Optional[KnowledgeBaseService] = None,
+    leads: Optional[LeadStore] = None,
+    reports: Optional[ReportStore] = None,
+) -> Dict[str, Any]:
+    """Collect, render and store one tenant's report of a day.
+
+    Services default to the ones of the current worker process.
+
+    Returns:
+        The tenant's result: status, file name, size and duration, or the
+        error if the report could not be produced
+    """
+    started = time.perf_counter()
+    kb_service = kb_service or _worker.get("kb_service")
+    leads = leads or _worker.get("leads")
+    reports = reports or _worker.get("reports")
+    try:
+        metrics = daily_metrics(
+            user_id,
+            report_date,
+            include_details=True,
+            kb_service=kb_service,
+            leads=leads,
+        )
+        if renderer == "agent":
+            markdown = asyncio.run(_render_with_agent(user_id, metrics))
+        else:
+            markdown = render_report(metrics)
+        if not markdown.strip():
+            raise ValueError("Rendered report is empty")
+        entry = save_report(user_id, markdown, report_date.isoformat(), reports)
+        return {
+            "status": "done",
+            "filename": entry["filename"],
+            "size_bytes": entry["size_bytes"],
+            "seconds": round(time.perf_counter() - started, 3),
+        }
+    except Exception as e:
+        return {
+            "status": "failed",
+            "error": str(e),
+            "seconds": round(time.perf_counter() - started, 3),
+        }
+
+
+def _bounded(
+    submit: Callable[[str], Future],
+    user_ids: List[str],
+    max_in_flight: int,
+) -> Iterator[Future]:
+    """Submit tenants keeping at most ``max_in_flight`` queued, yielding results."""
+    pending: Set[Future] = set()
+    for user_id in user_ids:
+        pending.add(submit(user_id))
+        if len(pending) >= max_in_flight:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            yield from done
+    while pending:
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        yield from done
+
+
+def run_batch(
+    data_dir: Path,
+    report_date: date,
+    workers: Optional[int] = None,
+    renderer: str = "template",
+    checkpoint: Optional[Path] = None,
+    progress: Optional[Callable[[str, Dict[str, Any]], None]] = None,
+) -> Dict[str, Any]:
+    """Generate the report of a day for every tenant of a data directory.
+
+    Tenants recorded as done in the checkpoint are skipped; failed tenants
+    are retried.
+
+    Args:
+        data_dir: Data directory holding one subdirectory per tenant
+        report_date: Day to report
+        workers: Number of worker processes (default: CPU count)
+        renderer: "template" or "agent"
+        checkpoint: Checkpoint file (default: ``checkpoint_path``)
+        progress: Called with each tenant's ID and result as it finishes
+
+    Returns:
+        Throughput summary of the run
+
+    Raises:
+        ValueError: If the renderer is unknown
+    """
+    if renderer not in RENDERERS:
+        raise ValueError(f"Unknown renderer: {renderer}")
+    workers = max(1, workers or os.cpu_count() or 1)
+    checkpoint = checkpoint or checkpoint_path(data_dir, report_date)
+    results = load_checkpoint(checkpoint)
+    tenants = tenant_ids(data_dir)
+    todo = [t for t in tenants if results.get(t, {}).get("status") != "done"]
+
+    started = time.perf_counter()
+    done = failed = total_bytes = 0
+    with (
+        open(checkpoint, "ab+") as recorded,
+        ProcessPoolExecutor(
+            max_workers=workers, initializer=_init_worker, initargs=(str(data_dir),)
+        ) as executor,
+    ):
+        # Terminate a line torn by an interrupted run so it cannot swallow ours
+        end = recorded.seek(0, os.SEEK_END)
+        if end > 0:
+            recorded.seek(end - 1)
+            if recorded.read(1) != b"\n":
+                recorded.write(b"\n")
+        futures: Dict[Future, str] = {}
+
+        def submit(user_id: str) -> Future:
+            future = executor.submit(generate_report, user_id, report_date, renderer)
+            futures[future] = user_id
+            return future
+
+        for future in _bounded(submit, todo, workers * 2):
+            user_id = futures.pop(future)
+            result = future.result()
+            _record_result(recorded, user_id, result)
+            if result["status"] == "done":
+                done += 1
+                total_bytes += result["size_bytes"]
+            else:
+                failed += 1
+            if progress is not None:
+                progress(user_id, result)
+
+    elapsed = time.perf_counter() - started
+    return {
+        "date": report_date.isoformat(),
+        "tenants": len(tenants),
+        "skipped": len(tenants) - len(todo),
+        "generated": done,
+        "failed": failed,
+        "bytes_written": total_bytes,
+        "elapsed_seconds": round(elapsed, 3),
+        "reports_per_second": round(done / elapsed, 2) if elapsed > 0 else 0.0,
+        "workers": workers,
+        "checkpoint": str(checkpoint),
+    }
@@ -0,0 +1,83 @@
+#   Copyright 2025 Akshat Deepak Joshi
+
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+
+#       http://www.apache.org/licenses/LICENSE-2.0
+
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+"""
+Markdown daily report rendered from metrics without a model call.
+
+Follows the agent's reporting rules: only sections with data are shown.
+"""
+
+from typing import Any, Dict, List
+
+NO_ACTIVITY_MESSAGE = (
+    "No customer activity or new marketing content was recorded on this day."
+)
+
+
+def _plural(count: int, noun: str) -> str:
+    return f"{count} {noun}" if count == 1 else f"{count} {noun}s"
+
+
+def render_report(metrics: Dict[str, Any]) -> str:
+    """Render a daily performance report from ``collect_metrics`` output.
+
+    Args:
+        metrics: Metrics of one day (see ``daily_metrics``)
+
+    Returns:
+        The report as markdown
+    """
+    lines: List[str] = [f"# Daily Performance Report: {metrics['date']}", ""]
+
+    summary = [
+        (metrics.get("leads_count", 0), "new lead"),
+        (metrics.get("interactions_count", 0), "customer interaction"),
+        (metrics.get("marketing_assets_count", 0), "marketing asset"),
+    ]
+    summary = [(count, noun) for count, noun in summary if count]
+    if not summary:
+        lines.append(NO_ACTIVITY_MESSAGE)
+        return "\n".join(lines) + "\n"
+
+    lines.append("## Summary")
+    lines.extend(f"- **{_plural(count, noun)}**" for count, noun in summary)
+
+    if metrics.get("top_questions"):
+        lines.extend(["", "## Top Customer Questions"])
+        lines.extend(
+            f"{rank}. {item['question']} ({_plural(item['frequency'], 'time')})"
+            for rank, item in enumerate(metrics["top_questions"], start=1)
+        )
+
+    if metrics.get("leads_details"):
+        lines.extend(["", "## New Leads"])
+        for lead in metrics["leads_details"]:
+            line = f"- **{lead.get('name') or 'Unknown'}**"
+            if lead.get("email"):
+                line += f" ({lead['email']})"
+            if lead.get("topic"):
+                line += f": {lead['topic']}"
+            if lead.get("preferred_time"):
+                line += f", prefers {lead['preferred_time']}"
+            lines.append(line)
+
+    if metrics.get("marketing_assets"):
+        lines.extend(["", "## Marketing Assets"])
+        lines.extend(
+            f"- {asset.get('content_type', 'Unknown')} for "
+            f"{asset.get('platform', 'Universal')}: {asset.get('content', '')}"
+            for asset in metrics["marketing_assets"]
+        )
+
+    return "\n".join(lines) + "\n"
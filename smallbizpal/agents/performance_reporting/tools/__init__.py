@@ -12,10 +12,11 @@
 #   See the License for the specific language governing permissions and
 #   limitations under the License.
 
-from .metrics_tools import collect_metrics
+from .metrics_tools import collect_metrics, collect_metrics_range
 from .report_storage_tools import store_report
 
 __all__ = [
     "collect_metrics",
+    "collect_metrics_range",
     "store_report",
 ]
@@ -13,45 +13,163 @@
 #   limitations under the License.
 
 from collections import Counter
-from datetime import UTC, date, datetime
-from typing import Any, Dict, Optional
+from datetime import UTC, date, datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
 
+import numpy as np
 from google.adk.tools import ToolContext
 
-from smallbizpal.shared.services import knowledge_base_service
+from smallbizpal.shared.services import knowledge_base_service, lead_store
+from smallbizpal.shared.services.knowledge_base import KnowledgeBaseService
+from smallbizpal.shared.services.lead_store import LeadStore
+from smallbizpal.shared.services.question_clusters import (
+    QUESTION_CLUSTER_FIELD,
+    question_text,
+)
+from smallbizpal.shared.services.rollups import (
+    LEAD_INTERACTION_TYPE,
+    TOP_QUESTIONS,
+    normalize_email,
+    rollup_metrics,
+)
+from smallbizpal.shared.utils.timestamps import day_bounds, record_epoch_ms
 
+GRANULARITIES = ("day", "week", "month")
+EPOCH = date(1970, 1, 1)
+MS_PER_DAY = 24 * 60 * 60 * 1000
 
-def date_from_iso(timestamp_str: str) -> Optional[date]:
-    """Convert ISO timestamp string to date object.
+
+def daily_details(
+    user_id: str,
+    target_date: date,
+    kb_service: Optional[KnowledgeBaseService] = None,
+    leads: Optional[LeadStore] = None,
+) -> Dict[str, Any]:
+    """Fetch the individual leads and marketing assets of a day.
 
     Args:
-        timestamp_str: ISO format timestamp string
+        user_id: The ID of the user.
+        target_date: The day to fetch
+        kb_service: Knowledge base to read (default: the shared service)
+        leads: Lead store to read (default: the shared store)
 
     Returns:
-        date object or None if parsing fails
+        Dictionary with ``leads_details`` and ``marketing_assets`` lists
     """
-    try:
-        # Handle various timestamp formats
-        if "T" in timestamp_str:
-            # ISO format with time
-            dt = datetime.fromisoformat(timestamp_str.replace("Z", "+00:00"))
-        else:
-            # Date only format
-            dt = datetime.fromisoformat(timestamp_str)
-        return dt.date()
-    except (ValueError, AttributeError):
-        return None
+    kb_service = kb_service or knowledge_base_service
+    leads = leads or lead_store
+
+    # Collect the day's customer interactions (filtered by the storage layer)
+    day_start, day_end = day_bounds(target_date)
+    daily_interactions = kb_service.get_customer_interactions(
+        user_id, interaction_type="meeting_request", start=day_start, end=day_end
+    )
+
+    daily_leads = []
+    seen_emails = set()
+    for interaction in daily_interactions:
+        lead_data = {
+            "name": interaction.get("customer_name", "Unknown"),
+            "email": interaction.get("customer_email", ""),
+            "topic": interaction.get("topic", ""),
+            "preferred_time": interaction.get("preferred_time", ""),
+            "timestamp": interaction.get("timestamp", ""),
+        }
+        daily_leads.append(lead_data)
+        seen_emails.add(normalize_email(lead_data["email"]))
+
+    # Also include the day's leads from the lead store (served by its day index)
+    for lead in leads.get_leads_by_day(user_id, target_date):
+        # Avoid duplicates of leads already listed from meeting requests
+        email = normalize_email(lead.get("email", ""))
+        if email in seen_emails:
+            continue
+        seen_emails.add(email)
+        daily_leads.append(
+            {
+                "name": lead.get("name", "Unknown"),
+                "email": lead.get("email", ""),
+                "topic": lead.get("topic", ""),
+                "preferred_time": lead.get("preferred_time", ""),
+                "timestamp": lead.get("timestamp", ""),
+            }
+        )
 
+    # Collect the day's marketing assets
+    marketing_assets = kb_service.get_marketing_assets(
+        user_id, start=day_start, end=day_end
+    )
+    daily_assets = []
+
+    for asset in marketing_assets:
+        asset_data = {
+            "id": asset.get("id", ""),
+            "content_type": asset.get(
+                "content_type", asset.get("asset_type", "Unknown")
+            ),
+            "platform": asset.get("platform", "Universal"),
+            "content": (
+                asset.get("content", "")[:100] + "..."
+                if len(asset.get("content", "")) > 100
+                else asset.get("content", "")
+            ),
+            "created_at": asset.get("created_at", ""),
+        }
+        daily_assets.append(asset_data)
+
+    return {"leads_details": daily_leads, "marketing_assets": daily_assets}
+
+
+def daily_metrics(
+    user_id: str,
+    target_date: date,
+    include_details: bool = False,
+    kb_service: Optional[KnowledgeBaseService] = None,
+    leads: Optional[LeadStore] = None,
+) -> Dict[str, Any]:
+    """Get a user's metrics of one day, as reported by ``collect_metrics``.
+
+    Args:
+        user_id: The ID of the user.
+        target_date: The day to report
+        include_details: Also list the day's individual leads and marketing
+            assets
+        kb_service: Knowledge base to read (default: the shared service)
+        leads: Lead store to read (default: the shared store)
+
+    Returns:
+        Dictionary containing the day's metrics
+    """
+    kb_service = kb_service or knowledge_base_service
+    metrics = {
+        "date": target_date.strftime("%Y-%m-%d"),
+        **rollup_metrics(kb_service.get_daily_rollup(user_id, target_date)),
+        "leads_details": [],
+        "marketing_assets": [],
+        "success": True,
+    }
+    if include_details:
+        metrics.update(daily_details(user_id, target_date, kb_service, leads))
+    return metrics
 
-def collect_metrics(  # noqa: C901
-    tool_context: ToolContext, run_date: Optional[str] = None  # noqa: C901
-) -> Dict[str, Any]:  # noqa: C901
+
+def collect_metrics(
+    tool_context: ToolContext,
+    run_date: Optional[str] = None,
+    include_details: bool = True,
+) -> Dict[str, Any]:
     """Collect performance metrics from the knowledge base for a specific date.
 
+    Counts come from the day's rollup, which is maintained as interactions,
+    assets and leads are stored; individual leads and assets are also
+    fetched unless ``include_details`` is turned off.
+
     Args:
         tool_context: The context of the tool.
         run_date: Date to collect metrics for (YYYY-MM-DD format).
                  Defaults to today if not provided.
+        include_details: Also list the day's individual leads and marketing
+                 assets. Set to false when only the counts are needed.
 
     Returns:
         Dictionary containing collected metrics data
@@ -71,128 +189,212 @@ def collect_metrics(  # noqa: C901
         else:
             target_date = datetime.now(UTC).date()
 
-        # Initialize metrics
-        metrics = {
-            "date": target_date.strftime("%Y-%m-%d"),
-            "leads_count": 0,
-            "leads_details": [],
-            "interactions_count": 0,
-            "top_questions": [],
-            "marketing_assets_count": 0,
-            "marketing_assets": [],
-            "success": True,
+        return daily_metrics(user_id, target_date, include_details)
+
+    except Exception as e:
+        return {
+            "error": f"Failed to collect metrics: {str(e)}",
+            "success": False,
+            "date": run_date or datetime.now(UTC).date().strftime("%Y-%m-%d"),
         }
 
-        # Collect customer interactions
-        interactions = knowledge_base_service.get_customer_interactions(user_id)
-
-        # Filter interactions by date and categorize
-        daily_interactions = []
-        daily_leads = []
-        questions = []
-
-        for interaction in interactions:
-            interaction_date = date_from_iso(interaction.get("timestamp", ""))
-            if interaction_date == target_date:
-                daily_interactions.append(interaction)
-
-                # Check if it's a lead (meeting request)
-                if interaction.get("type") == "meeting_request":
-                    lead_data = {
-                        "name": interaction.get("customer_name", "Unknown"),
-                        "email": interaction.get("customer_email", ""),
-                        "topic": interaction.get("topic", ""),
-                        "preferred_time": interaction.get("preferred_time", ""),
-                        "timestamp": interaction.get("timestamp", ""),
-                    }
-                    daily_leads.append(lead_data)
-
-                # Extract questions for analysis
-                if interaction.get("type") in ["question", "inquiry"]:
-                    question_text = interaction.get(
-                        "question", interaction.get("topic", "")
-                    )
-                    if question_text:
-                        questions.append(question_text)
-
-        # Also check user-specific leads.json file for additional lead data
-        try:
-            import json
-            from pathlib import Path
-
-            leads_file = Path("data") / user_id / "leads" / "leads.json"
-            if leads_file.exists():
-                with open(leads_file, "r") as f:
-                    leads_data = json.load(f)
-
-                for lead in leads_data:
-                    lead_date = date_from_iso(lead.get("timestamp", ""))
-                    if lead_date == target_date:
-                        # Avoid duplicates by checking if already in daily_leads
-                        if not any(
-                            l.get("email") == lead.get("email")
-                            for l in daily_leads  # noqa: E741
-                        ):
-                            lead_data = {
-                                "name": lead.get("name", "Unknown"),
-                                "email": lead.get("email", ""),
-                                "topic": lead.get("topic", ""),
-                                "preferred_time": lead.get("preferred_time", ""),
-                                "timestamp": lead.get("timestamp", ""),
-                            }
-                            daily_leads.append(lead_data)
-        except Exception:
-            pass  # Continue without leads.json data if there's an issue
-
-        # Collect marketing assets
-        marketing_assets = knowledge_base_service.get_marketing_assets(user_id)
-        daily_assets = []
-
-        for asset in marketing_assets:
-            asset_date = date_from_iso(str(asset.get("created_at", "")))
-            if asset_date == target_date:
-                asset_data = {
-                    "id": asset.get("id", ""),
-                    "content_type": asset.get(
-                        "content_type", asset.get("asset_type", "Unknown")
-                    ),
-                    "platform": asset.get("platform", "Universal"),
-                    "content": (
-                        asset.get("content", "")[:100] + "..."
-                        if len(asset.get("content", "")) > 100
-                        else asset.get("content", "")
-                    ),
-                    "created_at": asset.get("created_at", ""),
-                }
-                daily_assets.append(asset_data)
 
-        # Analyze top questions
-        if questions:
-            question_counts = Counter(questions)
-            top_questions = [
-                {"question": q, "frequency": count}
-                for q, count in question_counts.most_common(5)
-            ]
+def bucket_start(day: date, granularity: str) -> date:
+    """Get the first day of the bucket holding a day (weeks start on Monday)."""
+    if granularity == "week":
+        return day - timedelta(days=day.weekday())
+    if granularity == "month":
+        return day.replace(day=1)
+    return day
+
+
+def bucket_starts(start: date, end: date, granularity: str) -> List[date]:
+    """Get the first day of every bucket overlapping ``[start, end]``."""
+    starts = []
+    current = bucket_start(start, granularity)
+    while current <= end:
+        starts.append(current)
+        if granularity == "month":
+            current = (current + timedelta(days=31)).replace(day=1)
         else:
-            top_questions = []
+            current += timedelta(days=7 if granularity == "week" else 1)
+    return starts
 
-        # Update metrics
-        metrics.update(
-            {
-                "leads_count": len(daily_leads),
-                "leads_details": daily_leads,
-                "interactions_count": len(daily_interactions),
-                "top_questions": top_questions,
-                "marketing_assets_count": len(daily_assets),
-                "marketing_assets": daily_assets,
+
+def bucket_indices(days: np.ndarray, first: date, granularity: str) -> np.ndarray:
+    """Map UTC epoch days to bucket numbers counted from the bucket at ``first``.
+
+    Args:
+        days: Epoch days (days since 1970-01-01)
+        first: First day of the first bucket
+        granularity: "day", "week" or "month"
+    """
+    first_day = (first - EPOCH).days
+    if granularity == "day":
+        return days - first_day
+    if granularity == "week":
+        return (days - first_day) // 7
+    months = days.astype("datetime64[D]").astype("datetime64[M]").astype(np.int64)
+    return months - ((first.year - 1970) * 12 + first.month - 1)
+
+
+def epoch_days(records: List[Dict[str, Any]], field: str) -> np.ndarray:
+    """Get the UTC epoch day of each record's timestamp (-1 if unparseable)."""
+    ms = np.fromiter(
+        (record_epoch_ms(record, field) or -MS_PER_DAY for record in records),
+        dtype=np.int64,
+        count=len(records),
+    )
+    return ms // MS_PER_DAY
+
+
+def count_buckets(
+    days: np.ndarray, first: date, granularity: str, buckets: int
+) -> np.ndarray:
+    """Count epoch days per bucket, ignoring days outside the buckets."""
+    indices = bucket_indices(days, first, granularity)
+    indices = indices[(indices >= 0) & (indices < buckets)]
+    return np.bincount(indices, minlength=buckets)
+
+
+def range_series(
+    interactions: List[Dict[str, Any]],
+    assets: List[Dict[str, Any]],
+    leads: List[Dict[str, Any]],
+    start: date,
+    end: date,
+    granularity: str,
+) -> Tuple[List[date], Dict[str, List[int]]]:
+    """Count activity per bucket in one pass over each record list.
+
+    Leads are meeting requests plus saved leads whose email was not in a
+    meeting request on the same day, as in ``collect_metrics``.
+
+    Returns:
+        Tuple of (first day of each bucket, series of counts per metric)
+    """
+    starts = bucket_starts(start, end, granularity)
+    first, buckets = starts[0], len(starts)
+    start_day, end_day = (start - EPOCH).days, (end - EPOCH).days
+
+    interaction_days = epoch_days(interactions, "timestamp")
+    types = np.array([i.get("type") for i in interactions], dtype=object)
+    is_lead = types == LEAD_INTERACTION_TYPE
+    is_question = np.array([bool(question_text(i)) for i in interactions], dtype=bool)
+
+    # Saved leads only add emails not already seen in that day's meeting requests
+    seen = {
+        (int(day), normalize_email(i.get("customer_email", "")))
+        for day, i, lead in zip(interaction_days, interactions, is_lead)
+        if lead
+    }
+    lead_days = []
+    for day, lead in zip(epoch_days(leads, "timestamp"), leads):
+        key = (int(day), normalize_email(lead.get("email", "")))
+        if start_day <= day <= end_day and key not in seen:
+            seen.add(key)
+            lead_days.append(day)
+
+    def count(days: np.ndarray) -> List[int]:
+        in_range = days[(days >= start_day) & (days <= end_day)]
+        return count_buckets(in_range, first, granularity, buckets).tolist()
+
+    series = {
+        "interactions_count": count(interaction_days),
+        "leads_count": [
+            meetings + saved
+            for meetings, saved in zip(
+                count(interaction_days[is_lead]),
+                count(np.array(lead_days, dtype=np.int64)),
+            )
+        ],
+        "questions_count": count(interaction_days[is_question]),
+        "marketing_assets_count": count(epoch_days(assets, "created_at")),
+    }
+    return starts, series
+
+
+def collect_metrics_range(
+    tool_context: ToolContext,
+    start_date: str,
+    end_date: str,
+    granularity: str = "day",
+) -> Dict[str, Any]:
+    """Collect performance metrics over a date range, bucketed by day, week or month.
+
+    Use this instead of calling collect_metrics once per day for weekly or
+    monthly reports: the range's interactions, leads and assets are read
+    once and counted per bucket.
+
+    Args:
+        tool_context: The context of the tool.
+        start_date: First day of the range (YYYY-MM-DD format).
+        end_date: Last day of the range, inclusive (YYYY-MM-DD format).
+        granularity: Bucket size: "day", "week" (starting on Monday) or "month".
+
+    Returns:
+        Dictionary with the first day of each bucket, a series of counts per
+        metric, range totals and the range's top questions
+    """
+    try:
+        user_id = tool_context._invocation_context.session.user_id
+
+        try:
+            start = datetime.strptime(start_date, "%Y-%m-%d").date()
+            end = datetime.strptime(end_date, "%Y-%m-%d").date()
+        except ValueError:
+            return {
+                "error": "Invalid date format. Use YYYY-MM-DD format.",
+                "success": False,
             }
+        if end < start:
+            return {"error": "end_date is before start_date", "success": False}
+        if granularity not in GRANULARITIES:
+            return {
+                "error": f"Invalid granularity: {granularity}. "
+                f"Use one of {', '.join(GRANULARITIES)}.",
+                "success": False,
+            }
+
+        # One storage-filtered read per record type for the whole range
+        range_start, range_end = day_bounds(start)[0], day_bounds(end)[1]
+        interactions = knowledge_base_service.get_customer_interactions(
+            user_id, start=range_start, end=range_end
         )
+        assets = knowledge_base_service.get_marketing_assets(
+            user_id, start=range_start, end=range_end
+        )
+        leads = lead_store.get_leads_between(user_id, start, end)
 
-        return metrics
+        starts, series = range_series(
+            interactions, assets, leads, start, end, granularity
+        )
+        # Near-duplicate questions are counted under their cluster's label
+        questions = Counter(
+            i.get(QUESTION_CLUSTER_FIELD) or question_text(i)
+            for i in interactions
+            if question_text(i)
+        )
+
+        return {
+            "start_date": start_date,
+            "end_date": end_date,
+            "granularity": granularity,
+            "buckets": [
+                day.strftime("%Y-%m" if granularity == "month" else "%Y-%m-%d")
+                for day in starts
+            ],
+            "series": series,
+            "totals": {metric: sum(counts) for metric, counts in series.items()},
+            "top_questions": [
+                {"question": q, "frequency": count}
+                for q, count in questions.most_common(TOP_QUESTIONS)
+            ],
+            "success": True,
+        }
 
     except Exception as e:
         return {
             "error": f"Failed to collect metrics: {str(e)}",
             "success": False,
-            "date": run_date or datetime.now(UTC).date().strftime("%Y-%m-%d"),
         }
@@ -12,12 +12,46 @@
 #   See the License for the specific language governing permissions and
 #   limitations under the License.
 
-from datetime import datetime
-from pathlib import Path
-from typing import Any, Dict
+from datetime import UTC, datetime
+from typing import Any, Dict, Optional
 
 from google.adk.tools import ToolContext
 
+from smallbizpal.shared.services.report_store import ReportStore, report_store
+
+
+def save_report(
+    user_id: str,
+    markdown_content: str,
+    report_date: str,
+    store: Optional[ReportStore] = None,
+) -> Dict[str, Any]:
+    """Write a user's report of a day, stamped with its generation time.
+
+    Args:
+        user_id: The ID of the user.
+        markdown_content: The report's markdown content
+        report_date: Date of the report in YYYY-MM-DD format
+        store: Report store to write to (default: the shared store)
+
+    Returns:
+        The report's index entry
+    """
+    store = store or report_store
+    filename = f"{report_date}_report.md"
+
+    # Add generation timestamp to the report
+    generated_at = datetime.now(UTC)
+    timestamp = generated_at.strftime("%Y-%m-%d %H:%M:%S UTC")
+    report_with_timestamp = (
+        f"{markdown_content.strip()}\n\n---\n*Report generated on {timestamp}*\n"
+    )
+
+    # Write the report and record it in the user's report index
+    return store.save(
+        user_id, filename, report_with_timestamp, generated_at.isoformat()
+    )
+
 
 def store_report(
     markdown_content: str, report_date: str, tool_context: ToolContext
@@ -60,30 +94,15 @@ def store_report(
                 "file_path": None,
             }
 
-        # Create user-specific reports directory if it doesn't exist
-        reports_dir = Path("data") / user_id / "reports"
-        reports_dir.mkdir(parents=True, exist_ok=True)
-
-        # Generate filename
-        filename = f"{report_date}_report.md"
-        file_path = reports_dir / filename
-
-        # Add generation timestamp to the report
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S UTC")
-        report_with_timestamp = (
-            f"{markdown_content.strip()}\n\n---\n*Report generated on {timestamp}*\n"
-        )
-
-        # Write the report to file
-        with open(file_path, "w", encoding="utf-8") as f:
-            f.write(report_with_timestamp)
+        entry = save_report(user_id, markdown_content, report_date)
+        file_path = report_store.base_storage_path / user_id / entry["path"]
 
         return {
             "success": True,
             "file_path": str(file_path),
-            "filename": filename,
+            "filename": entry["filename"],
             "message": f"Report successfully saved to {file_path}",
-            "size_bytes": len(report_with_timestamp.encode("utf-8")),
+            "size_bytes": entry["size_bytes"],
         }
 
     except Exception as e:
@@ -42,7 +42,16 @@ from .settings import (
     DEBUG,
     DEFAULT_AGENT_TIMEOUT,
     GOOGLE_API_KEY,
+    KNOWLEDGE_BASE_ANSWER_CACHE_SIZE,
+    KNOWLEDGE_BASE_ANSWER_CACHE_TTL_SECONDS,
+    KNOWLEDGE_BASE_BACKEND,
+    KNOWLEDGE_BASE_CACHE_BYTES,
     KNOWLEDGE_BASE_FILE,
+    KNOWLEDGE_BASE_FLUSH_INTERVAL_SECONDS,
+    KNOWLEDGE_BASE_FLUSH_MAX_OPERATIONS,
+    KNOWLEDGE_BASE_FORMAT,
+    KNOWLEDGE_BASE_IO_CONCURRENCY,
+    KNOWLEDGE_BASE_WRITE_BEHIND,
     MAX_AGENT_ITERATIONS,
     validate_settings,
 )
@@ -55,6 +64,15 @@ __all__ = [
     "DEBUG",
     "DATA_DIRECTORY",
     "KNOWLEDGE_BASE_FILE",
+    "KNOWLEDGE_BASE_BACKEND",
+    "KNOWLEDGE_BASE_CACHE_BYTES",
+    "KNOWLEDGE_BASE_FORMAT",
+    "KNOWLEDGE_BASE_IO_CONCURRENCY",
+    "KNOWLEDGE_BASE_WRITE_BEHIND",
+    "KNOWLEDGE_BASE_FLUSH_MAX_OPERATIONS",
+    "KNOWLEDGE_BASE_FLUSH_INTERVAL_SECONDS",
+    "KNOWLEDGE_BASE_ANSWER_CACHE_SIZE",
+    "KNOWLEDGE_BASE_ANSWER_CACHE_TTL_SECONDS",
     "ADK_WEB_PORT",
     "ADK_LOG_LEVEL",
     "DEFAULT_AGENT_TIMEOUT",
@@ -26,6 +26,43 @@ DEBUG = os.getenv("DEBUG", "false").lower() == "true"
 # Storage Settings
 DATA_DIRECTORY = os.getenv("DATA_DIRECTORY", "data")
 KNOWLEDGE_BASE_FILE = os.path.join(DATA_DIRECTORY, "knowledge_base.json")
+# Knowledge base storage backend: "json" (one JSON file per section per user),
+# "append_only" (one JSONL segment per section per user), "partitioned"
+# (append_only with assets and interactions split into one segment per UTC day)
+# or "sqlite" (indexed tables in DATA_DIRECTORY/knowledge_base.sqlite3). The
+# segment and SQLite backends import data stored by the other file backends the
+# first time each user is accessed.
+KNOWLEDGE_BASE_BACKEND = os.getenv("KNOWLEDGE_BASE_BACKEND", "json")
+# Byte budget of the in-process cache of parsed knowledge base files (0 disables)
+KNOWLEDGE_BASE_CACHE_BYTES = int(
+    os.getenv("KNOWLEDGE_BASE_CACHE_BYTES", str(64 * 1024 * 1024))
+)
+# Maximum number of knowledge base operations the async facade runs at once
+KNOWLEDGE_BASE_IO_CONCURRENCY = int(os.getenv("KNOWLEDGE_BASE_IO_CONCURRENCY", "8"))
+# Encoding of knowledge base files: "json" (indented), "compact" (minified JSON,
+# orjson-accelerated when installed) or "msgpack" (requires msgpack). Files in
+# any format are read regardless of this setting.
+KNOWLEDGE_BASE_FORMAT = os.getenv("KNOWLEDGE_BASE_FORMAT", "json")
+# Buffer knowledge base writes in memory and store them in groups
+KNOWLEDGE_BASE_WRITE_BEHIND = (
+    os.getenv("KNOWLEDGE_BASE_WRITE_BEHIND", "false").lower() == "true"
+)
+# Buffered operations per user that trigger a write-behind flush
+KNOWLEDGE_BASE_FLUSH_MAX_OPERATIONS = int(
+    os.getenv("KNOWLEDGE_BASE_FLUSH_MAX_OPERATIONS", "100")
+)
+# Seconds between background write-behind flushes
+KNOWLEDGE_BASE_FLUSH_INTERVAL_SECONDS = float(
+    os.getenv("KNOWLEDGE_BASE_FLUSH_INTERVAL_SECONDS", "1.0")
+)
+# Cached customer questions per user in the answer cache (0 disables it)
+KNOWLEDGE_BASE_ANSWER_CACHE_SIZE = int(
+    os.getenv("KNOWLEDGE_BASE_ANSWER_CACHE_SIZE", "256")
+)
+# Seconds a cached answer stays valid if the profile is not updated
+KNOWLEDGE_BASE_ANSWER_CACHE_TTL_SECONDS = float(
+    os.getenv("KNOWLEDGE_BASE_ANSWER_CACHE_TTL_SECONDS", "300")
+)
 
 # ADK Settings
 ADK_WEB_PORT = int(os.getenv("ADK_WEB_PORT", "8000"))
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Epoch Timestamp Backfill Script
+
+Adds the integer epoch-millis timestamp fields (``created_at_ms`` on
+marketing assets, ``timestamp_ms`` on customer interactions and leads) to
+records stored before they were written at store time. Original timestamp
+strings are kept, records keep their positions, and records that already
+have the field are left unchanged, so the script can be re-run safely.
+
+Usage:
+    python smallbizpal/scripts/backfill_epoch_timestamps.py [data_dir]
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+# Add the project root to the Python path
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from smallbizpal.config.settings import DATA_DIRECTORY  # noqa: E402
+from smallbizpal.shared.services.knowledge_base import (  # noqa: E402
+    create_knowledge_base_service,
+)
+from smallbizpal.shared.services.lead_store import LeadStore  # noqa: E402
+
+
+def main():
+    """Main backfill function."""
+    parser = argparse.ArgumentParser(
+        description="Add epoch-millis timestamps to stored records"
+    )
+    parser.add_argument("data_dir", nargs="?", default=DATA_DIRECTORY)
+    args = parser.parse_args()
+
+    data_dir = Path(args.data_dir)
+    if not data_dir.is_dir():
+        print(f"❌ Data directory not found: {data_dir}")
+        sys.exit(1)
+
+    kb_service = create_knowledge_base_service(base_storage_path=str(data_dir))
+    leads = LeadStore(base_storage_path=str(data_dir))
+    users = total = 0
+    for user_dir in sorted(p for p in data_dir.iterdir() if p.is_dir()):
+        user_id = user_dir.name
+        records = kb_service.backfill_epoch_timestamps(user_id)
+        lead_count = leads.backfill_epoch_timestamps(user_id)
+        users += 1
+        total += records + lead_count
+        print(f"  ✅ {user_id}: {records} record(s), {lead_count} lead(s) updated")
+    kb_service.close()
+
+    print(f"\nBackfilled {total} record(s) across {users} user(s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Knowledge Base Storage Migration Script
+
+Re-encodes every knowledge base document in a data directory, in place, to
+the requested on-disk format ("json", "compact" or "msgpack"). Files are
+detected and decoded whatever format they are currently in, and each one is
+replaced atomically, so the script can be re-run safely.
+
+Usage:
+    python smallbizpal/scripts/migrate_storage.py --format compact [data_dir]
+"""
+
+import argparse
+import sys
+from pathlib import Path
+from typing import Iterator, Tuple
+
+# Add the project root to the Python path
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from smallbizpal.config.settings import DATA_DIRECTORY  # noqa: E402
+from smallbizpal.shared.services.knowledge_base import (  # noqa: E402
+    LEGACY_FILE_NAME,
+    empty_knowledge_base,
+    write_file_atomic,
+)
+from smallbizpal.shared.services.serializers import (  # noqa: E402
+    SERIALIZERS,
+    Serializer,
+    decode_document,
+    get_serializer,
+)
+
+# Whole-document knowledge base files, relative to a user's directory
+DOCUMENT_FILES = (
+    *(f"{section}.json" for section in empty_knowledge_base()),
+    LEGACY_FILE_NAME,
+    "segments/business_profile.json",
+    "segments/profile_meta.json",
+)
+
+
+def iter_documents(data_dir: Path) -> Iterator[Path]:
+    """Yield every knowledge base document file in a data directory."""
+    for user_dir in sorted(p for p in data_dir.iterdir() if p.is_dir()):
+        for name in DOCUMENT_FILES:
+            path = user_dir / name
+            if path.is_file():
+                yield path
+
+
+def migrate_file(path: Path, serializer: Serializer) -> Tuple[int, int]:
+    """Re-encode one file in place.
+
+    Returns:
+        Tuple of (size before, size after) in bytes
+    """
+    raw = path.read_bytes()
+    encoded = serializer.encode(decode_document(raw))
+    write_file_atomic(path, encoded)
+    return len(raw), len(encoded)
+
+
+def main():
+    """Main migration function."""
+    parser = argparse.ArgumentParser(description="Convert knowledge base files")
+    parser.add_argument("data_dir", nargs="?", default=DATA_DIRECTORY)
+    parser.add_argument("--format", required=True, choices=sorted(SERIALIZERS))
+    args = parser.parse_args()
+
+    try:
+        serializer = get_serializer(args.format)
+    except ImportError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+
+    data_dir = Path(args.data_dir)
+    if not data_dir.is_dir():
+        print(f"❌ Data directory not found: {data_dir}")
+        sys.exit(1)
+
+    total_before = total_after = migrated = failed = 0
+    for path in iter_documents(data_dir):
+        try:
+            before, after = migrate_file(path, serializer)
+        except ValueError as e:
+            print(f"  ❌ {path}: {e}")
+            failed += 1
+            continue
+        print(f"  ✅ {path}: {before} -> {after} bytes")
+        total_before += before
+        total_after += after
+        migrated += 1
+
+    print(
+        f"\nMigrated {migrated} file(s) to '{args.format}': "
+        f"{total_before} -> {total_after} bytes"
+    )
+    if failed:
+        print(f"❌ {failed} file(s) could not be decoded and were left unchanged")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
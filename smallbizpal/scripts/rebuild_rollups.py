@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Daily Rollup Rebuild Script
+
+Recomputes every user's daily metric rollups from the raw interactions,
+marketing assets and leads, compares them with the stored rollups, and
+replaces the stored rollups with the recomputed ones. With ``--check`` the
+stored rollups are only verified and left unchanged.
+
+Usage:
+    python smallbizpal/scripts/rebuild_rollups.py [--check] [data_dir]
+"""
+
+import argparse
+import sys
+from datetime import date
+from pathlib import Path
+from typing import Any, Dict
+
+# Add the project root to the Python path
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from smallbizpal.config.settings import DATA_DIRECTORY  # noqa: E402
+from smallbizpal.shared.services.knowledge_base import (  # noqa: E402
+    KnowledgeBaseService,
+    create_knowledge_base_service,
+)
+from smallbizpal.shared.services.lead_store import LeadStore  # noqa: E402
+from smallbizpal.shared.services.rollups import (  # noqa: E402
+    compute_rollups,
+    verify_rollups,
+)
+
+
+def stored_rollups(
+    kb_service: KnowledgeBaseService, user_id: str
+) -> Dict[str, Dict[str, Any]]:
+    """Read every stored rollup of a user, keyed by day."""
+    rollups = kb_service.rollups
+    return {
+        day: rollups.get(user_id, date.fromisoformat(day))
+        for day in rollups.days(user_id)
+    }
+
+
+def main():
+    """Main rebuild function."""
+    parser = argparse.ArgumentParser(description="Rebuild daily metric rollups")
+    parser.add_argument("data_dir", nargs="?", default=DATA_DIRECTORY)
+    parser.add_argument(
+        "--check",
+        action="store_true",
+        help="only verify the stored rollups, without replacing them",
+    )
+    args = parser.parse_args()
+
+    data_dir = Path(args.data_dir)
+    if not data_dir.is_dir():
+        print(f"❌ Data directory not found: {data_dir}")
+        sys.exit(1)
+
+    kb_service = create_knowledge_base_service(base_storage_path=str(data_dir))
+    leads = LeadStore(base_storage_path=str(data_dir))
+    users = mismatched_users = 0
+    for user_dir in sorted(p for p in data_dir.iterdir() if p.is_dir()):
+        user_id = user_dir.name
+        expected = compute_rollups(
+            kb_service.get_customer_interactions(user_id),
+            kb_service.get_marketing_assets(user_id),
+            leads.get_leads(user_id),
+        )
+        mismatched = verify_rollups(stored_rollups(kb_service, user_id), expected)
+        users += 1
+        if mismatched:
+            mismatched_users += 1
+            print(f"  ⚠️  {user_id}: {len(mismatched)} day(s) differ: {mismatched}")
+        else:
+            print(f"  ✅ {user_id}: {len(expected)} day(s) match")
+        if args.check:
+            continue
+        kb_service.rollups.replace(user_id, expected)
+        if verify_rollups(stored_rollups(kb_service, user_id), expected):
+            print(f"  ❌ {user_id}: rebuilt rollups do not verify")
+            sys.exit(1)
+    kb_service.close()
+
+    action = "Checked" if args.check else "Rebuilt"
+    print(f"\n{action} rollups of {users} user(s); {mismatched_users} had drifted")
+    if args.check and mismatched_users:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Nightly Report Batch Runner
+
+Generates the daily performance report of every tenant in a data directory,
+in parallel worker processes. Progress is checkpointed after each tenant,
+so re-running the same command after an interruption (or after failures)
+only processes the tenants that are not done yet.
+
+Usage:
+    python smallbizpal/scripts/run_nightly_reports.py [--date YYYY-MM-DD]
+        [--workers N] [--renderer template|agent] [--checkpoint PATH] [data_dir]
+"""
+
+import argparse
+import sys
+from datetime import UTC, date, datetime, timedelta
+from pathlib import Path
+
+# Add the project root to the Python path
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from smallbizpal.agents.performance_reporting.batch import (  # noqa: E402
+    RENDERERS,
+    run_batch,
+)
+from smallbizpal.config.settings import DATA_DIRECTORY  # noqa: E402
+
+
+def main():
+    """Main batch function."""
+    parser = argparse.ArgumentParser(description="Generate every tenant's report")
+    parser.add_argument("data_dir", nargs="?", default=DATA_DIRECTORY)
+    parser.add_argument(
+        "--date",
+        type=date.fromisoformat,
+        default=datetime.now(UTC).date() - timedelta(days=1),
+        help="day to report (default: yesterday, UTC)",
+    )
+    parser.add_argument(
+        "--workers", type=int, default=None, help="worker processes (default: CPUs)"
+    )
+    parser.add_argument("--renderer", choices=RENDERERS, default="template")
+    parser.add_argument("--checkpoint", type=Path, default=None)
+    args = parser.parse_args()
+
+    data_dir = Path(args.data_dir)
+    if not data_dir.is_dir():
+        print(f"❌ Data directory not found: {data_dir}")
+        sys.exit(1)
+
+    def progress(user_id, result):
+        if result["status"] == "done":
+            print(f"  ✅ {user_id}: {result['filename']} ({result['seconds']}s)")
+        else:
+            print(f"  ❌ {user_id}: {result['error']}")
+
+    summary = run_batch(
+        data_dir,
+        args.date,
+        workers=args.workers,
+        renderer=args.renderer,
+        checkpoint=args.checkpoint,
+        progress=progress,
+    )
+
+    print(
+        f"\nReports for {summary['date']}: {summary['generated']} generated, "
+        f"{summary['skipped']} already done, {summary['failed']} failed "
+        f"of {summary['tenants']} tenant(s)"
+    )
+    print(
+        f"{summary['elapsed_seconds']}s with {summary['workers']} worker(s): "
+        f"{summary['reports_per_second']} reports/s, "
+        f"{summary['bytes_written']} bytes written"
+    )
+    print(f"Checkpoint: {summary['checkpoint']}")
+    if summary["failed"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
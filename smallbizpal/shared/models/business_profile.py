@@ -12,10 +12,140 @@
 #   See the License for the specific language governing permissions and
 #   limitations under the License.
 
+import re
+from bisect import bisect_left
 from datetime import datetime
-from typing import Any, Dict, List
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
+
+from pydantic import BaseModel, Field, PrivateAttr
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text: str) -> List[str]:
+    """Split text into lowercase alphanumeric tokens."""
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+def _iter_text(value: Any) -> Iterator[str]:
+    """Yield the keys and scalar values of a nested value as text."""
+    if isinstance(value, dict):
+        for key, item in value.items():
+            yield str(key)
+            yield from _iter_text(item)
+    elif isinstance(value, (list, tuple, set)):
+        for item in value:
+            yield from _iter_text(item)
+    elif value is not None:
+        yield str(value)
+
+
+class ProfileSearchIndex:
+    """Inverted token index over the keys and flattened values of a profile.
+
+    Each token maps to the fields whose key or value contains it. Query
+    tokens match indexed tokens by prefix ("coff" finds "coffee"), looked up
+    with a binary search over the sorted vocabulary.
+    """
+
+    def __init__(self) -> None:
+        # token -> fields whose key contains it / whose value contains it
+        self.key_postings: Dict[str, Set[str]] = {}
+        self.value_postings: Dict[str, Set[str]] = {}
+        self.field_tokens: Dict[str, Tuple[Set[str], Set[str]]] = {}
+        self.field_order: Dict[str, int] = {}
+        self._vocabulary: Optional[List[str]] = None
+
+    def update_field(self, key: str, value: Any) -> None:
+        """Index (or re-index) one field."""
+        self.remove_field(key)
+        key_tokens = set(tokenize(key))
+        value_tokens = {t for text in _iter_text(value) for t in tokenize(text)}
+        for token in key_tokens:
+            self.key_postings.setdefault(token, set()).add(key)
+        for token in value_tokens:
+            self.value_postings.setdefault(token, set()).add(key)
+        self.field_tokens[key] = (key_tokens, value_tokens)
+        self.field_order.setdefault(key, len(self.field_order))
+        self._vocabulary = None
+
+    def remove_field(self, key: str) -> None:
+        """Drop a field's tokens from the index."""
+        if key not in self.field_tokens:
+            return
+        key_tokens, value_tokens = self.field_tokens.pop(key)
+        for postings, tokens in (
+            (self.key_postings, key_tokens),
+            (self.value_postings, value_tokens),
+        ):
+            for token in tokens:
+                fields = postings.get(token)
+                if fields is not None:
+                    fields.discard(key)
+                    if not fields:
+                        del postings[token]
+        self._vocabulary = None
+
+    def _matching_tokens(self, prefix: str) -> Iterator[str]:
+        if self._vocabulary is None:
+            self._vocabulary = sorted(self.key_postings.keys() | self.value_postings)
+        start = bisect_left(self._vocabulary, prefix)
+        for token in self._vocabulary[start:]:
+            if not token.startswith(prefix):
+                break
+            yield token
+
+    def _lookup(self, prefix: str) -> Tuple[Set[str], Set[str]]:
+        """Get the fields matching a query token by key and by value."""
+        key_fields: Set[str] = set()
+        value_fields: Set[str] = set()
+        for token in self._matching_tokens(prefix):
+            key_fields |= self.key_postings.get(token, set())
+            value_fields |= self.value_postings.get(token, set())
+        return key_fields, value_fields
+
+    def search(
+        self, search_terms: List[str], match_all: bool = False
+    ) -> List[Tuple[str, float]]:
+        """Rank fields by how well they match the search terms.
+
+        A term matches a field when every token of the term is found in the
+        field's key or value. Fields score one point per matching term, plus
+        half a point per term found in the key.
 
-from pydantic import BaseModel, Field
+        Args:
+            search_terms: Terms to look up
+            match_all: Only return fields matching every term
+
+        Returns:
+            (field, score) pairs, best first; ties keep field order
+        """
+        scores: Dict[str, float] = {}
+        matched_terms: Dict[str, int] = {}
+        terms = [tokens for tokens in map(tokenize, search_terms) if tokens]
+        for tokens in terms:
+            term_fields: Optional[Set[str]] = None
+            term_key_fields: Optional[Set[str]] = None
+            for token in tokens:
+                key_fields, value_fields = self._lookup(token)
+                fields = key_fields | value_fields
+                term_fields = fields if term_fields is None else term_fields & fields
+                term_key_fields = (
+                    key_fields
+                    if term_key_fields is None
+                    else term_key_fields & key_fields
+                )
+            for field in term_fields or ():
+                matched_terms[field] = matched_terms.get(field, 0) + 1
+                scores[field] = scores.get(field, 0.0) + 1.0
+                if field in (term_key_fields or ()):
+                    scores[field] += 0.5
+
+        if match_all:
+            scores = {f: s for f, s in scores.items() if matched_terms[f] == len(terms)}
+        return sorted(
+            scores.items(), key=lambda item: (-item[1], self.field_order[item[0]])
+        )
 
 
 class BusinessProfile(BaseModel):
@@ -34,6 +164,9 @@ class BusinessProfile(BaseModel):
         default=0, description="Number of times profile has been updated"
     )
 
+    # Search index, built on the first search and maintained by update_data
+    _search_index: Optional[ProfileSearchIndex] = PrivateAttr(default=None)
+
     def update_data(self, new_data: Dict[str, Any]) -> None:
         """Update business data with new information.
 
@@ -41,6 +174,9 @@ class BusinessProfile(BaseModel):
             new_data: Dictionary with any business information
         """
         self.data.update(new_data)
+        if self._search_index is not None:
+            for key, value in new_data.items():
+                self._search_index.update_field(key, value)
         self.updated_at = datetime.now()
         self.total_updates += 1
 
@@ -52,29 +188,31 @@ class BusinessProfile(BaseModel):
         """
         return self.data.copy()
 
-    def search_data(self, search_terms: List[str]) -> Dict[str, Any]:
+    def search_data(
+        self, search_terms: List[str], match_all: bool = False
+    ) -> Dict[str, Any]:
         """Search for data containing specific terms.
 
         Args:
             search_terms: List of terms to search for in keys or values
+            match_all: Only return fields matching every term
 
         Returns:
-            Dictionary of matching key-value pairs
+            Dictionary of matching key-value pairs, best matches first
         """
-        results = {}
-        search_terms_lower = [term.lower() for term in search_terms]
-
-        for key, value in self.data.items():
-            key_lower = key.lower()
-            value_str = str(value).lower()
-
-            # Check if any search term appears in key or value
-            if any(
-                term in key_lower or term in value_str for term in search_terms_lower
-            ):
-                results[key] = value
+        return {
+            key: self.data[key]
+            for key, _ in self.get_search_index().search(search_terms, match_all)
+        }
 
-        return results
+    def get_search_index(self) -> ProfileSearchIndex:
+        """Get the token index of the profile data, building it if needed."""
+        if self._search_index is None:
+            index = ProfileSearchIndex()
+            for key, value in self.data.items():
+                index.update_field(key, value)
+            self._search_index = index
+        return self._search_index
 
     def get_summary(self) -> Dict[str, Any]:
         """Get a summary of the business profile.
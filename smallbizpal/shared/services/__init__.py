@@ -12,6 +12,72 @@
 #   See the License for the specific language governing permissions and
 #   limitations under the License.
 
-from .knowledge_base import KnowledgeBaseService, knowledge_base_service
+from .answer_cache import AnswerCache, answer_cache
+from .append_only_knowledge_base import AppendOnlyKnowledgeBaseService
+from .async_knowledge_base import (
+    AsyncKnowledgeBaseService,
+    async_knowledge_base_service,
+)
+from .embeddings import Encoder, HashingEncoder
+from .export import EXPORT_DATASETS, export_records, ndjson_lines
+from .faq import FAQMatcher, build_faq
+from .knowledge_base import (
+    KnowledgeBaseService,
+    KnowledgeBaseTransaction,
+    create_knowledge_base_service,
+    knowledge_base_service,
+)
+from .lead_store import LeadStore, lead_store
+from .partitioned_knowledge_base import PartitionedKnowledgeBaseService
+from .question_clusters import QuestionClusterStore
+from .report_store import ReportStore, report_store
+from .retrieval import (
+    BM25Index,
+    HybridRetriever,
+    KnowledgeRetriever,
+    VectorIndex,
+    VectorRetriever,
+    hybrid_retriever,
+    knowledge_retriever,
+    vector_retriever,
+)
+from .serializers import Serializer, get_serializer
+from .sqlite_knowledge_base import SQLiteKnowledgeBaseService
+from .write_behind import WriteBehindBuffer
 
-__all__ = ["knowledge_base_service", "KnowledgeBaseService"]
+__all__ = [
+    "knowledge_base_service",
+    "KnowledgeBaseService",
+    "KnowledgeBaseTransaction",
+    "AppendOnlyKnowledgeBaseService",
+    "PartitionedKnowledgeBaseService",
+    "SQLiteKnowledgeBaseService",
+    "create_knowledge_base_service",
+    "AsyncKnowledgeBaseService",
+    "async_knowledge_base_service",
+    "WriteBehindBuffer",
+    "BM25Index",
+    "KnowledgeRetriever",
+    "knowledge_retriever",
+    "Encoder",
+    "HashingEncoder",
+    "VectorIndex",
+    "VectorRetriever",
+    "vector_retriever",
+    "HybridRetriever",
+    "hybrid_retriever",
+    "FAQMatcher",
+    "build_faq",
+    "AnswerCache",
+    "answer_cache",
+    "EXPORT_DATASETS",
+    "export_records",
+    "ndjson_lines",
+    "LeadStore",
+    "lead_store",
+    "QuestionClusterStore",
+    "ReportStore",
+    "report_store",
+    "Serializer",
+    "get_serializer",
+]
@@ -0,0 +1,168 @@
+#   Copyright 2025 Akshat Deepak Joshi
+
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+
+#       http://www.apache.org/licenses/LICENSE-2.0
+
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from smallbizpal.config.settings import (
+    KNOWLEDGE_BASE_ANSWER_CACHE_SIZE,
+    KNOWLEDGE_BASE_ANSWER_CACHE_TTL_SECONDS,
+)
+from smallbizpal.shared.models.business_profile import tokenize
+
+
+def normalize_query(query: str) -> str:
+    """Normalize a question so trivially different phrasings share a key.
+
+    Case, punctuation and whitespace are ignored: "Are you open Sunday?" and
+    "are you open sunday" normalize to the same text.
+    """
+    return " ".join(tokenize(query))
+
+
+class _TenantAnswers:
+    """Cached answers of one user, all computed at one profile version."""
+
+    def __init__(self, version: int) -> None:
+        self.version = version
+        self.entries: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+
+class AnswerCache:
+    """Per-user cache of knowledge base answers to customer questions.
+
+    Entries are keyed by normalized question text and tagged with the
+    profile version they were computed at. A lookup at a newer version drops
+    the user's whole cache, so a profile update invalidates every answer at
+    once. Entries also expire after ``ttl_seconds``, which bounds how long an
+    answer can miss data that does not bump the profile version (such as new
+    marketing assets). Each user keeps at most ``max_entries`` answers, and at
+    most ``max_users`` users are cached, least recently used first out.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 256,
+        ttl_seconds: float = 300.0,
+        max_users: int = 1024,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """Initialize the cache.
+
+        Args:
+            max_entries: Cached answers per user (0 disables the cache)
+            ttl_seconds: Seconds an answer stays valid
+            max_users: Users with cached answers
+            clock: Time source, in seconds
+        """
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.max_users = max_users
+        self.clock = clock
+        self.invalidations = 0
+        self.evictions = 0
+        self._tenants: "OrderedDict[str, _TenantAnswers]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0
+
+    def get(self, user_id: str, query: str, version: int) -> Optional[str]:
+        """Return the cached answer to a question at a profile version."""
+        if not self.enabled:
+            return None
+        key = normalize_query(query)
+        with self._lock:
+            tenant = self._tenant(user_id, version)
+            entry = tenant.entries.get(key)
+            if entry is None or entry[0] <= self.clock():
+                if entry is not None:
+                    del tenant.entries[key]
+                tenant.misses += 1
+                return None
+            tenant.entries.move_to_end(key)
+            tenant.hits += 1
+            return entry[1]
+
+    def put(self, user_id: str, query: str, version: int, answer: str) -> None:
+        """Cache the answer to a question computed at a profile version."""
+        if not self.enabled:
+            return
+        key = normalize_query(query)
+        with self._lock:
+            tenant = self._tenant(user_id, version)
+            if tenant.version != version:
+                # Computed against an older profile than the cache holds
+                return
+            tenant.entries[key] = (self.clock() + self.ttl_seconds, answer)
+            tenant.entries.move_to_end(key)
+            while len(tenant.entries) > self.max_entries:
+                tenant.entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, user_id: str) -> None:
+        """Drop every cached answer of a user."""
+        with self._lock:
+            if self._tenants.pop(user_id, None) is not None:
+                self.invalidations += 1
+
+    def stats(self, user_id: Optional[str] = None) -> Dict[str, Any]:
+        """Get hit/miss counters, for one user or summed over every user."""
+        with self._lock:
+            if user_id is not None:
+                tenants = [self._tenants[user_id]] if user_id in self._tenants else []
+            else:
+                tenants = list(self._tenants.values())
+            hits = sum(tenant.hits for tenant in tenants)
+            misses = sum(tenant.misses for tenant in tenants)
+            lookups = hits + misses
+            stats = {
+                "hits": hits,
+                "misses": misses,
+                "hit_ratio": hits / lookups if lookups else 0.0,
+                "entries": sum(len(tenant.entries) for tenant in tenants),
+            }
+            if user_id is None:
+                stats.update(
+                    users=len(tenants),
+                    invalidations=self.invalidations,
+                    evictions=self.evictions,
+                )
+            return stats
+
+    def _tenant(self, user_id: str, version: int) -> _TenantAnswers:
+        """Get a user's answers, dropping them if the profile has moved on."""
+        tenant = self._tenants.get(user_id)
+        if tenant is None:
+            tenant = self._tenants[user_id] = _TenantAnswers(version)
+            while len(self._tenants) > self.max_users:
+                self._tenants.popitem(last=False)
+        elif version > tenant.version:
+            tenant.entries.clear()
+            tenant.version = version
+            self.invalidations += 1
+        self._tenants.move_to_end(user_id)
+        return tenant
+
+
+# Global answer cache of the customer engagement agent
+answer_cache = AnswerCache(
+    max_entries=KNOWLEDGE_BASE_ANSWER_CACHE_SIZE,
+    ttl_seconds=KNOWLEDGE_BASE_ANSWER_CACHE_TTL_SECONDS,
+)
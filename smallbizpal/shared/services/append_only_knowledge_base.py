@@ -0,0 +1,245 @@
+#   Copyright 2025 Akshat Deepak Joshi
+
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+
+#       http://www.apache.org/licenses/LICENSE-2.0
+
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+import json
+import os
+import shutil
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
+
+from smallbizpal.shared.models.business_profile import BusinessProfile
+
+from .knowledge_base import (
+    PROFILE_SECTIONS,
+    RECORD_SECTIONS,
+    KnowledgeBaseService,
+    Operation,
+    empty_knowledge_base,
+    file_version,
+    group_operations,
+    json_serializer,
+    write_file_atomic,
+)
+from .serializers import decode_document
+
+
+class AppendOnlyKnowledgeBaseService(KnowledgeBaseService):
+    """Knowledge base that stores each section in its own append-only segment.
+
+    Layout per user::
+
+        data/<user_id>/segments/business_profile.json  (service serializer)
+        data/<user_id>/segments/profile_meta.json      (service serializer)
+        data/<user_id>/segments/marketing_assets.jsonl
+        data/<user_id>/segments/customer_interactions.jsonl
+        data/<user_id>/segments/performance_data.jsonl
+
+    Storing an asset, interaction or metric appends a single line to the
+    matching segment instead of rewriting the whole knowledge base; a
+    transaction appends all of its records per segment in one write. Reads
+    replay the segment; for ``performance_data`` the last entry for a metric
+    wins. Data stored by the default backend (section files or a legacy
+    ``knowledge_base.json``) is converted into segments the first time a
+    user is accessed.
+
+    With caching enabled, an append caches a copy of the segment's replay
+    extended by the new entries, so reads after writes do not re-parse the
+    segment.
+    """
+
+    def _get_segments_dir(self, user_id: str) -> Path:
+        """Get the segments directory for a user, migrating legacy data once."""
+        segments_dir = self.base_storage_path / user_id / "segments"
+        if not segments_dir.exists():
+            with self._user_lock(user_id):
+                if not segments_dir.exists():
+                    self._migrate_to_segments(user_id, segments_dir)
+        return segments_dir
+
+    def _migrate_to_segments(self, user_id: str, segments_dir: Path) -> None:
+        """Convert the sections stored by the default backend into segments.
+
+        Segments are written to a temporary directory that is renamed into
+        place, so a crash mid-way leaves no partial ``segments/`` directory
+        and the migration runs again on the next access.
+        """
+        # Sections stored by the default backend (including a legacy file)
+        legacy_data = KnowledgeBaseService._load_data(self, user_id)
+        tmp_dir = segments_dir.with_name(
+            f"{segments_dir.name}.{os.getpid()}.{threading.get_ident()}.tmp"
+        )
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        tmp_dir.mkdir(parents=True)
+        for section in empty_knowledge_base():
+            write_file_atomic(
+                tmp_dir / self._segment_file_name(section),
+                self._encode_segment(section, legacy_data[section]),
+            )
+        try:
+            tmp_dir.rename(segments_dir)
+        except OSError:
+            # Another process migrated the user first
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    def _has_stored_files(self, user_dir: Path) -> bool:
+        # Users not migrated yet still have the default backend's files
+        return (user_dir / "segments").is_dir() or super()._has_stored_files(user_dir)
+
+    def _segment_file_name(self, section: str) -> str:
+        """Get the name of the file holding a section's segment."""
+        suffix = ".json" if section in PROFILE_SECTIONS else ".jsonl"
+        return f"{section}{suffix}"
+
+    def _get_segment_path(self, user_id: str, section: str) -> Path:
+        """Get the file holding a section's segment for a user."""
+        return self._get_segments_dir(user_id) / self._segment_file_name(section)
+
+    def _encode_segment(self, section: str, value: Any) -> Union[str, bytes]:
+        """Encode the full contents of a section as its segment file."""
+        if section in PROFILE_SECTIONS:
+            return self.serializer.encode(value)
+        if section in RECORD_SECTIONS:
+            records: List[Any] = list(value)
+        else:
+            records = [{"key": key, "value": item} for key, item in value.items()]
+        return "".join(
+            json.dumps(record, default=json_serializer) + "\n" for record in records
+        )
+
+    def _iter_segment(self, path: Path) -> Iterator[Dict[str, Any]]:
+        """Yield the records of a JSONL segment, skipping torn or invalid lines."""
+        if not path.exists():
+            return
+        with open(path, "r") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+
+    def _write_atomic(self, path: Path, content: Union[str, bytes]) -> None:
+        """Replace a file's contents without exposing a partial write."""
+        write_file_atomic(path, content)
+        self._invalidate_cached(path)
+
+    def _replay_entries(self, path: Path) -> Dict[str, Any]:
+        """Replay a keyed segment, keeping the last value written per key."""
+        entries: Dict[str, Any] = {}
+        for entry in self._iter_segment(path):
+            if "key" in entry:
+                entries[entry["key"]] = entry.get("value")
+        return entries
+
+    def _parse_profile(self, path: Path) -> Dict[str, Any]:
+        """Parse a profile snapshot, treating a corrupt file as empty."""
+        try:
+            return decode_document(path.read_bytes())
+        except ValueError:
+            return {}
+
+    def _load_data(self, user_id: str) -> Dict[str, Any]:
+        """Assemble the full knowledge base from the user's segments."""
+        return {
+            section: self._read_section(user_id, section)
+            for section in empty_knowledge_base()
+        }
+
+    def _save_data(self, user_id: str, data: Dict[str, Any]) -> None:
+        """Rewrite (compact) every section segment from a full data dictionary."""
+        for section in empty_knowledge_base():
+            self._write_section(
+                user_id, section, data.get(section, empty_knowledge_base()[section])
+            )
+
+    def _read_section(self, user_id: str, section: str) -> Any:
+        path = self._get_segment_path(user_id, section)
+        if section in PROFILE_SECTIONS:
+            value = self._read_cached(path, self._parse_profile)
+            return value if value is not None else {}
+        if section in RECORD_SECTIONS:
+            value = self._read_cached(path, lambda p: list(self._iter_segment(p)))
+            return value if value is not None else []
+        value = self._read_cached(path, self._replay_entries)
+        return value if value is not None else {}
+
+    def _section_version(self, user_id: str, section: str) -> str:
+        return file_version(self._get_segment_path(user_id, section))
+
+    def _iter_section(
+        self, user_id: str, section: str, after: Optional[int]
+    ) -> Iterator[Tuple[int, Dict[str, Any]]]:
+        # Segments are read line by line, and appends never move a record
+        path = self._get_segment_path(user_id, section)
+        for position, record in enumerate(self._iter_segment(path)):
+            if after is None or position > after:
+                yield position, record
+
+    def _write_section(self, user_id: str, section: str, value: Any) -> None:
+        path = self._get_segment_path(user_id, section)
+        self._write_atomic(path, self._encode_segment(section, value))
+
+    def _apply_batch(
+        self, user_id: str, operations: List[Operation]
+    ) -> Optional[BusinessProfile]:
+        profile_updates, appends, puts = group_operations(operations)
+        profile = None
+        if profile_updates:
+            profile = self._updated_profile(
+                self._read_section(user_id, "business_profile"), profile_updates
+            )
+            self._write_section(user_id, "business_profile", profile.model_dump())
+            self._write_section(
+                user_id, "profile_meta", self._updated_profile_meta(user_id, profile)
+            )
+        for section, records in appends.items():
+            self._append_entries(user_id, section, records)
+        for section, entries in puts.items():
+            self._append_entries(
+                user_id,
+                section,
+                [{"key": key, "value": value} for key, value in entries.items()],
+            )
+        return profile
+
+    def _append_entries(
+        self, user_id: str, section: str, entries: List[Dict[str, Any]]
+    ) -> None:
+        """Append entries to a section's segment with a single write."""
+        self._append_lines(self._get_segment_path(user_id, section), entries)
+
+    def _append_lines(self, path: Path, entries: List[Dict[str, Any]]) -> None:
+        """Append entries to a JSONL file as lines, with a single write.
+
+        The file's cached replay is dropped rather than updated, since cached
+        values are shared with earlier readers; the next read reloads it.
+        """
+        data = b"".join(
+            (json.dumps(entry, default=json_serializer) + "\n").encode()
+            for entry in entries
+        )
+        with open(path, "ab+") as f:
+            end = f.seek(0, os.SEEK_END)
+            # Terminate a torn last line so it cannot swallow these entries
+            if end > 0:
+                f.seek(end - 1)
+                if f.read(1) != b"\n":
+                    data = b"\n" + data
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        if self.cache is not None:
+            self.cache.invalidate(path)
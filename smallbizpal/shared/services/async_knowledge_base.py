@@ -0,0 +1,208 @@
+#   Copyright 2025 Akshat Deepak Joshi
+
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+
+#       http://www.apache.org/licenses/LICENSE-2.0
+
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Sequence, TypeVar
+
+from smallbizpal.config.settings import KNOWLEDGE_BASE_IO_CONCURRENCY
+from smallbizpal.shared.models.business_profile import BusinessProfile
+
+from .knowledge_base import KnowledgeBaseService, knowledge_base_service
+
+T = TypeVar("T")
+
+
+class AsyncKnowledgeBaseService:
+    """Async facade over a KnowledgeBaseService for use in event loops.
+
+    Every call runs on a dedicated thread pool, so file I/O and JSON parsing
+    never block the event loop. The pool size bounds how many knowledge base
+    operations run at once; additional calls wait for a free worker.
+    """
+
+    def __init__(
+        self,
+        service: KnowledgeBaseService,
+        max_concurrency: int = KNOWLEDGE_BASE_IO_CONCURRENCY,
+    ):
+        """Initialize the async facade.
+
+        Args:
+            service: The synchronous knowledge base service to wrap
+            max_concurrency: Maximum number of operations running at once
+        """
+        self.service = service
+        self.max_concurrency = max_concurrency
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_concurrency, thread_name_prefix="knowledge-base-io"
+        )
+
+    async def run(self, func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """Run any blocking callable on the knowledge base I/O pool.
+
+        Args:
+            func: Blocking function to call
+            *args: Positional arguments for ``func``
+            **kwargs: Keyword arguments for ``func``
+
+        Returns:
+            The function's return value
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._executor, functools.partial(func, *args, **kwargs)
+        )
+
+    def shutdown(self) -> None:
+        """Wait for running operations and stop the I/O pool."""
+        self._executor.shutdown(wait=True)
+
+    async def aupdate_business_profile(
+        self, user_id: str, new_data: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """Async version of ``KnowledgeBaseService.update_business_profile``."""
+        return await self.run(self.service.update_business_profile, user_id, new_data)
+
+    async def aget_business_profile(self, user_id: str) -> Optional[BusinessProfile]:
+        """Async version of ``KnowledgeBaseService.get_business_profile``."""
+        return await self.run(self.service.get_business_profile, user_id)
+
+    async def aget_business_data(self, user_id: str) -> Dict[str, Any]:
+        """Async version of ``KnowledgeBaseService.get_business_data``."""
+        return await self.run(self.service.get_business_data, user_id)
+
+    async def asearch_business_data(
+        self, user_id: str, search_terms: List[str]
+    ) -> Dict[str, Any]:
+        """Async version of ``KnowledgeBaseService.search_business_data``."""
+        return await self.run(self.service.search_business_data, user_id, search_terms)
+
+    async def aget_profile_summary(self, user_id: str) -> Dict[str, Any]:
+        """Async version of ``KnowledgeBaseService.get_profile_summary``."""
+        return await self.run(self.service.get_profile_summary, user_id)
+
+    async def aget_etag(self, user_id: str, sections: Sequence[str]) -> str:
+        """Async version of ``KnowledgeBaseService.get_etag``."""
+        return await self.run(self.service.get_etag, user_id, sections)
+
+    async def aget_faq(self, user_id: str) -> List[Dict[str, Any]]:
+        """Async version of ``KnowledgeBaseService.get_faq``."""
+        return await self.run(self.service.get_faq, user_id)
+
+    async def aget_profile_version(self, user_id: str) -> int:
+        """Async version of ``KnowledgeBaseService.get_profile_version``."""
+        return await self.run(self.service.get_profile_version, user_id)
+
+    async def astore_marketing_asset(
+        self, user_id: str, asset_data: Dict[str, Any]
+    ) -> None:
+        """Async version of ``KnowledgeBaseService.store_marketing_asset``."""
+        await self.run(self.service.store_marketing_asset, user_id, asset_data)
+
+    async def aget_marketing_assets(
+        self,
+        user_id: str,
+        platform: Optional[str] = None,
+        content_type: Optional[str] = None,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+    ) -> List[Dict[str, Any]]:
+        """Async version of ``KnowledgeBaseService.get_marketing_assets``."""
+        return await self.run(
+            self.service.get_marketing_assets,
+            user_id,
+            platform=platform,
+            content_type=content_type,
+            start=start,
+            end=end,
+        )
+
+    async def aquery_marketing_assets(
+        self,
+        user_id: str,
+        platform: Optional[str] = None,
+        content_type: Optional[str] = None,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        limit: int = 50,
+        cursor: Optional[str] = None,
+        descending: bool = False,
+        fields: Optional[Sequence[str]] = None,
+    ) -> Dict[str, Any]:
+        """Async version of ``KnowledgeBaseService.query_marketing_assets``."""
+        return await self.run(
+            self.service.query_marketing_assets,
+            user_id,
+            platform=platform,
+            content_type=content_type,
+            start=start,
+            end=end,
+            limit=limit,
+            cursor=cursor,
+            descending=descending,
+            fields=fields,
+        )
+
+    async def astore_customer_interaction(
+        self, user_id: str, interaction_data: Dict[str, Any]
+    ) -> None:
+        """Async version of ``KnowledgeBaseService.store_customer_interaction``."""
+        await self.run(
+            self.service.store_customer_interaction, user_id, interaction_data
+        )
+
+    async def aget_customer_interactions(
+        self,
+        user_id: str,
+        interaction_type: Optional[str] = None,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+    ) -> List[Dict[str, Any]]:
+        """Async version of ``KnowledgeBaseService.get_customer_interactions``."""
+        return await self.run(
+            self.service.get_customer_interactions,
+            user_id,
+            interaction_type=interaction_type,
+            start=start,
+            end=end,
+        )
+
+    async def astore_performance_data(
+        self, user_id: str, metric_name: str, metric_data: Dict[str, Any]
+    ) -> None:
+        """Async version of ``KnowledgeBaseService.store_performance_data``."""
+        await self.run(
+            self.service.store_performance_data, user_id, metric_name, metric_data
+        )
+
+    async def aget_performance_data(
+        self, user_id: str, metric_name: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Async version of ``KnowledgeBaseService.get_performance_data``."""
+        return await self.run(self.service.get_performance_data, user_id, metric_name)
+
+    async def aflush(self, user_id: Optional[str] = None) -> None:
+        """Async version of ``KnowledgeBaseService.flush``."""
+        await self.run(self.service.flush, user_id)
+
+    async def aclear_all_data(self, user_id: str) -> None:
+        """Async version of ``KnowledgeBaseService.clear_all_data``."""
+        await self.run(self.service.clear_all_data, user_id)
+
+
+# Global async facade over the knowledge base singleton
+async_knowledge_base_service = AsyncKnowledgeBaseService(knowledge_base_service)
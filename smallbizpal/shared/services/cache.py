@@ -0,0 +1,121 @@
+#   Copyright 2025 Akshat Deepak Joshi
+
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+
+#       http://www.apache.org/licenses/LICENSE-2.0
+
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+# (st_mtime_ns, st_size) of a file when it was parsed
+FileStamp = Tuple[int, int]
+
+
+def file_stamp(path: Path) -> Optional[FileStamp]:
+    """Get the modification stamp of a file, or None if it does not exist."""
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+class KnowledgeBaseCache:
+    """Bounded LRU cache of parsed knowledge base files.
+
+    Entries are keyed by file (one or more per user) and tagged with the
+    file's ``(mtime_ns, size)`` stamp at parse time. A lookup with a
+    different stamp is a miss, so files changed by another process are
+    re-read. The total size of cached files is kept under ``max_bytes`` by
+    evicting the least recently used entries.
+
+    Cached values are shared: callers must treat them as read-only.
+    """
+
+    def __init__(self, max_bytes: int):
+        """Initialize the cache.
+
+        Args:
+            max_bytes: Budget for the summed on-disk size of cached files
+        """
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: "OrderedDict[Hashable, Tuple[FileStamp, int, Any]]" = (
+            OrderedDict()
+        )
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, stamp: FileStamp) -> Optional[Any]:
+        """Return the cached value for ``key`` if it was parsed at ``stamp``."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] != stamp:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[2]
+
+    def peek(self, key: Hashable, stamp: FileStamp) -> Optional[Any]:
+        """Like ``get`` but without updating recency or counters."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] != stamp:
+                return None
+            return entry[2]
+
+    def put(self, key: Hashable, stamp: FileStamp, value: Any, size: int) -> None:
+        """Cache a parsed value, evicting least recently used entries as needed."""
+        with self._lock:
+            self._remove(key)
+            if size > self.max_bytes:
+                return
+            self._entries[key] = (stamp, size, value)
+            self.current_bytes += size
+            while self.current_bytes > self.max_bytes:
+                _, (_, evicted_size, _) = self._entries.popitem(last=False)
+                self.current_bytes -= evicted_size
+                self.evictions += 1
+
+    def invalidate(self, key: Hashable) -> None:
+        """Drop the cached value for ``key`` if present."""
+        with self._lock:
+            self._remove(key)
+
+    def clear(self) -> None:
+        """Drop every cached value (counters are kept)."""
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Get hit/miss/eviction counters and current usage."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+                "entries": len(self._entries),
+                "current_bytes": self.current_bytes,
+                "max_bytes": self.max_bytes,
+            }
+
+    def _remove(self, key: Hashable) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.current_bytes -= entry[1]
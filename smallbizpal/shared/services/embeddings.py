@@ -0,0 +1,104 @@
+#   Copyright 2025 Akshat Deepak Joshi
+
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+
+#       http://www.apache.org/licenses/LICENSE-2.0
+
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+"""
+Dense text embeddings that need no model download.
+
+``Encoder`` is the interface retrieval and FAQ matching embed text through;
+``HashingEncoder`` is the CPU-only default.
+"""
+
+import math
+import zlib
+from collections import Counter
+from typing import Any, Dict, List, Sequence, Tuple
+
+import numpy as np
+
+from smallbizpal.shared.models.business_profile import tokenize
+
+# Words too common in customer questions to help ranking
+STOPWORDS = frozenset(
+    "a an and are as at be by can do does for from have how i in is it me my "
+    "of on or our please tell that the their there this to was we what when "
+    "where which who why will with you your".split()
+)
+
+
+def retrieval_tokens(text: str) -> List[str]:
+    """Tokenize text for retrieval, dropping stopwords."""
+    return [token for token in tokenize(text) if token not in STOPWORDS]
+
+
+class Encoder:
+    """Turns texts into L2-normalized dense vectors of ``dim`` dimensions."""
+
+    name = ""
+    dim = 0
+
+    def encode(self, texts: Sequence[str]) -> np.ndarray:
+        """Encode texts into a (len(texts), dim) float32 matrix."""
+        raise NotImplementedError
+
+    def config(self) -> Dict[str, Any]:
+        """Parameters that must match for persisted vectors to be reused."""
+        return {"name": self.name, "dim": self.dim}
+
+
+class HashingEncoder(Encoder):
+    """CPU-only encoder hashing words and character n-grams into a fixed space.
+
+    Character n-grams of each word (padded with spaces) make morphological
+    variants such as "deliver"/"delivery" or "weekend"/"weekends" similar.
+    CRC32 is used instead of ``hash()`` so vectors are stable across
+    processes and can be persisted.
+    """
+
+    name = "hashing"
+
+    def __init__(self, dim: int = 1024, ngram_range: Tuple[int, int] = (3, 5)):
+        """Initialize the encoder.
+
+        Args:
+            dim: Number of hashed dimensions
+            ngram_range: Smallest and largest character n-gram length
+        """
+        self.dim = dim
+        self.ngram_range = ngram_range
+
+    def config(self) -> Dict[str, Any]:
+        return {**super().config(), "ngram_range": list(self.ngram_range)}
+
+    def features(self, text: str) -> Counter:
+        """Count the word and character n-gram features of a text."""
+        counts: Counter = Counter()
+        low, high = self.ngram_range
+        for token in retrieval_tokens(text):
+            counts[token] += 1
+            padded = f" {token} "
+            for n in range(low, min(high, len(padded)) + 1):
+                for start in range(len(padded) - n + 1):
+                    counts[padded[start : start + n]] += 1
+        return counts
+
+    def encode(self, texts: Sequence[str]) -> np.ndarray:
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for feature, count in self.features(text).items():
+                digest = zlib.crc32(feature.encode())
+                sign = 1.0 if digest & 0x80000000 else -1.0
+                vectors[row, digest % self.dim] += sign * (1.0 + math.log(count))
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return vectors / norms
@@ -0,0 +1,140 @@
+#   Copyright 2025 Akshat Deepak Joshi
+
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+
+#       http://www.apache.org/licenses/LICENSE-2.0
+
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+"""
+Streaming exports of tenant data as newline-delimited JSON.
+
+Every exported record carries a ``_cursor`` field. Passing the cursor of the
+last record received as ``since`` resumes the export after that record, so
+backups and analytics pulls can fetch only what was added since the
+previous run. Records are produced by generators reading one record at a
+time, so memory use does not grow with the size of the tenant.
+"""
+
+import json
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, Optional, Tuple
+
+from smallbizpal.config.settings import DATA_DIRECTORY
+
+from .knowledge_base import KnowledgeBaseService
+from .lead_store import LeadStore
+from .serializers import encode_default
+
+CURSOR_FIELD = "_cursor"
+
+# Knowledge base section exported for each record dataset
+RECORD_DATASETS = {
+    "assets": "marketing_assets",
+    "interactions": "customer_interactions",
+}
+
+EXPORT_DATASETS = (*RECORD_DATASETS, "leads", "reports")
+
+ExportItem = Tuple[str, Dict[str, Any]]
+
+
+def _position(since: Optional[str]) -> Optional[int]:
+    """Parse a position cursor of a record or lead export."""
+    if since is None:
+        return None
+    try:
+        return int(since)
+    except ValueError:
+        raise ValueError(f"Invalid cursor: {since!r}") from None
+
+
+def iter_leads(user_dir: Path, after: Optional[int] = None) -> Iterator[ExportItem]:
+    """Stream a user's leads in the order they were captured.
+
+    Leads are read line by line from the log; their cursors are byte offsets
+    in it, so a resumed export seeks straight to the new leads.
+
+    Args:
+        user_dir: The user's data directory
+        after: Only yield leads stored after this offset (optional)
+    """
+    store = LeadStore(str(user_dir.parent))
+    for offset, lead in store.scan_leads(user_dir.name, after or 0):
+        yield str(offset), lead
+
+
+def iter_reports(user_dir: Path, after: Optional[str] = None) -> Iterator[ExportItem]:
+    """Stream a user's markdown reports ordered by file name (report date).
+
+    Args:
+        user_dir: The user's data directory
+        after: Only yield reports whose file name sorts after this one (optional)
+    """
+    reports_dir = user_dir / "reports"
+    if not reports_dir.exists():
+        return
+    for report_file in sorted(reports_dir.glob("*.md")):
+        if after is not None and report_file.name <= after:
+            continue
+        try:
+            content = report_file.read_text(encoding="utf-8")
+        except OSError:
+            # Skip files that can't be read
+            continue
+        name = report_file.name
+        yield name, {
+            "filename": name,
+            "content": content,
+            "created_date": name.split("_")[0] if "_" in name else "unknown",
+        }
+
+
+def export_records(
+    service: KnowledgeBaseService,
+    user_id: str,
+    dataset: str,
+    since: Optional[str] = None,
+    data_dir: Path = Path(DATA_DIRECTORY),
+) -> Iterator[ExportItem]:
+    """Stream one dataset of a user for export.
+
+    The dataset and cursor are validated before the first record is read,
+    so errors surface before a response starts streaming.
+
+    Args:
+        service: Knowledge base holding assets and interactions
+        user_id: The ID of the user.
+        dataset: One of ``EXPORT_DATASETS``
+        since: ``_cursor`` of the last record of a previous export (optional)
+        data_dir: Directory holding the leads and reports written by agents
+
+    Returns:
+        Iterator of (cursor, record) pairs
+
+    Raises:
+        ValueError: If the dataset is unknown or the cursor is malformed
+    """
+    if dataset in RECORD_DATASETS:
+        records = service.iter_records(
+            user_id, RECORD_DATASETS[dataset], _position(since)
+        )
+        return ((str(position), record) for position, record in records)
+    if dataset == "leads":
+        return iter_leads(data_dir / user_id, _position(since))
+    if dataset == "reports":
+        return iter_reports(data_dir / user_id, since)
+    raise ValueError(f"Unknown export dataset: {dataset}")
+
+
+def ndjson_lines(items: Iterable[ExportItem]) -> Iterator[bytes]:
+    """Encode exported records as NDJSON lines tagged with their cursor."""
+    for cursor, record in items:
+        line = json.dumps({**record, CURSOR_FIELD: cursor}, default=encode_default)
+        yield line.encode() + b"\n"
@@ -0,0 +1,251 @@
+#   Copyright 2025 Akshat Deepak Joshi
+
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+
+#       http://www.apache.org/licenses/LICENSE-2.0
+
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+"""
+Canonical FAQ entries materialized from a business profile.
+
+``build_faq`` turns the profile fields that answer common customer questions
+(hours, location, pricing, services, contact details) into question→answer
+entries. It runs whenever the profile changes, and the entries are stored
+with the profile metadata. ``FAQMatcher`` then matches a customer message
+against the entries' canonical questions, so the engagement agent can answer
+without a model round-trip when the match is confident. Only short messages
+asking a single question, without contact details or booking intent, are
+matched: anything else needs the model (and its tools) to be handled.
+"""
+
+import json
+import re
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from smallbizpal.shared.models.business_profile import tokenize
+
+from .embeddings import Encoder, HashingEncoder
+
+# Topics answered from the profile: the customer-facing profile fields that
+# answer them (only these are ever shown to customers), canonical customer
+# questions, and the sentence introducing the answer
+FAQ_TOPICS: Dict[str, Dict[str, Any]] = {
+    "hours": {
+        "fields": ("opening_hours", "business_hours", "hours", "opening_times"),
+        "questions": [
+            "what are your hours",
+            "what are your opening hours",
+            "when are you open",
+            "what time do you open",
+            "what time do you close",
+            "are you open today",
+        ],
+        "intro": "Here are our opening hours:",
+    },
+    "location": {
+        "fields": ("address", "business_address", "location"),
+        "questions": [
+            "where are you located",
+            "what is your address",
+            "where can i find you",
+            "where is your location",
+        ],
+        "intro": "Here is where to find us:",
+    },
+    "pricing": {
+        "fields": ("pricing", "prices", "price_list", "rates"),
+        "questions": [
+            "what are your prices",
+            "how much do you charge",
+            "how much does it cost",
+            "what is your pricing",
+            "what are your rates",
+        ],
+        "intro": "Here is our pricing:",
+    },
+    "services": {
+        "fields": (
+            "services",
+            "products",
+            "products_and_services",
+            "offerings",
+            "menu",
+        ),
+        "questions": [
+            "what services do you offer",
+            "what do you offer",
+            "what products do you sell",
+            "what do you sell",
+            "what is on your menu",
+        ],
+        "intro": "Here is what we offer:",
+    },
+    "contact": {
+        "fields": ("phone", "phone_number", "email", "contact_email", "website"),
+        "questions": [
+            "how can i contact you",
+            "what is your phone number",
+            "what is your email address",
+            "how do i get in touch",
+        ],
+        "intro": "Here is how to reach us:",
+    },
+}
+
+
+# Longest message (in tokens) answered from the FAQ
+MAX_FAQ_MESSAGE_TOKENS = 12
+# Words showing the customer wants to book or be contacted, which the model
+# handles by capturing the lead
+BOOKING_INTENT_WORDS = {
+    "appointment",
+    "book",
+    "booking",
+    "call",
+    "consultation",
+    "meet",
+    "meeting",
+    "quote",
+    "reserve",
+    "reservation",
+    "schedule",
+}
+EMAIL_PATTERN = re.compile(r"\S+@\S+\.\w+")
+PHONE_PATTERN = re.compile(r"\+?\d[\d\s().-]{6,}\d")
+SENTENCE_END_PATTERN = re.compile(r"[.!?;\n]+")
+
+
+def is_faq_question(message: str) -> bool:
+    """Check whether a message is simple enough to answer from the FAQ.
+
+    It must be short, ask a single question, and contain neither contact
+    details nor booking intent. "what is your email? mine is a@b.com, please
+    set up a meeting" is not: answering it from the FAQ would lose the lead.
+    """
+    tokens = tokenize(message)
+    if not tokens or len(tokens) > MAX_FAQ_MESSAGE_TOKENS:
+        return False
+    sentences = [s for s in SENTENCE_END_PATTERN.split(message) if s.strip()]
+    if len(sentences) > 1 or message.count("?") > 1:
+        return False
+    if EMAIL_PATTERN.search(message) or PHONE_PATTERN.search(message):
+        return False
+    return not BOOKING_INTENT_WORDS.intersection(tokens)
+
+
+def format_value(value: Any) -> str:
+    """Render a profile value as customer-facing text."""
+    if isinstance(value, dict):
+        return ", ".join(f"{key}: {format_value(item)}" for key, item in value.items())
+    if isinstance(value, list):
+        return ", ".join(format_value(item) for item in value)
+    if isinstance(value, str):
+        return value
+    return json.dumps(value, ensure_ascii=False, default=str)
+
+
+def build_faq(business_data: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Precompute the FAQ entries a business profile can answer.
+
+    A topic is answered from the fields listed for it in ``FAQ_TOPICS``
+    (``opening_hours`` answers "hours"); answers are sent to customers
+    verbatim, so other fields are never used, even with a similar name
+    (``posting_schedule`` does not answer "hours"). Empty fields are skipped.
+
+    Args:
+        business_data: The business profile data
+
+    Returns:
+        Entries with ``topic``, ``questions``, ``answer`` and ``fields``
+    """
+    entries = []
+    for topic, spec in FAQ_TOPICS.items():
+        fields = [
+            key
+            for key in spec["fields"]
+            if business_data.get(key) not in (None, "", [], {})
+        ]
+        if not fields:
+            continue
+        lines = [
+            f"- {key.replace('_', ' ').capitalize()}: "
+            f"{format_value(business_data[key])}"
+            for key in fields
+        ]
+        entries.append(
+            {
+                "topic": topic,
+                "questions": spec["questions"],
+                "answer": "\n".join([spec["intro"], *lines]),
+                "fields": fields,
+            }
+        )
+    return entries
+
+
+class FAQMatcher:
+    """Matches customer messages to canonical FAQ questions.
+
+    Questions and messages are embedded with an ``Encoder`` and compared by
+    cosine similarity. Canonical questions are encoded once and reused for
+    every business, since each topic's questions are the same everywhere.
+    Messages failing ``is_faq_question`` never match.
+    """
+
+    def __init__(self, encoder: Optional[Encoder] = None, min_confidence: float = 0.8):
+        """Initialize the matcher.
+
+        Args:
+            encoder: Encoder of questions, ``HashingEncoder`` by default
+            min_confidence: Smallest similarity treated as a confident match
+        """
+        self.encoder = encoder or HashingEncoder()
+        self.min_confidence = min_confidence
+        self._question_vectors: Dict[Tuple[str, ...], np.ndarray] = {}
+        self._lock = threading.Lock()
+
+    def _vectors(self, questions: List[str]) -> np.ndarray:
+        key = tuple(questions)
+        with self._lock:
+            vectors = self._question_vectors.get(key)
+        if vectors is None:
+            vectors = self.encoder.encode(questions)
+            with self._lock:
+                self._question_vectors[key] = vectors
+        return vectors
+
+    def match(
+        self, message: str, entries: List[Dict[str, Any]]
+    ) -> Optional[Tuple[Dict[str, Any], float]]:
+        """Find the entry whose canonical questions best match a message.
+
+        Returns:
+            The best (entry, similarity) pair, or None if no entry reaches
+            ``min_confidence``
+        """
+        if not entries or not is_faq_question(message):
+            return None
+        query = self.encoder.encode([message])[0]
+        best: Optional[Tuple[Dict[str, Any], float]] = None
+        for entry in entries:
+            score = float(np.max(self._vectors(entry["questions"]) @ query))
+            if best is None or score > best[1]:
+                best = (entry, score)
+        if best is None or best[1] < self.min_confidence:
+            return None
+        return best
+
+    def answer(self, message: str, entries: List[Dict[str, Any]]) -> Optional[str]:
+        """Get the answer of the confidently matching entry, if any."""
+        match = self.match(message, entries)
+        return match[0]["answer"] if match else None
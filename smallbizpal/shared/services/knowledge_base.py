@@ -12,62 +12,792 @@
 #   See the License for the specific language governing permissions and
 #   limitations under the License.
 
+import atexit
+import base64
+import hashlib
 import json
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from datetime import date, datetime
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+)
 
+from smallbizpal.config.settings import (
+    DATA_DIRECTORY,
+    KNOWLEDGE_BASE_BACKEND,
+    KNOWLEDGE_BASE_CACHE_BYTES,
+    KNOWLEDGE_BASE_FLUSH_INTERVAL_SECONDS,
+    KNOWLEDGE_BASE_FLUSH_MAX_OPERATIONS,
+    KNOWLEDGE_BASE_FORMAT,
+    KNOWLEDGE_BASE_WRITE_BEHIND,
+)
 from smallbizpal.shared.models.business_profile import BusinessProfile
+from smallbizpal.shared.utils.files import write_file_atomic
+from smallbizpal.shared.utils.timestamps import (
+    epoch_field,
+    record_epoch_ms,
+    to_epoch_ms,
+    with_epoch_ms,
+)
+
+from .cache import KnowledgeBaseCache, file_stamp
+from .faq import build_faq
+from .lead_store import LeadStore
+from .question_clusters import QuestionClusterStore
+from .rollups import DailyRollupStore, compute_rollups
+from .serializers import (
+    PrettyJSONSerializer,
+    Serializer,
+    decode_document,
+    encode_default,
+    get_serializer,
+    iter_document_array,
+)
+from .write_behind import WriteBehindBuffer
+
+# Sections holding append-only lists of records
+RECORD_SECTIONS = ("marketing_assets", "customer_interactions")
+# Field holding the timestamp of each record section; records also store it
+# as integer epoch milliseconds in ``<field>_ms`` (see ``with_epoch_ms``)
+TIMESTAMP_FIELDS = {
+    "marketing_assets": "created_at",
+    "customer_interactions": "timestamp",
+}
+# Sections holding a single document (profile) or a keyed mapping (metrics)
+DOCUMENT_SECTIONS = ("business_profile", "profile_meta", "performance_data")
+# Documents replaced as a whole: the profile and its precomputed metadata
+PROFILE_SECTIONS = ("business_profile", "profile_meta")
+
+# Number of parsed, search-indexed profiles kept in memory
+SEARCH_PROFILE_CACHE_SIZE = 256
+
+# Single-file layout used before each section had its own file
+LEGACY_FILE_NAME = "knowledge_base.json"
+
+# A pending mutation: ("profile", new_data), ("append", section, record) or
+# ("put", section, key, value)
+Operation = Tuple[Any, ...]
+# Position of a record in paginated reads: (timestamp_ms, storage position)
+PageKey = Tuple[int, int]
+
+
+# Custom JSON serializer for datetime and other objects
+json_serializer = encode_default
+
+
+def record_field(record: Dict[str, Any], field: str) -> Any:
+    """Get a filterable field from a stored record.
+
+    Marketing assets stored by the content creation callback use
+    ``asset_type`` instead of ``content_type``; both are treated as the
+    content type.
+    """
+    if field == "content_type":
+        return record.get("content_type") or record.get("asset_type")
+    return record.get(field)
+
+
+def record_matcher(
+    section: str,
+    filters: Dict[str, Any],
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+) -> Optional[Callable[[Dict[str, Any]], bool]]:
+    """Build a predicate for exact field filters and a timestamp range.
+
+    Args:
+        section: Name of the list section
+        filters: Field/value pairs that must match exactly (None is ignored)
+        start: Inclusive lower bound on the record timestamp
+        end: Exclusive upper bound on the record timestamp
+
+    Returns:
+        The predicate, or None if every record matches
+    """
+    filters = {field: value for field, value in filters.items() if value}
+    if not filters and start is None and end is None:
+        return None
+
+    start_ms = to_epoch_ms(start) if start is not None else None
+    end_ms = to_epoch_ms(end) if end is not None else None
+
+    def matches(record: Dict[str, Any]) -> bool:
+        if any(record_field(record, f) != v for f, v in filters.items()):
+            return False
+        if start_ms is not None or end_ms is not None:
+            ts = record_epoch_ms(record, TIMESTAMP_FIELDS[section])
+            if ts is None:
+                return False
+            if start_ms is not None and ts < start_ms:
+                return False
+            if end_ms is not None and ts >= end_ms:
+                return False
+        return True
+
+    return matches
+
+
+def filter_records(
+    records: List[Dict[str, Any]],
+    section: str,
+    filters: Dict[str, Any],
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+) -> List[Dict[str, Any]]:
+    """Return the records matching exact field filters and a timestamp range.
+
+    Args:
+        records: Records of a list section
+        section: Name of the list section
+        filters: Field/value pairs that must match exactly (None is ignored)
+        start: Inclusive lower bound on the record timestamp
+        end: Exclusive upper bound on the record timestamp
+
+    Returns:
+        Matching records in their original order
+    """
+    matches = record_matcher(section, filters, start, end)
+    if matches is None:
+        return list(records)
+    return [record for record in records if matches(record)]
+
+
+def page_key(section: str, record: Dict[str, Any], position: int) -> PageKey:
+    """Get the sort key of a record in paginated reads.
+
+    Records are ordered by timestamp (epoch milliseconds, 0 when missing),
+    then by storage position so records with equal timestamps keep a
+    stable order.
+    """
+    return (record_epoch_ms(record, TIMESTAMP_FIELDS[section]) or 0, position)
+
+
+def encode_cursor(key: PageKey) -> str:
+    """Encode the key of the last record of a page as an opaque cursor."""
+    return base64.urlsafe_b64encode(json.dumps(list(key)).encode()).decode()
+
+
+def decode_cursor(cursor: str) -> PageKey:
+    """Decode a cursor returned by ``encode_cursor``.
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        ts, position = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return (int(ts), int(position))
+    except (TypeError, ValueError) as e:
+        raise ValueError(f"Invalid cursor: {cursor!r}") from e
+
+
+def project_record(
+    record: Dict[str, Any], fields: Optional[Sequence[str]]
+) -> Dict[str, Any]:
+    """Keep only the requested fields of a record (all fields if None)."""
+    if fields is None:
+        return record
+    return {field: record[field] for field in fields if field in record}
+
+
+def file_version(path: Path) -> str:
+    """Get a token that changes whenever a file is replaced or appended to.
+
+    Atomic replacement gives the file a new inode and appends grow it, so
+    ``(inode, mtime_ns, size)`` changes on every write even when two writes
+    fall within the same mtime tick.
+    """
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        return "-"
+    return f"{stat.st_ino}:{stat.st_mtime_ns}:{stat.st_size}"
+
+
+def group_operations(
+    operations: List[Operation],
+) -> Tuple[List[Dict[str, Any]], Dict[str, List[Any]], Dict[str, Dict[str, Any]]]:
+    """Group a batch of operations by kind and section, preserving order.
+
+    Returns:
+        Tuple of (profile updates, records to append per section,
+        entries to set per section)
+    """
+    profile_updates: List[Dict[str, Any]] = []
+    appends: Dict[str, List[Any]] = {}
+    puts: Dict[str, Dict[str, Any]] = {}
+    for operation in operations:
+        if operation[0] == "profile":
+            profile_updates.append(operation[1])
+        elif operation[0] == "append":
+            appends.setdefault(operation[1], []).append(operation[2])
+        elif operation[0] == "put":
+            puts.setdefault(operation[1], {})[operation[2]] = operation[3]
+        else:
+            raise ValueError(f"Unknown knowledge base operation: {operation[0]}")
+    return profile_updates, appends, puts
+
+
+def empty_knowledge_base() -> Dict[str, Any]:
+    """Return the data layout of a user without any stored data."""
+    return {
+        "business_profile": {},
+        # {"version": int, "summary": BusinessProfile.get_summary()}
+        "profile_meta": {},
+        "marketing_assets": [],
+        "customer_interactions": [],
+        "performance_data": {},
+    }
+
+
+class KnowledgeBaseTransaction:
+    """Mutations for one user collected inside ``KnowledgeBaseService.transaction``.
+
+    Methods mirror the service's write methods without the ``user_id``
+    argument. Nothing is stored until the ``with`` block exits without error.
+    """
+
+    def __init__(self, user_id: str):
+        self.user_id = user_id
+        self.operations: List[Operation] = []
+        # Updated business profile, set on commit if the profile was changed
+        self.profile: Optional[BusinessProfile] = None
+
+    def update_business_profile(self, new_data: Dict[str, Any]) -> None:
+        """Queue an update of the business profile with new fields."""
+        self.operations.append(("profile", dict(new_data)))
+
+    def store_marketing_asset(self, asset_data: Dict[str, Any]) -> None:
+        """Queue a marketing asset to be stored."""
+        asset_data["created_at"] = str(asset_data.get("created_at", ""))
+        with_epoch_ms(asset_data, "created_at")
+        self.operations.append(("append", "marketing_assets", asset_data))
+
+    def store_customer_interaction(self, interaction_data: Dict[str, Any]) -> None:
+        """Queue a customer interaction to be stored."""
+        interaction_data["timestamp"] = str(interaction_data.get("timestamp", ""))
+        with_epoch_ms(interaction_data, "timestamp")
+        self.operations.append(("append", "customer_interactions", interaction_data))
+
+    def store_performance_data(
+        self, metric_name: str, metric_data: Dict[str, Any]
+    ) -> None:
+        """Queue a performance metric to be stored."""
+        self.operations.append(("put", "performance_data", metric_name, metric_data))
 
 
 class KnowledgeBaseService:
-    """Simple file-based knowledge base for storing and retrieving business data."""
+    """Simple file-based knowledge base for storing and retrieving business data.
+
+    All public methods are implemented on top of a small set of section-level
+    storage primitives (``_read_section``, ``_write_section``,
+    ``_apply_batch`` and ``_query_records``). This class keeps each section
+    in its own file, so reading the profile never parses a tenant's history::
+
+        data/<user_id>/business_profile.json
+        data/<user_id>/profile_meta.json
+        data/<user_id>/marketing_assets.json
+        data/<user_id>/customer_interactions.json
+        data/<user_id>/performance_data.json
 
-    def __init__(self, base_storage_path: str = "data"):
+    ``profile_meta`` holds the profile summary, its FAQ entries and a version
+    counter, all updated whenever the profile changes, so
+    ``get_profile_summary``, ``get_faq`` and ``get_profile_version`` never
+    validate the full profile.
+
+    A single-file ``knowledge_base.json`` from older versions is split into
+    section files the first time the user is accessed. Other backends
+    override the primitives to change the on-disk layout without touching the
+    public API.
+
+    Each section has a version token (``_section_version``, the section
+    file's identity for this class), which ``get_etag`` combines so HTTP
+    routes can answer conditional requests without reading any data.
+
+    Every write goes through ``_apply_batch``: the single-record ``store_*``
+    methods are one-operation transactions, and ``transaction()`` applies any
+    number of mutations with one read and one durable write per section.
+
+    In write-behind mode, transactions without profile updates are buffered
+    per user and stored in groups by ``flush()``, which runs when a user's
+    buffer fills up, on a background timer, and on ``close()``. Reads include
+    buffered records and metrics, so callers always see their own writes.
+    """
+
+    def __init__(
+        self,
+        base_storage_path: str = "data",
+        cache_max_bytes: int = 0,
+        write_behind: Optional[WriteBehindBuffer] = None,
+        serializer: Optional[Serializer] = None,
+    ):
         """Initialize the knowledge base service.
 
         Args:
             base_storage_path: Path to the directory for data storage
+            cache_max_bytes: Byte budget of the parsed-file cache (0 disables it)
+            write_behind: Buffer enabling write-behind mode (None writes through)
+            serializer: Encoding of written files (default: indented JSON);
+                files in any supported encoding can be read
         """
         self.base_storage_path = Path(base_storage_path)
+        self.serializer = serializer or PrettyJSONSerializer()
+        self.cache: Optional[KnowledgeBaseCache] = (
+            KnowledgeBaseCache(cache_max_bytes) if cache_max_bytes > 0 else None
+        )
+        self._user_locks: Dict[str, threading.RLock] = {}
+        self._user_locks_guard = threading.Lock()
+        # Users whose directory exists and whose legacy file has been split
+        self._prepared_users: Set[str] = set()
+        # user_id -> (profile version, profile with its search index built)
+        self._search_profiles: "OrderedDict[str, Tuple[int, BusinessProfile]]" = (
+            OrderedDict()
+        )
+        self._search_profiles_lock = threading.Lock()
+        self.rollups = DailyRollupStore(base_storage_path)
+        self.question_clusters = QuestionClusterStore(base_storage_path)
+        self.write_behind = write_behind
+        if write_behind is not None:
+            write_behind.start(self.flush)
+            atexit.register(self.flush)
+
+    def _user_lock(self, user_id: str) -> threading.RLock:
+        """Get the lock serializing writes for a user within this process."""
+        with self._user_locks_guard:
+            return self._user_locks.setdefault(user_id, threading.RLock())
+
+    def _get_user_dir(self, user_id: str) -> Path:
+        """Get a user's storage directory, splitting a legacy file on first use."""
+        user_dir = self.base_storage_path / user_id
+        if user_id not in self._prepared_users:
+            user_dir.mkdir(parents=True, exist_ok=True)
+            with self._user_lock(user_id):
+                self._split_legacy_file(user_dir)
+            self._prepared_users.add(user_id)
+        return user_dir
 
-    def _get_storage_path(self, user_id: str) -> Path:
-        """Get the storage path for a specific user."""
-        storage_path = self.base_storage_path / user_id / "knowledge_base.json"
-        storage_path.parent.mkdir(parents=True, exist_ok=True)
-        return storage_path
+    def _get_section_path(self, user_id: str, section: str) -> Path:
+        """Get the file holding one section of a user's knowledge base."""
+        return self._get_user_dir(user_id) / f"{section}.json"
+
+    def _split_legacy_file(self, user_dir: Path) -> None:
+        """Move the sections of a single-file knowledge base into section files.
+
+        The legacy file is kept as ``knowledge_base.json.migrated``.
+        """
+        legacy_path = user_dir / LEGACY_FILE_NAME
+        if not legacy_path.exists():
+            return
+        try:
+            legacy_data = decode_document(legacy_path.read_bytes())
+        except ValueError:
+            legacy_data = {}
+        for section in empty_knowledge_base():
+            section_path = user_dir / f"{section}.json"
+            if section in legacy_data and not section_path.exists():
+                write_file_atomic(
+                    section_path, self.serializer.encode(legacy_data[section])
+                )
+        legacy_path.replace(legacy_path.with_name(f"{LEGACY_FILE_NAME}.migrated"))
+
+    def _read_cached(self, path: Path, parse: Callable[[Path], Any]) -> Any:
+        """Parse a file through the cache.
+
+        Args:
+            path: File to read
+            parse: Function parsing the file contents
+
+        Returns:
+            Parsed value, or None if the file does not exist
+        """
+        stamp = file_stamp(path)
+        if stamp is None:
+            return None
+        if self.cache is not None:
+            value = self.cache.get(path, stamp)
+            if value is not None:
+                return value
+        value = parse(path)
+        if self.cache is not None:
+            self.cache.put(path, stamp, value, stamp[1])
+        return value
+
+    def _invalidate_cached(self, path: Path) -> None:
+        """Drop a file from the cache after writing it."""
+        if self.cache is not None:
+            self.cache.invalidate(path)
+
+    def cache_stats(self) -> Dict[str, Any]:
+        """Get hit/miss/eviction counters of the parsed-file cache.
+
+        Returns:
+            Cache statistics, or ``{"enabled": False}`` when caching is off
+        """
+        if self.cache is None:
+            return {"enabled": False}
+        return {"enabled": True, **self.cache.stats()}
 
     def _load_data(self, user_id: str) -> Dict[str, Any]:
-        """Load data from a user's storage file."""
-        storage_path = self._get_storage_path(user_id)
-        if storage_path.exists():
-            try:
-                with open(storage_path, "r") as f:
-                    return json.load(f)
-            except (json.JSONDecodeError, FileNotFoundError):
-                pass
+        """Load every section of a user's knowledge base."""
         return {
-            "business_profile": {},
-            "marketing_assets": [],
-            "customer_interactions": [],
-            "performance_data": {},
+            section: self._read_section_file(user_id, section)
+            for section in empty_knowledge_base()
         }
 
     def _save_data(self, user_id: str, data: Dict[str, Any]) -> None:
-        """Save data to a user's storage file."""
-        storage_path = self._get_storage_path(user_id)
-
-        def json_serializer(obj):
-            """Custom JSON serializer for datetime and other objects."""
-            if hasattr(obj, "isoformat"):
-                return obj.isoformat()
-            elif hasattr(obj, "model_dump"):
-                return obj.model_dump()
-            elif hasattr(obj, "__dict__"):
-                return obj.__dict__
-            return str(obj)
-
-        with open(storage_path, "w") as f:
-            json.dump(data, f, indent=2, default=json_serializer)
+        """Replace every section of a user's knowledge base."""
+        for section in empty_knowledge_base():
+            self._write_section_file(
+                user_id, section, data.get(section, empty_knowledge_base()[section])
+            )
+
+    def _read_section_file(self, user_id: str, section: str) -> Any:
+        """Parse one section file, treating a missing or corrupt file as empty."""
+        path = self._get_section_path(user_id, section)
+        try:
+            value = self._read_cached(path, lambda p: decode_document(p.read_bytes()))
+        except (ValueError, FileNotFoundError):
+            value = None
+        if value is None:
+            return empty_knowledge_base()[section]
+        return value
+
+    def _write_section_file(self, user_id: str, section: str, value: Any) -> None:
+        """Durably replace one section file."""
+        path = self._get_section_path(user_id, section)
+        try:
+            write_file_atomic(path, self.serializer.encode(value))
+        finally:
+            self._invalidate_cached(path)
+
+    # Section-level storage primitives
+
+    def _read_section(self, user_id: str, section: str) -> Any:
+        """Read a single section (list of records or dictionary) for a user."""
+        return self._read_section_file(user_id, section)
+
+    def _write_section(self, user_id: str, section: str, value: Any) -> None:
+        """Replace the full contents of a section for a user."""
+        self._write_section_file(user_id, section, value)
+
+    def _section_version(self, user_id: str, section: str) -> str:
+        """Get a token that changes whenever a section's stored data changes."""
+        return file_version(self._get_section_path(user_id, section))
+
+    def _apply_batch(
+        self, user_id: str, operations: List[Operation]
+    ) -> Optional[BusinessProfile]:
+        """Apply a batch of operations with one read and one write per section.
+
+        Only the sections touched by the batch are read and rewritten.
+
+        Args:
+            user_id: The ID of the user.
+            operations: Operations collected by a KnowledgeBaseTransaction
+
+        Returns:
+            The updated business profile, or None if it was not changed
+        """
+        profile_updates, appends, puts = group_operations(operations)
+        # Build new section values so cached data is never mutated in place
+        for section, records in appends.items():
+            self._write_section(
+                user_id, section, list(self._read_section(user_id, section)) + records
+            )
+        for section, entries in puts.items():
+            self._write_section(
+                user_id, section, {**self._read_section(user_id, section), **entries}
+            )
+        profile = None
+        if profile_updates:
+            profile = self._updated_profile(
+                self._read_section(user_id, "business_profile"), profile_updates
+            )
+            self._write_section(user_id, "business_profile", profile.model_dump())
+            self._write_section(
+                user_id, "profile_meta", self._updated_profile_meta(user_id, profile)
+            )
+        return profile
+
+    def _profile_from_data(
+        self, profile_data: Optional[Dict[str, Any]]
+    ) -> Optional[BusinessProfile]:
+        """Build a BusinessProfile from stored profile data."""
+        if profile_data:
+            try:
+                return BusinessProfile.model_validate(profile_data)
+            except Exception:
+                return BusinessProfile(data=profile_data)
+        return None
+
+    def _updated_profile(
+        self, profile_data: Optional[Dict[str, Any]], updates: List[Dict[str, Any]]
+    ) -> BusinessProfile:
+        """Apply profile updates on top of stored profile data."""
+        profile = self._profile_from_data(profile_data) or BusinessProfile()
+        for new_data in updates:
+            profile.update_data(new_data)
+        return profile
+
+    def _updated_profile_meta(
+        self, user_id: str, profile: BusinessProfile
+    ) -> Dict[str, Any]:
+        """Build the metadata of a changed profile with the next version."""
+        previous = self._read_section(user_id, "profile_meta")
+        return {
+            "version": previous.get("version", 0) + 1,
+            "summary": profile.get_summary(),
+            "faq": build_faq(profile.get_all_data()),
+        }
+
+    @contextmanager
+    def transaction(self, user_id: str) -> Iterator[KnowledgeBaseTransaction]:
+        """Collect several mutations for a user and store them together.
+
+        Example::
+
+            with knowledge_base_service.transaction(user_id) as tx:
+                tx.update_business_profile({"brand_voice": "playful"})
+                tx.store_marketing_asset(asset)
+
+        Args:
+            user_id: The ID of the user.
+
+        Yields:
+            KnowledgeBaseTransaction collecting the mutations
+        """
+        tx = KnowledgeBaseTransaction(user_id)
+        yield tx
+        if not tx.operations:
+            return
+        if self.write_behind is not None and not any(
+            operation[0] == "profile" for operation in tx.operations
+        ):
+            if self.write_behind.add(user_id, tx.operations):
+                self.flush(user_id)
+            return
+        with self._user_lock(user_id):
+            # Profile updates are written through, after anything buffered
+            self.flush(user_id)
+            tx.profile = self._store_operations(user_id, tx.operations)
+
+    def _store_operations(
+        self, user_id: str, operations: List[Operation]
+    ) -> Optional[BusinessProfile]:
+        """Apply operations to storage, then count them in the daily rollups.
+
+        Questions get their cluster labels under the caller's user lock, and
+        the cluster assignments are only saved once the operations are.
+        """
+        with self.question_clusters.applying(user_id, operations):
+            profile = self._apply_batch(user_id, operations)
+        self.rollups.apply(user_id, operations)
+        return profile
+
+    def _query_records(
+        self,
+        user_id: str,
+        section: str,
+        filters: Dict[str, Any],
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+    ) -> List[Dict[str, Any]]:
+        """Return the records of a list section matching the given filters.
+
+        Args:
+            user_id: The ID of the user.
+            section: Name of the list section
+            filters: Field/value pairs that must match exactly (None is ignored)
+            start: Inclusive lower bound on the record timestamp
+            end: Exclusive upper bound on the record timestamp
+
+        Returns:
+            Matching records in storage order
+        """
+        return filter_records(
+            self._read_section(user_id, section), section, filters, start, end
+        )
+
+    def _positioned_records(
+        self,
+        user_id: str,
+        section: str,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+    ) -> Iterable[Tuple[int, Dict[str, Any]]]:
+        """Get the stored records of a list section with their positions.
+
+        Backends may leave out records they can tell lie outside
+        ``[start, end)`` without reading them; callers still filter.
+        """
+        return enumerate(self._read_section(user_id, section))
+
+    def _query_page(
+        self,
+        user_id: str,
+        section: str,
+        filters: Dict[str, Any],
+        start: Optional[datetime],
+        end: Optional[datetime],
+        after: Optional[PageKey],
+        limit: int,
+        descending: bool,
+    ) -> List[Tuple[PageKey, Dict[str, Any]]]:
+        """Query one page of stored records ordered by ``page_key``.
+
+        Args:
+            user_id: The ID of the user.
+            section: Name of the list section
+            filters: Field/value pairs that must match exactly (None is ignored)
+            start: Inclusive lower bound on the record timestamp
+            end: Exclusive upper bound on the record timestamp
+            after: Key of the last record of the previous page
+            limit: Maximum number of records
+            descending: Order newest first
+
+        Returns:
+            (key, record) pairs of the page, in page order
+        """
+        matches = record_matcher(section, filters, start, end)
+        keyed = [
+            (page_key(section, record, position), record)
+            for position, record in self._positioned_records(
+                user_id, section, start, end
+            )
+            if matches is None or matches(record)
+        ]
+        keyed.sort(key=lambda item: item[0], reverse=descending)
+        if after is not None:
+            keyed = [
+                item
+                for item in keyed
+                if (item[0] < after if descending else item[0] > after)
+            ]
+        return keyed[:limit]
+
+    def _backfill_epoch_ms(self, user_id: str, section: str) -> int:
+        """Add the epoch-millis timestamp to stored records lacking it.
+
+        Records keep their storage positions. The caller holds the user lock.
+
+        Returns:
+            Number of records updated
+        """
+        field = TIMESTAMP_FIELDS[section]
+        records = [dict(record) for record in self._read_section(user_id, section)]
+        missing = [record for record in records if epoch_field(field) not in record]
+        if not missing:
+            return 0
+        for record in missing:
+            with_epoch_ms(record, field)
+        self._write_section(user_id, section, records)
+        return len(missing)
+
+    def _iter_section(
+        self, user_id: str, section: str, after: Optional[int]
+    ) -> Iterator[Tuple[int, Dict[str, Any]]]:
+        """Stream the stored records of a list section in storage order.
+
+        Args:
+            user_id: The ID of the user.
+            section: Name of the list section
+            after: Only yield records stored after this position (optional)
+
+        Yields:
+            (position, record) pairs; positions only grow as records are added
+        """
+        path = self._get_section_path(user_id, section)
+        if not path.exists():
+            return
+        for position, record in enumerate(iter_document_array(path)):
+            if after is None or position > after:
+                yield position, record
+
+    def _read_records(
+        self,
+        user_id: str,
+        section: str,
+        filters: Dict[str, Any],
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+    ) -> List[Dict[str, Any]]:
+        """Query stored records plus matching records still being buffered."""
+        if self.write_behind is None:
+            return self._query_records(user_id, section, filters, start, end)
+        with self._user_lock(user_id):
+            records = self._query_records(user_id, section, filters, start, end)
+            _, appends, _ = group_operations(self.write_behind.pending(user_id))
+        return records + filter_records(
+            appends.get(section, []), section, filters, start, end
+        )
+
+    def _read_entries(self, user_id: str, section: str) -> Dict[str, Any]:
+        """Read a keyed section with entries still being buffered applied."""
+        if self.write_behind is None:
+            return self._read_section(user_id, section)
+        with self._user_lock(user_id):
+            entries = self._read_section(user_id, section)
+            _, _, puts = group_operations(self.write_behind.pending(user_id))
+        return {**entries, **puts.get(section, {})}
+
+    def get_etag(self, user_id: str, sections: Sequence[str]) -> str:
+        """Get an entity tag for the current contents of some sections.
+
+        The tag is derived from per-section versions maintained by writes and
+        from the operations still in the write-behind buffer, so it changes
+        whenever a read of the sections could return something different.
+        Computing it never reads or parses the sections themselves.
+
+        Args:
+            user_id: The ID of the user.
+            sections: Sections the tagged response is built from
+
+        Returns:
+            Opaque tag, stable while the sections are unchanged
+        """
+        with self._user_lock(user_id):
+            parts = [
+                f"{section}={self._section_version(user_id, section)}"
+                for section in sections
+            ]
+            if self.write_behind is not None:
+                pending = self.write_behind.pending(user_id)
+                parts.append(f"pending={sum(1 for op in pending if op[1] in sections)}")
+        return hashlib.sha1("|".join(parts).encode()).hexdigest()[:20]
+
+    def flush(self, user_id: Optional[str] = None) -> None:
+        """Store buffered write-behind operations now.
+
+        Args:
+            user_id: Only flush this user's operations (default: every user)
+        """
+        if self.write_behind is None:
+            return
+        users = [user_id] if user_id else self.write_behind.users()
+        for pending_user in users:
+            with self._user_lock(pending_user):
+                operations = self.write_behind.pending(pending_user)
+                if operations:
+                    self._store_operations(pending_user, operations)
+                    self.write_behind.remove(pending_user, len(operations))
+
+    def close(self) -> None:
+        """Flush buffered operations and stop the background flush thread."""
+        if self.write_behind is not None:
+            self.write_behind.stop()
+            self.flush()
+            atexit.unregister(self.flush)
 
     def update_business_profile(
         self, user_id: str, new_data: Dict[str, Any]
@@ -82,14 +812,10 @@ class KnowledgeBaseService:
             Dictionary with update status and information
         """
         try:
-            data = self._load_data(user_id)
-            profile = self.get_business_profile(user_id)
-            if profile is None:
-                profile = BusinessProfile()
-
-            profile.update_data(new_data)
-            data["business_profile"] = profile.model_dump()
-            self._save_data(user_id, data)
+            with self.transaction(user_id) as tx:
+                tx.update_business_profile(new_data)
+            profile = tx.profile
+            assert profile is not None
 
             return {
                 "status": "success",
@@ -115,14 +841,7 @@ class KnowledgeBaseService:
         Returns:
             BusinessProfile object or None if no profile exists
         """
-        data = self._load_data(user_id)
-        profile_data = data.get("business_profile")
-        if profile_data:
-            try:
-                return BusinessProfile.model_validate(profile_data)
-            except Exception:
-                return BusinessProfile(data=profile_data)
-        return None
+        return self._profile_from_data(self._read_section(user_id, "business_profile"))
 
     def get_business_data(self, user_id: str) -> Dict[str, Any]:
         """Get all business data for a specific user as a simple dictionary.
@@ -148,13 +867,33 @@ class KnowledgeBaseService:
             search_terms: List of terms to search for
 
         Returns:
-            Dictionary of matching business data
+            Dictionary of matching business data, best matches first
         """
-        profile = self.get_business_profile(user_id)
+        profile = self._get_search_profile(user_id)
         if profile:
             return profile.search_data(search_terms)
         return {}
 
+    def _get_search_profile(self, user_id: str) -> Optional[BusinessProfile]:
+        """Get a user's profile, reusing its search index while the version holds."""
+        version = self.get_profile_version(user_id)
+        with self._search_profiles_lock:
+            entry = self._search_profiles.get(user_id)
+            if entry is not None and entry[0] == version:
+                self._search_profiles.move_to_end(user_id)
+                return entry[1]
+
+        profile = self.get_business_profile(user_id)
+        # Version 0 profiles predate version tracking, so changes can't be seen
+        if profile is not None and version > 0:
+            profile.get_search_index()
+            with self._search_profiles_lock:
+                self._search_profiles[user_id] = (version, profile)
+                self._search_profiles.move_to_end(user_id)
+                while len(self._search_profiles) > SEARCH_PROFILE_CACHE_SIZE:
+                    self._search_profiles.popitem(last=False)
+        return profile
+
     def get_profile_summary(self, user_id: str) -> Dict[str, Any]:
         """Get a summary of the current business profile for a specific user.
 
@@ -162,12 +901,19 @@ class KnowledgeBaseService:
             user_id: The ID of the user.
 
         Returns:
-            Summary information about the profile
+            Summary information about the profile, including its version
         """
+        meta = self._read_section(user_id, "profile_meta")
+        version = meta.get("version", 0)
+        if "summary" in meta:
+            return {**meta["summary"], "profile_exists": True, "version": version}
+
+        # Profiles stored before metadata was kept
         profile = self.get_business_profile(user_id)
         if profile:
             summary = profile.get_summary()
             summary["profile_exists"] = True
+            summary["version"] = version
             return summary
         else:
             return {
@@ -175,8 +921,40 @@ class KnowledgeBaseService:
                 "total_fields": 0,
                 "has_data": False,
                 "message": "No business profile exists yet",
+                "version": version,
             }
 
+    def get_faq(self, user_id: str) -> List[Dict[str, Any]]:
+        """Get the FAQ entries precomputed from a user's business profile.
+
+        Args:
+            user_id: The ID of the user.
+
+        Returns:
+            Entries with ``topic``, ``questions``, ``answer`` and ``fields``
+        """
+        meta = self._read_section(user_id, "profile_meta")
+        if "faq" in meta:
+            return meta["faq"]
+
+        # Profiles stored before FAQ entries were materialized
+        business_data = self.get_business_data(user_id)
+        return build_faq(business_data) if business_data else []
+
+    def get_profile_version(self, user_id: str) -> int:
+        """Get the version of a user's business profile.
+
+        The version increases every time the profile is updated or cleared,
+        so it can be used as a cache key for data derived from the profile.
+
+        Args:
+            user_id: The ID of the user.
+
+        Returns:
+            Profile version (0 if the profile was never updated)
+        """
+        return self._read_section(user_id, "profile_meta").get("version", 0)
+
     def store_business_profile(
         self, user_id: str, profile_data: Dict[str, Any]
     ) -> None:
@@ -185,25 +963,122 @@ class KnowledgeBaseService:
 
     def store_marketing_asset(self, user_id: str, asset_data: Dict[str, Any]) -> None:
         """Store marketing asset information for a specific user."""
-        data = self._load_data(user_id)
-        if "marketing_assets" not in data:
-            data["marketing_assets"] = []
-
-        asset_data["created_at"] = str(asset_data.get("created_at", ""))
-        data["marketing_assets"].append(asset_data)
-        self._save_data(user_id, data)
+        with self.transaction(user_id) as tx:
+            tx.store_marketing_asset(asset_data)
 
-    def get_marketing_assets(self, user_id: str) -> list[Dict[str, Any]]:
-        """Retrieve all marketing assets for a specific user.
+    def get_marketing_assets(
+        self,
+        user_id: str,
+        platform: Optional[str] = None,
+        content_type: Optional[str] = None,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+    ) -> list[Dict[str, Any]]:
+        """Retrieve marketing assets for a specific user.
 
         Args:
             user_id: The ID of the user.
+            platform: Only return assets for this platform (optional)
+            content_type: Only return assets of this content/asset type (optional)
+            start: Only return assets created at or after this time (optional)
+            end: Only return assets created before this time (optional)
 
         Returns:
             List of marketing asset dictionaries
         """
-        data = self._load_data(user_id)
-        return data.get("marketing_assets", [])
+        return self._read_records(
+            user_id,
+            "marketing_assets",
+            {"platform": platform, "content_type": content_type},
+            start,
+            end,
+        )
+
+    def query_marketing_assets(
+        self,
+        user_id: str,
+        platform: Optional[str] = None,
+        content_type: Optional[str] = None,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        limit: int = 50,
+        cursor: Optional[str] = None,
+        descending: bool = False,
+        fields: Optional[Sequence[str]] = None,
+    ) -> Dict[str, Any]:
+        """Retrieve one page of marketing assets ordered by ``created_at``.
+
+        Filters are evaluated by the storage backend. Buffered write-behind
+        assets of the user are stored first, so cursors always refer to
+        stored positions.
+
+        Args:
+            user_id: The ID of the user.
+            platform: Only return assets for this platform (optional)
+            content_type: Only return assets of this content/asset type (optional)
+            start: Only return assets created at or after this time (optional)
+            end: Only return assets created before this time (optional)
+            limit: Maximum number of assets in the page
+            cursor: ``next_cursor`` of the previous page (optional)
+            descending: Return the newest assets first
+            fields: Only include these asset fields (optional)
+
+        Returns:
+            Dictionary with the page's ``items`` and the ``next_cursor`` to
+            pass for the following page (None on the last page)
+
+        Raises:
+            ValueError: If the cursor is malformed
+        """
+        after = decode_cursor(cursor) if cursor else None
+        if self.write_behind is not None and any(
+            op[1] == "marketing_assets" for op in self.write_behind.pending(user_id)
+        ):
+            self.flush(user_id)
+        page = self._query_page(
+            user_id,
+            "marketing_assets",
+            {"platform": platform, "content_type": content_type},
+            start,
+            end,
+            after,
+            limit + 1,
+            descending,
+        )
+        next_cursor = encode_cursor(page[limit - 1][0]) if len(page) > limit else None
+        return {
+            "items": [project_record(record, fields) for _, record in page[:limit]],
+            "next_cursor": next_cursor,
+        }
+
+    def iter_records(
+        self, user_id: str, section: str, since: Optional[int] = None
+    ) -> Iterator[Tuple[int, Dict[str, Any]]]:
+        """Stream a user's assets or interactions without loading them all.
+
+        Records are yielded in storage order together with their position, so
+        an export can be resumed by passing the last position seen as
+        ``since``. Buffered write-behind records of the section are stored
+        first, so every position refers to a stored record.
+
+        Args:
+            user_id: The ID of the user.
+            section: "marketing_assets" or "customer_interactions"
+            since: Only yield records stored after this position (optional)
+
+        Returns:
+            Iterator of (position, record) pairs
+
+        Raises:
+            ValueError: If the section is not a list section
+        """
+        if section not in RECORD_SECTIONS:
+            raise ValueError(f"Not a record section: {section}")
+        if self.write_behind is not None and any(
+            op[1] == section for op in self.write_behind.pending(user_id)
+        ):
+            self.flush(user_id)
+        return self._iter_section(user_id, section, since)
 
     def store_customer_interaction(
         self, user_id: str, interaction_data: Dict[str, Any]
@@ -214,25 +1089,58 @@ class KnowledgeBaseService:
             user_id: The ID of the user.
             interaction_data: Dictionary containing interaction data
         """
-        data = self._load_data(user_id)
-        if "customer_interactions" not in data:
-            data["customer_interactions"] = []
+        with self.transaction(user_id) as tx:
+            tx.store_customer_interaction(interaction_data)
 
-        interaction_data["timestamp"] = str(interaction_data.get("timestamp", ""))
-        data["customer_interactions"].append(interaction_data)
-        self._save_data(user_id, data)
-
-    def get_customer_interactions(self, user_id: str) -> list[Dict[str, Any]]:
-        """Retrieve all customer interactions for a specific user.
+    def get_customer_interactions(
+        self,
+        user_id: str,
+        interaction_type: Optional[str] = None,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+    ) -> list[Dict[str, Any]]:
+        """Retrieve customer interactions for a specific user.
 
         Args:
             user_id: The ID of the user.
+            interaction_type: Only return interactions of this type (optional)
+            start: Only return interactions at or after this time (optional)
+            end: Only return interactions before this time (optional)
 
         Returns:
             List of interaction dictionaries
         """
-        data = self._load_data(user_id)
-        return data.get("customer_interactions", [])
+        return self._read_records(
+            user_id, "customer_interactions", {"type": interaction_type}, start, end
+        )
+
+    def get_daily_rollup(self, user_id: str, day: date) -> Dict[str, Any]:
+        """Get the activity counters of a user for one UTC day.
+
+        Counters are maintained as interactions, assets and leads are
+        stored, so this reads one small rollup instead of the day's records.
+        Records still in the write-behind buffer are stored first, so their
+        questions are counted under their cluster labels. The first read
+        computes the user's rollups from their stored data.
+
+        Args:
+            user_id: The ID of the user.
+            day: The calendar day (UTC)
+
+        Returns:
+            The day's rollup (see ``rollups.empty_rollup``)
+        """
+        with self._user_lock(user_id):
+            self.flush(user_id)
+            self.rollups.ensure_built(
+                user_id,
+                lambda: compute_rollups(
+                    self._read_section(user_id, "customer_interactions"),
+                    self._read_section(user_id, "marketing_assets"),
+                    LeadStore(self.base_storage_path, self.rollups).get_leads(user_id),
+                ),
+            )
+            return self.rollups.get(user_id, day)
 
     def store_performance_data(
         self, user_id: str, metric_name: str, metric_data: Dict[str, Any]
@@ -244,12 +1152,8 @@ class KnowledgeBaseService:
             metric_name: Name of the performance metric
             metric_data: Performance data dictionary
         """
-        data = self._load_data(user_id)
-        if "performance_data" not in data:
-            data["performance_data"] = {}
-
-        data["performance_data"][metric_name] = metric_data
-        self._save_data(user_id, data)
+        with self.transaction(user_id) as tx:
+            tx.store_performance_data(metric_name, metric_data)
 
     def get_performance_data(
         self, user_id: str, metric_name: Optional[str] = None
@@ -263,22 +1167,117 @@ class KnowledgeBaseService:
         Returns:
             Performance data dictionary
         """
-        data = self._load_data(user_id)
-        performance_data = data.get("performance_data", {})
+        performance_data = self._read_entries(user_id, "performance_data")
         if metric_name:
             return performance_data.get(metric_name, {})
-        return performance_data
+        return dict(performance_data)
+
+    def backfill_epoch_timestamps(self, user_id: str) -> int:
+        """Add epoch-millis timestamps to a user's records stored without them.
+
+        Records stored before timestamps were normalized at write time only
+        have the timestamp string; see
+        ``smallbizpal/scripts/backfill_epoch_timestamps.py``.
+
+        Args:
+            user_id: The ID of the user.
+
+        Returns:
+            Number of records updated
+        """
+        with self._user_lock(user_id):
+            self.flush(user_id)
+            return sum(
+                self._backfill_epoch_ms(user_id, section) for section in RECORD_SECTIONS
+            )
+
+    def stored_user_ids(self) -> List[str]:
+        """List the users with stored knowledge base data, e.g. for batch jobs.
+
+        Directories without knowledge base files (hidden directories, or
+        users with only reports) are left out.
+
+        Returns:
+            Sorted user IDs
+        """
+        if not self.base_storage_path.is_dir():
+            return []
+        return sorted(
+            path.name
+            for path in self.base_storage_path.iterdir()
+            if path.is_dir() and self._has_stored_files(path)
+        )
+
+    def _has_stored_files(self, user_dir: Path) -> bool:
+        """Check whether a user directory holds knowledge base files."""
+        return (user_dir / LEGACY_FILE_NAME).exists() or any(
+            (user_dir / f"{section}.json").exists()
+            for section in empty_knowledge_base()
+        )
 
     def clear_all_data(self, user_id: str) -> None:
         """Clear all stored data for a specific user (for testing/reset purposes)."""
-        data = {
-            "business_profile": {},
-            "marketing_assets": [],
-            "customer_interactions": [],
-            "performance_data": {},
-        }
-        self._save_data(user_id, data)
+        with self._user_lock(user_id):
+            if self.write_behind is not None:
+                self.write_behind.discard(user_id)
+            data = empty_knowledge_base()
+            # Keep the profile version increasing across resets
+            data["profile_meta"] = {"version": self.get_profile_version(user_id) + 1}
+            self._save_data(user_id, data)
+            self.rollups.clear(user_id)
+            self.question_clusters.clear(user_id)
+
+
+def create_knowledge_base_service(
+    backend: str = KNOWLEDGE_BASE_BACKEND,
+    base_storage_path: str = DATA_DIRECTORY,
+    cache_max_bytes: int = KNOWLEDGE_BASE_CACHE_BYTES,
+    write_behind: bool = KNOWLEDGE_BASE_WRITE_BEHIND,
+    storage_format: str = KNOWLEDGE_BASE_FORMAT,
+) -> KnowledgeBaseService:
+    """Create a knowledge base service for the configured storage backend.
+
+    Args:
+        backend: Storage backend name ("json", "append_only", "partitioned" or
+            "sqlite")
+        base_storage_path: Path to the directory for data storage
+        cache_max_bytes: Byte budget of the parsed-file cache (file backends)
+        write_behind: Buffer writes and store them in groups
+        storage_format: Encoding of written files ("json", "compact" or
+            "msgpack"; file backends)
+
+    Returns:
+        KnowledgeBaseService instance for the requested backend
+    """
+    buffer = (
+        WriteBehindBuffer(
+            KNOWLEDGE_BASE_FLUSH_MAX_OPERATIONS, KNOWLEDGE_BASE_FLUSH_INTERVAL_SECONDS
+        )
+        if write_behind
+        else None
+    )
+    if backend == "json":
+        return KnowledgeBaseService(
+            base_storage_path, cache_max_bytes, buffer, get_serializer(storage_format)
+        )
+    if backend == "append_only":
+        from .append_only_knowledge_base import AppendOnlyKnowledgeBaseService
+
+        return AppendOnlyKnowledgeBaseService(
+            base_storage_path, cache_max_bytes, buffer, get_serializer(storage_format)
+        )
+    if backend == "partitioned":
+        from .partitioned_knowledge_base import PartitionedKnowledgeBaseService
+
+        return PartitionedKnowledgeBaseService(
+            base_storage_path, cache_max_bytes, buffer, get_serializer(storage_format)
+        )
+    if backend == "sqlite":
+        from .sqlite_knowledge_base import SQLiteKnowledgeBaseService
+
+        return SQLiteKnowledgeBaseService(base_storage_path, write_behind=buffer)
+    raise ValueError(f"Unknown knowledge base backend: {backend}")
 
 
 # Global singleton instance
-knowledge_base_service = KnowledgeBaseService()
+knowledge_base_service = create_knowledge_base_service()
@@ -0,0 +1,289 @@
+#   Copyright 2025 Akshat Deepak Joshi
+
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+
+#       http://www.apache.org/licenses/LICENSE-2.0
+
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+import json
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from smallbizpal.config.settings import DATA_DIRECTORY
+from smallbizpal.shared.utils.files import write_file_atomic
+from smallbizpal.shared.utils.timestamps import (
+    epoch_field,
+    record_epoch_ms,
+    utc_day,
+    with_epoch_ms,
+)
+
+from .rollups import DailyRollupStore
+from .serializers import iter_document_array
+
+LEADS_LOG_FILE_NAME = "leads.jsonl"
+# Array written by earlier versions, converted to the log on first access
+LEGACY_LEADS_FILE_NAME = "leads.json"
+# Users whose lead indexes a store keeps in memory, least recently used first out
+MAX_INDEXED_USERS = 256
+
+
+@dataclass
+class LeadIndex:
+    """In-memory view of a user's lead log.
+
+    Attributes:
+        leads: Every lead, by position (line order in the log)
+        by_day: Positions of the leads of each UTC day (YYYY-MM-DD)
+        offset: Bytes of the log already indexed
+    """
+
+    leads: List[Dict[str, Any]] = field(default_factory=list)
+    by_day: Dict[str, List[int]] = field(default_factory=dict)
+    offset: int = 0
+
+    def add(self, lead: Dict[str, Any]) -> int:
+        """Index a lead, returning its position."""
+        position = len(self.leads)
+        self.leads.append(lead)
+        day = utc_day(record_epoch_ms(lead, "timestamp"))
+        if day is not None:
+            self.by_day.setdefault(day.isoformat(), []).append(position)
+        return position
+
+
+class LeadStore:
+    """Append-only store of the leads captured for each user.
+
+    Layout per user::
+
+        data/<user_id>/leads/leads.jsonl
+
+    Saving a lead appends one line instead of rewriting every lead. Each
+    user's log is indexed in memory by UTC day the first time it is read;
+    lines appended since (also by other processes) are indexed incrementally
+    from the last indexed offset. At most ``max_users`` indexes are kept; the
+    least recently read user's index is dropped first and rebuilt on their
+    next read. Users whose leads were saved in the older ``leads.json`` array
+    get it converted to the log once, the first time their leads are accessed.
+
+    Lead positions are line numbers in the log, so they stay stable as
+    leads are appended and can be used as export cursors.
+
+    Saving a lead also counts it in the daily rollup of its day.
+    """
+
+    def __init__(
+        self,
+        base_storage_path: str = "data",
+        rollups: Optional[DailyRollupStore] = None,
+        max_users: int = MAX_INDEXED_USERS,
+    ):
+        """Initialize the lead store.
+
+        Args:
+            base_storage_path: Directory holding each user's data directory
+            rollups: Daily rollups counting saved leads (default: the
+                rollups of ``base_storage_path``)
+            max_users: Users whose lead indexes are kept in memory
+        """
+        self.base_storage_path = Path(base_storage_path)
+        self.rollups = rollups or DailyRollupStore(base_storage_path)
+        self.max_users = max_users
+        self._indexes: "OrderedDict[str, LeadIndex]" = OrderedDict()
+        self._locks: Dict[str, threading.RLock] = {}
+        self._locks_guard = threading.Lock()
+
+    def _user_lock(self, user_id: str) -> threading.RLock:
+        """Get the lock serializing lead writes and indexing of a user."""
+        with self._locks_guard:
+            return self._locks.setdefault(user_id, threading.RLock())
+
+    def _get_leads_dir(self, user_id: str) -> Path:
+        """Get the leads directory for a user."""
+        return self.base_storage_path / user_id / "leads"
+
+    def _get_log_path(self, user_id: str) -> Path:
+        """Get a user's lead log, converting a legacy leads.json once."""
+        leads_dir = self._get_leads_dir(user_id)
+        log_path = leads_dir / LEADS_LOG_FILE_NAME
+        legacy_path = leads_dir / LEGACY_LEADS_FILE_NAME
+        if not log_path.exists() and legacy_path.exists():
+            try:
+                leads = list(iter_document_array(legacy_path))
+            except ValueError:
+                leads = []
+            write_file_atomic(
+                log_path, "".join(json.dumps(lead) + "\n" for lead in leads)
+            )
+            legacy_path.replace(legacy_path.with_name(f"{legacy_path.name}.migrated"))
+        return log_path
+
+    def _index(self, user_id: str) -> LeadIndex:
+        """Get a user's index, first indexing any lines appended to the log."""
+        with self._user_lock(user_id):
+            log_path = self._get_log_path(user_id)
+            with self._locks_guard:
+                index = self._indexes.get(user_id)
+                if index is not None:
+                    self._indexes.move_to_end(user_id)
+            try:
+                size = log_path.stat().st_size
+            except FileNotFoundError:
+                size = 0
+            if index is None or size < index.offset:
+                # First access, or the log was cleared or replaced
+                index = LeadIndex()
+                with self._locks_guard:
+                    self._indexes[user_id] = index
+                    while len(self._indexes) > self.max_users:
+                        self._indexes.popitem(last=False)
+            if size > index.offset:
+                with open(log_path, "rb") as f:
+                    f.seek(index.offset)
+                    chunk = f.read(size - index.offset)
+                # Leave a line still being written for the next read
+                complete = chunk.rfind(b"\n") + 1
+                for line in chunk[:complete].splitlines():
+                    if not line.strip():
+                        continue
+                    try:
+                        index.add(json.loads(line))
+                    except json.JSONDecodeError:
+                        continue
+                index.offset += complete
+            return index
+
+    def append(self, user_id: str, lead: Dict[str, Any]) -> int:
+        """Save a lead by appending it to the user's log and count it.
+
+        Args:
+            user_id: The ID of the user.
+            lead: Lead record, with at least ``email`` and ``timestamp``;
+                ``timestamp_ms`` is added to it
+
+        Returns:
+            The lead's position
+        """
+        with_epoch_ms(lead, "timestamp")
+        line = (json.dumps(lead) + "\n").encode()
+        with self._user_lock(user_id):
+            # Index earlier lines first so the new lead gets the next position
+            position = len(self._index(user_id).leads)
+            log_path = self._get_log_path(user_id)
+            log_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(log_path, "ab+") as f:
+                # Terminate a torn last line so it cannot swallow this lead
+                end = f.seek(0, os.SEEK_END)
+                if end > 0:
+                    f.seek(end - 1)
+                    if f.read(1) != b"\n":
+                        line = b"\n" + line
+                f.write(line)
+            self._index(user_id)
+            self.rollups.record_lead(user_id, lead)
+        return position
+
+    def get_leads(self, user_id: str) -> List[Dict[str, Any]]:
+        """Get all of a user's leads in the order they were captured."""
+        return list(self._index(user_id).leads)
+
+    def scan_leads(
+        self, user_id: str, offset: int = 0
+    ) -> Iterator[Tuple[int, Dict[str, Any]]]:
+        """Stream a user's leads straight from the log, without indexing them.
+
+        Memory use does not grow with the number of leads, and resuming from
+        an offset only reads the lines after it.
+
+        Args:
+            user_id: The ID of the user.
+            offset: Byte offset in the log to start at: 0, or the end offset
+                of the last lead read
+
+        Yields:
+            (end offset, lead) pairs in capture order
+        """
+        try:
+            f = open(self._get_log_path(user_id), "rb")
+        except FileNotFoundError:
+            return
+        with f:
+            offset = f.seek(max(offset, 0))
+            for line in f:
+                if not line.endswith(b"\n"):
+                    # Leave a line still being written for the next read
+                    return
+                offset += len(line)
+                if not line.strip():
+                    continue
+                try:
+                    lead = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                yield offset, lead
+
+    def get_leads_by_day(self, user_id: str, day: date) -> List[Dict[str, Any]]:
+        """Get a user's leads captured on a UTC day."""
+        index = self._index(user_id)
+        positions = index.by_day.get(day.isoformat(), [])
+        return [index.leads[position] for position in positions]
+
+    def get_leads_between(
+        self, user_id: str, start: date, end: date
+    ) -> List[Dict[str, Any]]:
+        """Get a user's leads captured from ``start`` to ``end`` (inclusive)."""
+        index = self._index(user_id)
+        positions: List[int] = []
+        day = start
+        while day <= end:
+            positions.extend(index.by_day.get(day.isoformat(), []))
+            day += timedelta(days=1)
+        return [index.leads[position] for position in sorted(positions)]
+
+    def backfill_epoch_timestamps(self, user_id: str) -> int:
+        """Add ``timestamp_ms`` to a user's leads saved without it.
+
+        The log is rewritten atomically with the leads in the same order, so
+        positions are kept.
+
+        Returns:
+            Number of leads updated
+        """
+        with self._user_lock(user_id):
+            leads = [dict(lead) for lead in self._index(user_id).leads]
+            missing = [lead for lead in leads if epoch_field("timestamp") not in lead]
+            if not missing:
+                return 0
+            for lead in missing:
+                with_epoch_ms(lead, "timestamp")
+            write_file_atomic(
+                self._get_log_path(user_id),
+                "".join(json.dumps(lead) + "\n" for lead in leads),
+            )
+            with self._locks_guard:
+                self._indexes.pop(user_id, None)
+        return len(missing)
+
+    def clear(self, user_id: str) -> None:
+        """Delete all of a user's leads."""
+        with self._user_lock(user_id):
+            self._get_log_path(user_id).unlink(missing_ok=True)
+            with self._locks_guard:
+                self._indexes.pop(user_id, None)
+
+
+# Global lead store over the configured data directory
+lead_store = LeadStore(DATA_DIRECTORY)
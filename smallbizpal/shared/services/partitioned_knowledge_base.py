@@ -0,0 +1,371 @@
+#   Copyright 2025 Akshat Deepak Joshi
+
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+
+#       http://www.apache.org/licenses/LICENSE-2.0
+
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+import heapq
+import json
+import os
+import shutil
+import threading
+from datetime import date, datetime
+from operator import itemgetter
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from smallbizpal.shared.utils.timestamps import record_epoch_ms, to_epoch_ms, utc_day
+
+from .append_only_knowledge_base import AppendOnlyKnowledgeBaseService
+from .cache import file_stamp
+from .knowledge_base import (
+    RECORD_SECTIONS,
+    TIMESTAMP_FIELDS,
+    file_version,
+    filter_records,
+    json_serializer,
+)
+
+# Partition of records whose timestamp is missing or cannot be parsed
+UNDATED_PARTITION = "undated"
+MANIFEST_FILE_NAME = "manifest.json"
+DAY_MS = 24 * 60 * 60 * 1000
+
+# Manifest: {"next_position": int, "partitions": {name: {"runs", "size"}}}
+Manifest = Dict[str, Any]
+
+
+def partition_name(section: str, record: Dict[str, Any]) -> str:
+    """Get the partition of a record: its UTC day (YYYY-MM-DD) or "undated"."""
+    day = utc_day(record_epoch_ms(record, TIMESTAMP_FIELDS[section]))
+    return day.isoformat() if day is not None else UNDATED_PARTITION
+
+
+def partition_ordinal(name: str) -> int:
+    """Get the sort order of a partition; undated records come first."""
+    if name == UNDATED_PARTITION:
+        return 0
+    return date.fromisoformat(name).toordinal()
+
+
+def partitions_in_range(
+    names: Iterable[str],
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+) -> List[str]:
+    """Select the partitions that can hold records in ``[start, end)``.
+
+    Args:
+        names: Partition names from a manifest
+        start: Inclusive lower bound on the record timestamp (optional)
+        end: Exclusive upper bound on the record timestamp (optional)
+
+    Returns:
+        Matching partition names in storage order
+    """
+    names = sorted(names, key=partition_ordinal)
+    if start is None and end is None:
+        return names
+    start_ms = to_epoch_ms(start) if start is not None else None
+    end_ms = to_epoch_ms(end) if end is not None else None
+    selected = []
+    for name in names:
+        if name == UNDATED_PARTITION:
+            # A time range never matches records without a timestamp
+            continue
+        day_start = to_epoch_ms(date.fromisoformat(name))
+        if start_ms is not None and day_start + DAY_MS <= start_ms:
+            continue
+        if end_ms is not None and day_start >= end_ms:
+            continue
+        selected.append(name)
+    return selected
+
+
+def run_positions(runs: Iterable[List[int]]) -> Iterator[int]:
+    """Expand ``[first, count]`` position runs into the positions of each line."""
+    for first, count in runs:
+        yield from range(first, first + count)
+
+
+def add_run(runs: List[List[int]], first: int, count: int) -> None:
+    """Add positions to a partition's runs, extending the last run if adjacent."""
+    if runs and runs[-1][0] + runs[-1][1] == first:
+        runs[-1][1] += count
+    else:
+        runs.append([first, count])
+
+
+class PartitionedKnowledgeBaseService(AppendOnlyKnowledgeBaseService):
+    """Append-only knowledge base with record sections partitioned by day.
+
+    Marketing assets and customer interactions are appended to one segment
+    per UTC day of their timestamp, listed in a manifest::
+
+        data/<user_id>/segments/<section>/<YYYY-MM-DD>.jsonl
+        data/<user_id>/segments/<section>/undated.jsonl
+        data/<user_id>/segments/<section>/manifest.json
+
+    Reads with a time range only open the partitions overlapping it, so the
+    cost of a daily query depends on that day's volume rather than on the
+    user's whole history. The profile and performance data are stored as in
+    the append-only backend. Unpartitioned segments are split into
+    partitions the first time a user's section is accessed.
+
+    Record positions (used by pagination and export cursors) come from a
+    per-section append counter kept in the manifest, which maps the lines
+    of each partition to runs of positions. Every append gets positions
+    above all earlier ones, whatever day it lands in, so an export resumed
+    from a cursor also sees undated and backdated records added later.
+    """
+
+    def _get_partition_dir(self, user_id: str, section: str) -> Path:
+        """Get a record section's partition directory, splitting its segment once."""
+        partition_dir = self._get_segments_dir(user_id) / section
+        if not partition_dir.exists():
+            with self._user_lock(user_id):
+                if not partition_dir.exists():
+                    self._split_segment(user_id, section, partition_dir)
+        return partition_dir
+
+    def _split_segment(self, user_id: str, section: str, partition_dir: Path) -> None:
+        """Split an unpartitioned segment into partitions.
+
+        Records keep their append-only positions (line numbers). Partitions
+        are written to a temporary directory that is renamed into place, so
+        a crash mid-way leaves the segment to be split again.
+        """
+        segment = self._get_segment_path(user_id, section)
+        records = list(self._iter_segment(segment))
+        tmp_dir = partition_dir.with_name(
+            f"{partition_dir.name}.{os.getpid()}.{threading.get_ident()}.tmp"
+        )
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        tmp_dir.mkdir()
+        self._write_partitions(tmp_dir, section, list(enumerate(records)), len(records))
+        try:
+            tmp_dir.rename(partition_dir)
+        except OSError:
+            # Another process split the segment first
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            return
+        if segment.exists():
+            segment.replace(segment.with_name(f"{segment.name}.migrated"))
+
+    def _read_manifest(self, partition_dir: Path) -> Manifest:
+        """Read the append counter and the position runs of each partition.
+
+        The returned manifest may be shared with other readers; copy it
+        before changing it.
+        """
+        value = self._read_cached(
+            partition_dir / MANIFEST_FILE_NAME, lambda p: json.loads(p.read_bytes())
+        )
+        if value is None:
+            return {"next_position": 0, "partitions": {}}
+        return value
+
+    def _write_manifest(self, partition_dir: Path, manifest: Manifest) -> None:
+        self._write_atomic(
+            partition_dir / MANIFEST_FILE_NAME,
+            json.dumps(
+                {
+                    "next_position": manifest["next_position"],
+                    "partitions": dict(sorted(manifest["partitions"].items())),
+                },
+                indent=2,
+            ),
+        )
+
+    def _write_partitions(
+        self,
+        partition_dir: Path,
+        section: str,
+        records: List[Tuple[int, Dict[str, Any]]],
+        next_position: int,
+    ) -> None:
+        """Replace every partition of a section with the given records.
+
+        Args:
+            partition_dir: The section's partition directory
+            section: Name of the record section
+            records: (position, record) pairs in position order
+            next_position: Append counter after these records
+        """
+        groups: Dict[str, List[Tuple[int, Dict[str, Any]]]] = {}
+        for position, record in records:
+            groups.setdefault(partition_name(section, record), []).append(
+                (position, record)
+            )
+        for path in partition_dir.glob("*.jsonl"):
+            if path.stem not in groups:
+                path.unlink()
+                self._invalidate_cached(path)
+        partitions: Dict[str, Dict[str, Any]] = {}
+        for name, group in groups.items():
+            content = "".join(
+                json.dumps(record, default=json_serializer) + "\n"
+                for _, record in group
+            ).encode()
+            self._write_atomic(partition_dir / f"{name}.jsonl", content)
+            runs: List[List[int]] = []
+            for position, _ in group:
+                add_run(runs, position, 1)
+            partitions[name] = {"runs": runs, "size": len(content)}
+        self._write_manifest(
+            partition_dir, {"next_position": next_position, "partitions": partitions}
+        )
+
+    def _partition_records(
+        self, partition_dir: Path, name: str, runs: List[List[int]]
+    ) -> Iterator[Tuple[int, Dict[str, Any]]]:
+        """Pair the records of a partition with their positions.
+
+        Lines beyond the manifest's runs belong to an append that has not
+        updated the manifest yet, and are left out until it does.
+        """
+        records = self._read_cached(
+            partition_dir / f"{name}.jsonl", lambda p: list(self._iter_segment(p))
+        )
+        return zip(run_positions(runs), records or [])
+
+    def _iter_partitions(
+        self,
+        user_id: str,
+        section: str,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+    ) -> Iterator[Tuple[int, Dict[str, Any]]]:
+        """Yield the records of the partitions overlapping a time range.
+
+        Yields:
+            (position, record) pairs in position (append) order
+        """
+        partition_dir = self._get_partition_dir(user_id, section)
+        partitions = self._read_manifest(partition_dir)["partitions"]
+        return heapq.merge(
+            *(
+                self._partition_records(partition_dir, name, partitions[name]["runs"])
+                for name in partitions_in_range(partitions, start, end)
+            ),
+            key=itemgetter(0),
+        )
+
+    def _read_section(self, user_id: str, section: str) -> Any:
+        if section in RECORD_SECTIONS:
+            return [record for _, record in self._iter_partitions(user_id, section)]
+        return super()._read_section(user_id, section)
+
+    def _section_version(self, user_id: str, section: str) -> str:
+        if section in RECORD_SECTIONS:
+            # Every write to a partition also rewrites the manifest
+            partition_dir = self._get_partition_dir(user_id, section)
+            return file_version(partition_dir / MANIFEST_FILE_NAME)
+        return super()._section_version(user_id, section)
+
+    def _write_section(self, user_id: str, section: str, value: Any) -> None:
+        if section in RECORD_SECTIONS:
+            partition_dir = self._get_partition_dir(user_id, section)
+            manifest = self._read_manifest(partition_dir)
+            records = list(value)
+            # Rewritten records keep the positions of the records they
+            # replace, as line numbers do in the other backends
+            positions = sorted(
+                position
+                for partition in manifest["partitions"].values()
+                for position in run_positions(partition["runs"])
+            )[: len(records)]
+            next_position = manifest["next_position"]
+            positions.extend(
+                range(next_position, next_position + len(records) - len(positions))
+            )
+            self._write_partitions(
+                partition_dir,
+                section,
+                list(zip(positions, records)),
+                max(next_position, positions[-1] + 1 if positions else 0),
+            )
+            return
+        super()._write_section(user_id, section, value)
+
+    def _append_entries(
+        self, user_id: str, section: str, entries: List[Dict[str, Any]]
+    ) -> None:
+        if section not in RECORD_SECTIONS:
+            super()._append_entries(user_id, section, entries)
+            return
+        partition_dir = self._get_partition_dir(user_id, section)
+        manifest = self._read_manifest(partition_dir)
+        next_position = manifest["next_position"]
+        partitions = {
+            name: {
+                "runs": [list(run) for run in partition["runs"]],
+                "size": partition["size"],
+            }
+            for name, partition in manifest["partitions"].items()
+        }
+        groups: Dict[str, List[Dict[str, Any]]] = {}
+        for entry in entries:
+            groups.setdefault(partition_name(section, entry), []).append(entry)
+        for name in groups:
+            partition = partitions.setdefault(name, {"runs": [], "size": 0})
+            path = partition_dir / f"{name}.jsonl"
+            stamp = file_stamp(path)
+            if (stamp[1] if stamp is not None else 0) != partition["size"]:
+                # An earlier append stopped before updating the manifest:
+                # give its records positions before adding new ones
+                stored = sum(1 for _ in self._iter_segment(path))
+                orphaned = stored - sum(count for _, count in partition["runs"])
+                if orphaned > 0:
+                    add_run(partition["runs"], next_position, orphaned)
+                    next_position += orphaned
+        # Positions follow the order of the entries, across partitions
+        for entry in entries:
+            add_run(
+                partitions[partition_name(section, entry)]["runs"], next_position, 1
+            )
+            next_position += 1
+        for name, group in groups.items():
+            path = partition_dir / f"{name}.jsonl"
+            self._append_lines(path, group)
+            partitions[name]["size"] = file_stamp(path)[1]
+        self._write_manifest(
+            partition_dir, {"next_position": next_position, "partitions": partitions}
+        )
+
+    def _iter_section(
+        self, user_id: str, section: str, after: Optional[int]
+    ) -> Iterator[Tuple[int, Dict[str, Any]]]:
+        for position, record in self._iter_partitions(user_id, section):
+            if after is None or position > after:
+                yield position, record
+
+    def _positioned_records(
+        self,
+        user_id: str,
+        section: str,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+    ) -> Iterable[Tuple[int, Dict[str, Any]]]:
+        return self._iter_partitions(user_id, section, start, end)
+
+    def _query_records(
+        self,
+        user_id: str,
+        section: str,
+        filters: Dict[str, Any],
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+    ) -> List[Dict[str, Any]]:
+        records = [
+            record for _, record in self._iter_partitions(user_id, section, start, end)
+        ]
+        return filter_records(records, section, filters, start, end)
@@ -0,0 +1,393 @@
+#   Copyright 2025 Akshat Deepak Joshi
+
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+
+#       http://www.apache.org/licenses/LICENSE-2.0
+
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+"""
+Near-duplicate clustering of customer questions.
+
+Questions are normalized (lowercased, common chat shorthand expanded,
+stopwords dropped), split into character shingles and summarized by a
+MinHash signature. Locality-sensitive hashing over bands of the signature
+finds the clusters a new question may belong to without comparing it to
+every earlier question. Each question is assigned when its interaction is
+stored, and the cluster's label (its first question) is stored on the
+interaction, so top questions are counted per cluster rather than per
+exact string. Assignments are appended to a per-user log, so storing a
+question never rewrites the user's other clusters.
+"""
+
+import heapq
+import json
+import os
+import threading
+import zlib
+from collections import OrderedDict
+from contextlib import contextmanager
+from pathlib import Path
+from typing import (
+    Any,
+    ContextManager,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+)
+
+import numpy as np
+
+from smallbizpal.shared.models.business_profile import tokenize
+
+from .embeddings import STOPWORDS
+
+QUESTION_CLUSTERS_FILE_NAME = "question_clusters.jsonl"
+# Users whose clusters a store keeps in memory, least recently used first out
+MAX_CLUSTERED_USERS = 256
+
+# Interaction types whose question or topic is counted as a customer question
+QUESTION_TYPES = ("question", "inquiry")
+# Interaction field holding the label of the question's cluster
+QUESTION_CLUSTER_FIELD = "question_cluster"
+
+# Chat shorthand expanded before comparing questions
+SHORTHAND = {
+    "u": "you",
+    "ur": "your",
+    "r": "are",
+    "pls": "please",
+    "plz": "please",
+    "thx": "thanks",
+    "hrs": "hours",
+    "wknd": "weekend",
+}
+
+SHINGLE_SIZE = 3
+# MinHash signature length, split into LSH bands of BAND_ROWS values
+NUM_HASHES = 64
+BAND_ROWS = 4
+# Estimated Jaccard similarity needed to join a cluster
+SIMILARITY_THRESHOLD = 0.5
+# Fixed seed so signatures stay comparable across processes and restarts
+HASH_SEED = 2025
+MERSENNE_PRIME = (1 << 31) - 1
+
+_rng = np.random.default_rng(HASH_SEED)
+_HASH_A = _rng.integers(1, MERSENNE_PRIME, NUM_HASHES, dtype=np.uint64)
+_HASH_B = _rng.integers(0, MERSENNE_PRIME, NUM_HASHES, dtype=np.uint64)
+
+Operation = Tuple[Any, ...]
+
+
+def question_text(interaction: Dict[str, Any]) -> str:
+    """Get the question of an interaction ("" if it is not a question)."""
+    if interaction.get("type") not in QUESTION_TYPES:
+        return ""
+    return interaction.get("question", interaction.get("topic", "")) or ""
+
+
+def normalize_question(text: str) -> str:
+    """Normalize a question for near-duplicate comparison.
+
+    Example: "What r ur hours?" and "what are your HOURS" both become "hours".
+    """
+    tokens = [SHORTHAND.get(token, token) for token in tokenize(text)]
+    # Single letters are mostly left over from contractions ("what's")
+    content = [t for t in tokens if t not in STOPWORDS and len(t) > 1]
+    return " ".join(content or tokens)
+
+
+def shingles(normalized: str) -> List[str]:
+    """Split a normalized question into overlapping character shingles."""
+    padded = f" {normalized} "
+    if len(padded) <= SHINGLE_SIZE:
+        return [padded]
+    return [padded[i : i + SHINGLE_SIZE] for i in range(len(padded) - SHINGLE_SIZE + 1)]
+
+
+def minhash_signature(normalized: str) -> np.ndarray:
+    """Compute the MinHash signature of a normalized question."""
+    hashes = np.array(
+        [zlib.crc32(s.encode()) & MERSENNE_PRIME for s in set(shingles(normalized))],
+        dtype=np.uint64,
+    )
+    # (a * x + b) mod p stays below 2**63 for 31-bit a, x and b
+    return ((np.outer(hashes, _HASH_A) + _HASH_B) % MERSENNE_PRIME).min(axis=0)
+
+
+def band_keys(signature: np.ndarray) -> List[Tuple[int, bytes]]:
+    """Get the LSH bucket keys of a signature, one per band."""
+    return [
+        (band, signature[start : start + BAND_ROWS].tobytes())
+        for band, start in enumerate(range(0, NUM_HASHES, BAND_ROWS))
+    ]
+
+
+class QuestionClusters:
+    """The question clusters of one user.
+
+    Attributes:
+        clusters: Each cluster's label, question count and signature
+        buckets: Clusters of each LSH band key
+    """
+
+    def __init__(self, clusters: Optional[List[Dict[str, Any]]] = None):
+        self.clusters: List[Dict[str, Any]] = []
+        self.buckets: Dict[Tuple[int, bytes], List[int]] = {}
+        for cluster in clusters or []:
+            self._add_cluster(
+                cluster["label"],
+                cluster["count"],
+                np.array(cluster["signature"], dtype=np.uint64),
+            )
+
+    def _add_cluster(self, label: str, count: int, signature: np.ndarray) -> int:
+        cluster_id = len(self.clusters)
+        self.clusters.append({"label": label, "count": count, "signature": signature})
+        for key in band_keys(signature):
+            self.buckets.setdefault(key, []).append(cluster_id)
+        return cluster_id
+
+    def assign(self, question: str) -> Optional[str]:
+        """Count a question in its cluster, creating the cluster if needed.
+
+        Returns:
+            The cluster's label, or None for an empty question
+        """
+        cluster_id = self.assign_id(question)
+        return None if cluster_id is None else self.clusters[cluster_id]["label"]
+
+    def assign_id(self, question: str) -> Optional[int]:
+        """Count a question in its cluster, creating the cluster if needed.
+
+        Returns:
+            The cluster's ID (its index), or None for an empty question
+        """
+        normalized = normalize_question(question)
+        if not normalized:
+            return None
+        signature = minhash_signature(normalized)
+        candidates = {
+            cluster_id
+            for key in band_keys(signature)
+            for cluster_id in self.buckets.get(key, [])
+        }
+        best, best_similarity = None, SIMILARITY_THRESHOLD
+        for cluster_id in candidates:
+            similarity = float(
+                np.mean(self.clusters[cluster_id]["signature"] == signature)
+            )
+            if similarity >= best_similarity:
+                best, best_similarity = cluster_id, similarity
+        if best is None:
+            best = self._add_cluster(question.strip(), 0, signature)
+        self.clusters[best]["count"] += 1
+        return best
+
+    def log_entry(self, cluster_id: int, created: bool) -> Dict[str, Any]:
+        """Get the log entry recording one question assigned to a cluster."""
+        cluster = self.clusters[cluster_id]
+        if not created:
+            return {"cluster": cluster_id}
+        return {"label": cluster["label"], "signature": cluster["signature"].tolist()}
+
+    def replay(self, entry: Dict[str, Any]) -> None:
+        """Apply an entry of the assignment log."""
+        if "cluster" in entry:
+            if 0 <= entry["cluster"] < len(self.clusters):
+                self.clusters[entry["cluster"]]["count"] += 1
+            return
+        self._add_cluster(
+            entry["label"], 1, np.array(entry["signature"], dtype=np.uint64)
+        )
+
+    def top(self, limit: int) -> List[Dict[str, Any]]:
+        """Get the most asked clusters as ``{"question", "frequency"}`` dicts."""
+        largest = heapq.nlargest(
+            limit, self.clusters, key=lambda cluster: cluster["count"]
+        )
+        return [
+            {"question": cluster["label"], "frequency": cluster["count"]}
+            for cluster in largest
+        ]
+
+
+class QuestionClusterStore:
+    """Per-user question clusters, assigned on the write path.
+
+    Layout per user::
+
+        data/<user_id>/question_clusters.jsonl
+
+    Each line of the log records one assigned question: a new cluster with
+    its label and signature, or ``{"cluster": id}`` for a question joining
+    an existing cluster. A user's clusters are replayed from the log the
+    first time they are used; lines appended since (also by other
+    processes) are replayed incrementally from the last read offset. At
+    most ``max_users`` users' clusters are kept; the least recently used
+    are dropped first and replayed again on their next use.
+    """
+
+    def __init__(
+        self, base_storage_path: str = "data", max_users: int = MAX_CLUSTERED_USERS
+    ):
+        """Initialize the cluster store.
+
+        Args:
+            base_storage_path: Directory holding each user's data directory
+            max_users: Users whose clusters are kept in memory
+        """
+        self.base_storage_path = Path(base_storage_path)
+        self.max_users = max_users
+        # user_id -> (bytes of the log replayed, clusters)
+        self._clusters: "OrderedDict[str, Tuple[int, QuestionClusters]]" = OrderedDict()
+        self._locks: Dict[str, threading.RLock] = {}
+        self._locks_guard = threading.Lock()
+
+    def _user_lock(self, user_id: str) -> threading.RLock:
+        """Get the lock serializing cluster updates of a user."""
+        with self._locks_guard:
+            return self._locks.setdefault(user_id, threading.RLock())
+
+    def _get_path(self, user_id: str) -> Path:
+        return self.base_storage_path / user_id / QUESTION_CLUSTERS_FILE_NAME
+
+    def _load(self, user_id: str) -> QuestionClusters:
+        """Get a user's clusters, first replaying lines appended to the log."""
+        path = self._get_path(user_id)
+        with self._locks_guard:
+            offset, clusters = self._clusters.get(user_id, (0, None))
+            if clusters is not None:
+                self._clusters.move_to_end(user_id)
+        try:
+            size = path.stat().st_size
+        except FileNotFoundError:
+            size = 0
+        if clusters is None or size < offset:
+            # First access, or the log was cleared or replaced
+            offset, clusters = 0, QuestionClusters()
+        if size > offset:
+            with open(path, "rb") as f:
+                f.seek(offset)
+                chunk = f.read(size - offset)
+            # Leave a line still being written for the next read
+            complete = chunk.rfind(b"\n") + 1
+            for line in chunk[:complete].splitlines():
+                try:
+                    clusters.replay(json.loads(line))
+                except (ValueError, KeyError, TypeError):
+                    continue
+            offset += complete
+        with self._locks_guard:
+            self._clusters[user_id] = (offset, clusters)
+            self._clusters.move_to_end(user_id)
+            while len(self._clusters) > self.max_users:
+                self._clusters.popitem(last=False)
+        return clusters
+
+    def _append(self, user_id: str, entries: List[Dict[str, Any]]) -> None:
+        """Append assignments, already applied to the loaded clusters, to the log."""
+        path = self._get_path(user_id)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        data = b"".join((json.dumps(entry) + "\n").encode() for entry in entries)
+        with open(path, "ab+") as f:
+            end = f.seek(0, os.SEEK_END)
+            # Terminate a torn last line so it cannot swallow these entries
+            if end > 0:
+                f.seek(end - 1)
+                if f.read(1) != b"\n":
+                    data = b"\n" + data
+            f.write(data)
+        with self._locks_guard:
+            offset, clusters = self._clusters.get(user_id, (0, None))
+            if clusters is None:
+                # Evicted since loaded: replayed from the log on next use
+                return
+            if end == offset:
+                self._clusters[user_id] = (end + len(data), clusters)
+            else:
+                # Another process appended first: replay the whole log next time
+                self._clusters.pop(user_id, None)
+
+    @contextmanager
+    def assigning(
+        self, user_id: str, interactions: Iterable[Dict[str, Any]]
+    ) -> Iterator[None]:
+        """Assign questions to clusters around the write storing them.
+
+        Sets ``QUESTION_CLUSTER_FIELD`` on every question interaction, then
+        runs the write holding the user's cluster lock. The assignments are
+        appended to the log only if the write succeeds; otherwise they are
+        forgotten, so cluster counts match the stored interactions.
+        """
+        questions = [
+            (interaction, question_text(interaction)) for interaction in interactions
+        ]
+        questions = [(interaction, text) for interaction, text in questions if text]
+        if not questions:
+            yield
+            return
+        with self._user_lock(user_id):
+            clusters = self._load(user_id)
+            entries = []
+            for interaction, text in questions:
+                known = len(clusters.clusters)
+                cluster_id = clusters.assign_id(text)
+                if cluster_id is None:
+                    continue
+                interaction[QUESTION_CLUSTER_FIELD] = clusters.clusters[cluster_id][
+                    "label"
+                ]
+                entries.append(clusters.log_entry(cluster_id, cluster_id >= known))
+            try:
+                yield
+            except BaseException:
+                # Replay the log without these assignments next time
+                with self._locks_guard:
+                    self._clusters.pop(user_id, None)
+                raise
+            if entries:
+                self._append(user_id, entries)
+
+    def assign(self, user_id: str, interactions: Iterable[Dict[str, Any]]) -> None:
+        """Assign questions to clusters, labelling each interaction in place."""
+        with self.assigning(user_id, interactions):
+            pass
+
+    def applying(
+        self, user_id: str, operations: Iterable[Operation]
+    ) -> ContextManager[None]:
+        """Assign the questions of knowledge base operations around their write.
+
+        See ``assigning``.
+        """
+        return self.assigning(
+            user_id,
+            [
+                operation[2]
+                for operation in operations
+                if operation[0] == "append" and operation[1] == "customer_interactions"
+            ],
+        )
+
+    def top_questions(self, user_id: str, limit: int = 5) -> List[Dict[str, Any]]:
+        """Get a user's most asked questions over their whole history."""
+        with self._user_lock(user_id):
+            return self._load(user_id).top(limit)
+
+    def clear(self, user_id: str) -> None:
+        """Delete all of a user's clusters."""
+        with self._user_lock(user_id):
+            self._get_path(user_id).unlink(missing_ok=True)
+            with self._locks_guard:
+                self._clusters.pop(user_id, None)
@@ -0,0 +1,215 @@
+#   Copyright 2025 Akshat Deepak Joshi
+
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+
+#       http://www.apache.org/licenses/LICENSE-2.0
+
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+import hashlib
+import json
+import threading
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from smallbizpal.config.settings import DATA_DIRECTORY
+
+from .knowledge_base import write_file_atomic
+
+REPORT_INDEX_FILE_NAME = "index.json"
+
+# Longest title kept in the index
+MAX_TITLE_LENGTH = 120
+
+
+def report_title(content: str) -> str:
+    """Get a report's title: its first markdown heading, else its first line."""
+    lines = [line.strip() for line in content.splitlines() if line.strip()]
+    for line in lines:
+        if line.startswith("#"):
+            return line.lstrip("#").strip()[:MAX_TITLE_LENGTH]
+    return lines[0][:MAX_TITLE_LENGTH] if lines else ""
+
+
+def report_entry(path: Path, content: bytes, created_at: str) -> Dict[str, Any]:
+    """Build the index entry describing a stored report file."""
+    name = path.name
+    return {
+        "filename": name,
+        "date": name.split("_")[0] if "_" in name else "unknown",
+        "title": report_title(content.decode("utf-8", errors="replace")),
+        "size_bytes": len(content),
+        "checksum": hashlib.sha256(content).hexdigest(),
+        "path": f"reports/{name}",
+        "created_at": created_at,
+    }
+
+
+class ReportStore:
+    """Markdown reports of each user plus an index of their metadata.
+
+    Layout per user::
+
+        data/<user_id>/reports/<date>_report.md
+        data/<user_id>/reports/index.json
+
+    ``save`` writes the report and updates the index, so listing reports
+    reads one small file instead of every report. Users whose reports were
+    written before the index existed get it built from the files once, the
+    first time their reports are listed.
+    """
+
+    def __init__(self, base_storage_path: str = "data"):
+        """Initialize the report store.
+
+        Args:
+            base_storage_path: Directory holding each user's data directory
+        """
+        self.base_storage_path = Path(base_storage_path)
+        self._locks: Dict[str, threading.RLock] = {}
+        self._locks_guard = threading.Lock()
+
+    def _user_lock(self, user_id: str) -> threading.RLock:
+        """Get the lock serializing index updates of a user."""
+        with self._locks_guard:
+            return self._locks.setdefault(user_id, threading.RLock())
+
+    def _get_reports_dir(self, user_id: str) -> Path:
+        """Get the reports directory for a user."""
+        return self.base_storage_path / user_id / "reports"
+
+    def _read_index(self, user_id: str) -> Optional[List[Dict[str, Any]]]:
+        """Read a user's index, or None if it is missing or corrupt."""
+        try:
+            index = json.loads(
+                (self._get_reports_dir(user_id) / REPORT_INDEX_FILE_NAME).read_bytes()
+            )
+        except (FileNotFoundError, ValueError):
+            return None
+        return index if isinstance(index, list) else None
+
+    def _write_index(self, user_id: str, index: List[Dict[str, Any]]) -> None:
+        """Replace a user's index, ordered by file name (report date)."""
+        index.sort(key=lambda entry: entry["filename"])
+        write_file_atomic(
+            self._get_reports_dir(user_id) / REPORT_INDEX_FILE_NAME,
+            json.dumps(index, indent=2),
+        )
+
+    def save(
+        self, user_id: str, filename: str, content: str, created_at: str
+    ) -> Dict[str, Any]:
+        """Store a report, replacing any report with the same file name.
+
+        Args:
+            user_id: The ID of the user.
+            filename: Report file name, e.g. ``2025-06-01_report.md``
+            content: Markdown content
+            created_at: When the report was generated
+
+        Returns:
+            The report's index entry
+        """
+        reports_dir = self._get_reports_dir(user_id)
+        reports_dir.mkdir(parents=True, exist_ok=True)
+        path = reports_dir / filename
+        body = content.encode("utf-8")
+        entry = report_entry(path, body, created_at)
+        with self._user_lock(user_id):
+            index = self._load_index(user_id)
+            write_file_atomic(path, body)
+            index = [item for item in index if item["filename"] != filename]
+            index.append(entry)
+            self._write_index(user_id, index)
+        return entry
+
+    def _load_index(self, user_id: str) -> List[Dict[str, Any]]:
+        """Read a user's index, building it from the report files if missing."""
+        index = self._read_index(user_id)
+        if index is None:
+            index = self.rebuild_index(user_id)
+        return index
+
+    def rebuild_index(self, user_id: str) -> List[Dict[str, Any]]:
+        """Rebuild a user's index by reading every report file.
+
+        Returns:
+            The rebuilt index (empty if the user has no reports)
+        """
+        reports_dir = self._get_reports_dir(user_id)
+        if not reports_dir.exists():
+            return []
+        with self._user_lock(user_id):
+            index = []
+            for path in reports_dir.glob("*.md"):
+                try:
+                    stat = path.stat()
+                    content = path.read_bytes()
+                except OSError:
+                    # Skip files that can't be read
+                    continue
+                created_at = datetime.fromtimestamp(stat.st_mtime, UTC).isoformat()
+                index.append(report_entry(path, content, created_at))
+            self._write_index(user_id, index)
+        return index
+
+    def list_reports(
+        self,
+        user_id: str,
+        limit: int = 50,
+        cursor: Optional[str] = None,
+        descending: bool = True,
+    ) -> Dict[str, Any]:
+        """List one page of a user's report metadata without reading reports.
+
+        Args:
+            user_id: The ID of the user.
+            limit: Maximum number of reports in the page
+            cursor: ``next_cursor`` of the previous page (optional)
+            descending: Return the newest reports first
+
+        Returns:
+            Dictionary with the page's ``items`` and the ``next_cursor`` to
+            pass for the following page (None on the last page)
+        """
+        index = self._load_index(user_id)
+        if descending:
+            index = index[::-1]
+        if cursor is not None:
+            index = [
+                entry
+                for entry in index
+                if (
+                    entry["filename"] < cursor
+                    if descending
+                    else entry["filename"] > cursor
+                )
+            ]
+        next_cursor = index[limit - 1]["filename"] if len(index) > limit else None
+        return {"items": index[:limit], "next_cursor": next_cursor}
+
+    def get_report_path(self, user_id: str, filename: str) -> Optional[Path]:
+        """Get the file of an indexed report.
+
+        Only file names present in the index resolve, so arbitrary paths
+        cannot be requested.
+
+        Returns:
+            Path of the report, or None if there is no such report
+        """
+        for entry in self._load_index(user_id):
+            if entry["filename"] == filename:
+                path = self._get_reports_dir(user_id) / filename
+                return path if path.exists() else None
+        return None
+
+
+# Global report store over the configured data directory
+report_store = ReportStore(DATA_DIRECTORY)
@@ -0,0 +1,559 @@
+#   Copyright 2025 Akshat Deepak Joshi
+
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+
+#       http://www.apache.org/licenses/LICENSE-2.0
+
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+"""
+Retrieval over each user's private knowledge base for the KB proxy agent.
+
+Every business profile field and every marketing asset is one chunk. Two
+indexes rank chunks against a customer question:
+
+- ``BM25Index``: lexical Okapi BM25, precise when the question shares words
+  with the profile
+- ``VectorIndex``: cosine similarity of dense vectors from a pluggable
+  ``Encoder``; the default ``HashingEncoder`` hashes character n-grams, so
+  "deliver" still matches "delivery" without any model download
+
+``KnowledgeRetriever`` keeps one index per user in memory and brings it up to
+date incrementally; ``VectorRetriever`` also persists it next to the user's
+knowledge base; ``HybridRetriever`` fuses several retrievers' rankings.
+"""
+
+import io
+import json
+import math
+import threading
+from collections import Counter, OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from smallbizpal.shared.utils.logging import logger
+
+from .embeddings import Encoder, HashingEncoder, retrieval_tokens
+from .knowledge_base import (
+    KnowledgeBaseService,
+    knowledge_base_service,
+    write_file_atomic,
+)
+
+# Smallest truncated snippet worth returning
+MIN_SNIPPET_CHARS = 40
+# Persisted vector index, stored in the user's knowledge base directory
+VECTOR_INDEX_FILE_NAME = "vector_index.npz"
+# Users whose indexes a retriever keeps in memory, least recently used first out
+MAX_INDEXED_USERS = 256
+# Rank offset of reciprocal rank fusion; damps the weight of the top ranks
+RRF_K = 60
+
+# A ranked chunk: (doc_id, score, text)
+Hit = Tuple[str, float, str]
+
+
+class BM25Index:
+    """Incrementally maintained Okapi BM25 index over short text chunks.
+
+    Documents can be added, replaced and removed one at a time; corpus
+    statistics (document frequencies and average length) are kept up to date
+    so no full rebuild is needed.
+    """
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        """Initialize an empty index.
+
+        Args:
+            k1: Term frequency saturation
+            b: Document length normalization
+        """
+        self.k1 = k1
+        self.b = b
+        self.term_freqs: Dict[str, Counter] = {}
+        self.doc_lengths: Dict[str, int] = {}
+        self.doc_freqs: Counter = Counter()
+        self.postings: Dict[str, set] = {}
+        self.total_length = 0
+
+    def __len__(self) -> int:
+        return len(self.term_freqs)
+
+    def add(self, doc_id: str, text: str) -> None:
+        """Index a document, replacing any document with the same ID."""
+        self.remove(doc_id)
+        freqs = Counter(retrieval_tokens(text))
+        self.term_freqs[doc_id] = freqs
+        self.doc_lengths[doc_id] = sum(freqs.values())
+        self.total_length += self.doc_lengths[doc_id]
+        for term in freqs:
+            self.doc_freqs[term] += 1
+            self.postings.setdefault(term, set()).add(doc_id)
+
+    def remove(self, doc_id: str) -> None:
+        """Remove a document if it is indexed."""
+        freqs = self.term_freqs.pop(doc_id, None)
+        if freqs is None:
+            return
+        self.total_length -= self.doc_lengths.pop(doc_id)
+        for term in freqs:
+            self.doc_freqs[term] -= 1
+            self.postings[term].discard(doc_id)
+            if not self.doc_freqs[term]:
+                del self.doc_freqs[term]
+                del self.postings[term]
+
+    def search(self, query: str, top_k: int) -> List[Tuple[str, float]]:
+        """Score documents containing any query term.
+
+        Returns:
+            Up to ``top_k`` (doc_id, score) pairs, best first
+        """
+        if not self.term_freqs:
+            return []
+        n_docs = len(self.term_freqs)
+        avg_length = self.total_length / n_docs or 1.0
+        scores: Dict[str, float] = {}
+        for term in set(retrieval_tokens(query)):
+            doc_freq = self.doc_freqs.get(term)
+            if not doc_freq:
+                continue
+            idf = math.log(1 + (n_docs - doc_freq + 0.5) / (doc_freq + 0.5))
+            for doc_id in self.postings[term]:
+                tf = self.term_freqs[doc_id][term]
+                length = self.doc_lengths[doc_id]
+                norm = self.k1 * (1 - self.b + self.b * length / avg_length)
+                scores[doc_id] = scores.get(doc_id, 0.0) + idf * tf * (self.k1 + 1) / (
+                    tf + norm
+                )
+        return sorted(scores.items(), key=lambda item: -item[1])[:top_k]
+
+
+class VectorIndex:
+    """Dense vectors of text chunks with NumPy cosine top-k search.
+
+    Rows live in one preallocated matrix that doubles when full; removing a
+    document moves the last row into its slot, so updates never rebuild the
+    matrix.
+    """
+
+    def __init__(self, encoder: Optional[Encoder] = None, min_score: float = 0.1):
+        """Initialize an empty index.
+
+        Args:
+            encoder: Encoder of documents and queries, ``HashingEncoder`` by default
+            min_score: Smallest cosine similarity counted as a match
+        """
+        self.encoder = encoder or HashingEncoder()
+        self.min_score = min_score
+        self.doc_ids: List[str] = []
+        self.rows: Dict[str, int] = {}
+        self._matrix = np.zeros((16, self.encoder.dim), dtype=np.float32)
+
+    def __len__(self) -> int:
+        return len(self.doc_ids)
+
+    @property
+    def vectors(self) -> np.ndarray:
+        """The stored vectors, one row per document in ``doc_ids`` order."""
+        return self._matrix[: len(self.doc_ids)]
+
+    def add(self, doc_id: str, text: str) -> None:
+        """Index a document, replacing any document with the same ID."""
+        self.add_vector(doc_id, self.encoder.encode([text])[0])
+
+    def add_vector(self, doc_id: str, vector: np.ndarray) -> None:
+        """Store an already encoded document vector."""
+        row = self.rows.get(doc_id)
+        if row is None:
+            row = len(self.doc_ids)
+            if row == len(self._matrix):
+                self._matrix = np.concatenate(
+                    [self._matrix, np.zeros_like(self._matrix)]
+                )
+            self.doc_ids.append(doc_id)
+            self.rows[doc_id] = row
+        self._matrix[row] = vector
+
+    def remove(self, doc_id: str) -> None:
+        """Remove a document if it is indexed."""
+        row = self.rows.pop(doc_id, None)
+        if row is None:
+            return
+        last_id = self.doc_ids.pop()
+        if last_id != doc_id:
+            self._matrix[row] = self._matrix[len(self.doc_ids)]
+            self.doc_ids[row] = last_id
+            self.rows[last_id] = row
+
+    def search(self, query: str, top_k: int) -> List[Tuple[str, float]]:
+        """Find the documents most similar to a query.
+
+        Returns:
+            Up to ``top_k`` (doc_id, score) pairs scoring at least
+            ``min_score``, best first
+        """
+        if not self.doc_ids or top_k <= 0:
+            return []
+        scores = self.vectors @ self.encoder.encode([query])[0]
+        k = min(top_k, len(scores))
+        best = np.argpartition(-scores, k - 1)[:k]
+        best = best[np.argsort(-scores[best])]
+        return [
+            (self.doc_ids[row], float(scores[row]))
+            for row in best
+            if scores[row] >= self.min_score
+        ]
+
+
+def field_chunk(key: str, value: Any) -> str:
+    """Render a profile field as a retrievable text chunk."""
+    if isinstance(value, (dict, list)):
+        value = json.dumps(value, ensure_ascii=False)
+    return f"{key}: {value}"
+
+
+def asset_chunk(asset: Dict[str, Any]) -> str:
+    """Render a marketing asset as a retrievable text chunk."""
+    asset_type = asset.get("content_type") or asset.get("asset_type") or "content"
+    platform = asset.get("platform") or "any platform"
+    return f"{asset_type} for {platform}: {asset.get('content', '')}"
+
+
+class _UserIndex:
+    """Index of one user's profile fields and marketing assets."""
+
+    def __init__(self, index: Any) -> None:
+        self.index = index
+        self.chunks: Dict[str, str] = {}
+        self.field_order: List[str] = []
+        self.profile_version = -1
+        # Entity tag of the assets section when they were last indexed
+        self.assets_etag: Optional[str] = None
+        # Highest storage position of an indexed asset
+        self.last_asset_position: Optional[int] = None
+
+
+class KnowledgeRetriever:
+    """Lexical retrieval over each user's private knowledge base.
+
+    Every profile field and every marketing asset is one chunk; assets are
+    keyed by their storage position, which never changes once stored. A
+    user's index is kept in memory and brought up to date before each
+    search: when the profile version changes only added, changed or removed
+    fields are re-indexed, and when the assets section's entity tag changes
+    only assets stored after the last indexed position are read. Searches
+    while nothing changed read no assets at all.
+
+    Clearing a user's data also bumps the profile version, so a version
+    change reconciles every asset: chunks of assets that are gone are
+    removed and chunks whose text changed are replaced.
+
+    At most ``max_users`` indexes are kept; the least recently searched
+    user's index is dropped first and rebuilt on their next search.
+    """
+
+    def __init__(
+        self,
+        service: KnowledgeBaseService,
+        index_factory: Callable[[], Any] = BM25Index,
+        max_users: int = MAX_INDEXED_USERS,
+    ):
+        """Initialize the retriever.
+
+        Args:
+            service: Knowledge base service holding the indexed data
+            index_factory: Creates an empty per-user index with ``add``,
+                ``remove`` and ``search(query, top_k)`` methods
+            max_users: Users whose indexes are kept in memory
+        """
+        self.service = service
+        self.index_factory = index_factory
+        self.max_users = max_users
+        self._indexes: "OrderedDict[str, _UserIndex]" = OrderedDict()
+        self._locks: Dict[str, threading.Lock] = {}
+        self._guard = threading.Lock()
+
+    def _user_state(self, user_id: str) -> Tuple[_UserIndex, threading.Lock]:
+        """Get a user's index and the lock serializing its refreshes."""
+        with self._guard:
+            if user_id not in self._indexes:
+                self._indexes[user_id] = self._new_user_index(user_id)
+                self._locks[user_id] = threading.Lock()
+                while len(self._indexes) > self.max_users:
+                    evicted, _ = self._indexes.popitem(last=False)
+                    # A search still holding the lock keeps its own reference
+                    self._locks.pop(evicted)
+            self._indexes.move_to_end(user_id)
+            return self._indexes[user_id], self._locks[user_id]
+
+    def _new_user_index(self, user_id: str) -> _UserIndex:
+        """Create the in-memory index of a user seen for the first time."""
+        return _UserIndex(self.index_factory())
+
+    def _refresh(self, user_id: str, user_index: _UserIndex) -> bool:
+        """Bring a user's index up to date with the knowledge base.
+
+        Returns:
+            True if any chunk was added, changed or removed
+        """
+        changed = False
+        version = self.service.get_profile_version(user_id)
+        # The version also changes when the user's data is cleared
+        reconcile = version != user_index.profile_version
+        if reconcile or version == 0:
+            data = self.service.get_business_data(user_id)
+            chunks = {f"profile:{k}": field_chunk(k, v) for k, v in data.items()}
+            for doc_id in [d for d in user_index.chunks if d.startswith("profile:")]:
+                if doc_id not in chunks:
+                    user_index.index.remove(doc_id)
+                    del user_index.chunks[doc_id]
+                    changed = True
+            for doc_id, text in chunks.items():
+                if user_index.chunks.get(doc_id) != text:
+                    user_index.index.add(doc_id, text)
+                    user_index.chunks[doc_id] = text
+                    changed = True
+            user_index.field_order = list(chunks)
+            user_index.profile_version = version
+
+        # Taken before reading, so assets stored meanwhile are read next time
+        assets_etag = self.service.get_etag(user_id, ["marketing_assets"])
+        if reconcile or assets_etag != user_index.assets_etag:
+            changed = self._refresh_assets(user_id, user_index, reconcile) or changed
+            user_index.assets_etag = assets_etag
+        return changed
+
+    def _refresh_assets(
+        self, user_id: str, user_index: _UserIndex, reconcile: bool
+    ) -> bool:
+        """Index assets stored since the last refresh, or all of them.
+
+        Args:
+            user_id: The ID of the user.
+            user_index: The user's index
+            reconcile: Read every asset and drop chunks of assets that are gone
+
+        Returns:
+            True if any chunk was added, changed or removed
+        """
+        changed = False
+        since = None if reconcile else user_index.last_asset_position
+        last_position = since
+        seen = set()
+        for position, asset in self.service.iter_records(
+            user_id, "marketing_assets", since
+        ):
+            doc_id = f"asset:{position}"
+            seen.add(doc_id)
+            text = asset_chunk(asset)
+            if user_index.chunks.get(doc_id) != text:
+                user_index.index.add(doc_id, text)
+                user_index.chunks[doc_id] = text
+                changed = True
+            if last_position is None or position > last_position:
+                last_position = position
+        if reconcile:
+            for doc_id in [d for d in user_index.chunks if d.startswith("asset:")]:
+                if doc_id not in seen:
+                    user_index.index.remove(doc_id)
+                    del user_index.chunks[doc_id]
+                    changed = True
+        user_index.last_asset_position = last_position
+        return changed
+
+    def ranked(
+        self, user_id: str, query: str, top_k: int, fallback: bool = True
+    ) -> List[Hit]:
+        """Rank a user's chunks against a query.
+
+        Args:
+            user_id: The ID of the user.
+            query: The search query
+            top_k: Maximum number of chunks
+            fallback: When nothing matches (for example a generic question
+                such as "tell me about the business"), return the first
+                profile fields instead of nothing
+
+        Returns:
+            Up to ``top_k`` (doc_id, score, text) hits, best first
+        """
+        user_index, lock = self._user_state(user_id)
+        with lock:
+            self._refresh(user_id, user_index)
+            hits = user_index.index.search(query, top_k)
+            if not hits and fallback:
+                hits = [(doc_id, 0.0) for doc_id in user_index.field_order[:top_k]]
+            return [
+                (doc_id, score, user_index.chunks[doc_id]) for doc_id, score in hits
+            ]
+
+    def search(
+        self, user_id: str, query: str, top_k: int = 5, max_chars: int = 2000
+    ) -> List[Dict[str, Any]]:
+        """Find the chunks most relevant to a query.
+
+        Args:
+            user_id: The ID of the user.
+            query: The search query
+            top_k: Maximum number of snippets
+            max_chars: Budget for the summed length of the snippet texts; a
+                snippet that does not fit is truncated to the remaining budget
+
+        Returns:
+            Snippets as dictionaries with ``id``, ``text`` and ``score``
+        """
+        return fit_snippets(self.ranked(user_id, query, top_k), max_chars)
+
+
+class VectorRetriever(KnowledgeRetriever):
+    """Semantic retrieval whose per-user vector index is persisted on disk.
+
+    The index is saved to ``vector_index.npz`` in the user's knowledge base
+    directory whenever a refresh changes it, together with the profile
+    version, assets entity tag and last asset position it reflects. After a
+    restart only the chunks written since the last save are encoded again.
+    """
+
+    def __init__(
+        self,
+        service: KnowledgeBaseService,
+        encoder: Optional[Encoder] = None,
+        max_users: int = MAX_INDEXED_USERS,
+    ):
+        """Initialize the retriever.
+
+        Args:
+            service: Knowledge base service holding the indexed data
+            encoder: Encoder of chunks and queries, ``HashingEncoder`` by default
+            max_users: Users whose indexes are kept in memory; evicted
+                indexes are reloaded from their saved file
+        """
+        self.encoder = encoder or HashingEncoder()
+        super().__init__(service, lambda: VectorIndex(self.encoder), max_users)
+
+    def _index_path(self, user_id: str) -> Path:
+        return self.service.base_storage_path / user_id / VECTOR_INDEX_FILE_NAME
+
+    def _new_user_index(self, user_id: str) -> _UserIndex:
+        user_index = super()._new_user_index(user_id)
+        path = self._index_path(user_id)
+        if not path.exists():
+            return user_index
+        try:
+            with np.load(path, allow_pickle=False) as stored:
+                meta = json.loads(str(stored["meta"]))
+                if meta["encoder"] != self.encoder.config():
+                    return user_index
+                for doc_id, vector in zip(meta["doc_ids"], stored["vectors"]):
+                    user_index.index.add_vector(doc_id, vector)
+            user_index.chunks = meta["chunks"]
+            user_index.field_order = meta["field_order"]
+            user_index.profile_version = meta["profile_version"]
+            user_index.assets_etag = meta["assets_etag"]
+            user_index.last_asset_position = meta["last_asset_position"]
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"Rebuilding unreadable vector index {path}: {e}")
+            return super()._new_user_index(user_id)
+        return user_index
+
+    def _refresh(self, user_id: str, user_index: _UserIndex) -> bool:
+        changed = super()._refresh(user_id, user_index)
+        if changed:
+            self._save(user_id, user_index)
+        return changed
+
+    def _save(self, user_id: str, user_index: _UserIndex) -> None:
+        """Persist a user's vector index atomically."""
+        meta = {
+            "encoder": self.encoder.config(),
+            "doc_ids": user_index.index.doc_ids,
+            "chunks": user_index.chunks,
+            "field_order": user_index.field_order,
+            "profile_version": user_index.profile_version,
+            "assets_etag": user_index.assets_etag,
+            "last_asset_position": user_index.last_asset_position,
+        }
+        buffer = io.BytesIO()
+        np.savez(buffer, vectors=user_index.index.vectors, meta=json.dumps(meta))
+        path = self._index_path(user_id)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        write_file_atomic(path, buffer.getvalue())
+
+
+class HybridRetriever:
+    """Fuses the rankings of several retrievers with reciprocal rank fusion.
+
+    A chunk's fused score is the sum of ``1 / (RRF_K + rank)`` over the
+    retrievers ranking it, so chunks found both lexically and semantically
+    come first without having to calibrate BM25 against cosine scores.
+    """
+
+    def __init__(self, retrievers: Sequence[KnowledgeRetriever]):
+        """Initialize the retriever.
+
+        Args:
+            retrievers: Retrievers over the same knowledge base; the first one
+                provides the fallback when none of them finds a match
+        """
+        self.retrievers = list(retrievers)
+
+    def search(
+        self, user_id: str, query: str, top_k: int = 5, max_chars: int = 2000
+    ) -> List[Dict[str, Any]]:
+        """Find the chunks most relevant to a query.
+
+        Args:
+            user_id: The ID of the user.
+            query: The search query
+            top_k: Maximum number of snippets
+            max_chars: Budget for the summed length of the snippet texts
+
+        Returns:
+            Snippets as dictionaries with ``id``, ``text`` and ``score``
+        """
+        scores: Dict[str, float] = {}
+        texts: Dict[str, str] = {}
+        for retriever in self.retrievers:
+            hits = retriever.ranked(user_id, query, top_k * 2, fallback=False)
+            for rank, (doc_id, _, text) in enumerate(hits, start=1):
+                scores[doc_id] = scores.get(doc_id, 0.0) + 1.0 / (RRF_K + rank)
+                texts[doc_id] = text
+        if not scores:
+            return self.retrievers[0].search(user_id, query, top_k, max_chars)
+        fused = sorted(scores.items(), key=lambda item: -item[1])[:top_k]
+        return fit_snippets(
+            [(doc_id, score, texts[doc_id]) for doc_id, score in fused], max_chars
+        )
+
+
+def fit_snippets(hits: List[Hit], max_chars: int) -> List[Dict[str, Any]]:
+    """Turn ranked hits into snippets within a total character budget.
+
+    A snippet that does not fit is truncated to the remaining budget, unless
+    fewer than ``MIN_SNIPPET_CHARS`` remain.
+    """
+    snippets = []
+    remaining = max_chars
+    for doc_id, score, text in hits:
+        if len(text) > remaining:
+            if remaining < MIN_SNIPPET_CHARS:
+                break
+            text = text[: remaining - 3] + "..."
+        snippets.append({"id": doc_id, "text": text, "score": score})
+        remaining -= len(text)
+    return snippets
+
+
+# Global retrievers over the knowledge base singleton
+knowledge_retriever = KnowledgeRetriever(knowledge_base_service)
+vector_retriever = VectorRetriever(knowledge_base_service)
+hybrid_retriever = HybridRetriever([knowledge_retriever, vector_retriever])
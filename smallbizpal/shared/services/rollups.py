@@ -0,0 +1,304 @@
+#   Copyright 2025 Akshat Deepak Joshi
+
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+
+#       http://www.apache.org/licenses/LICENSE-2.0
+
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+"""
+Daily metric rollups maintained on the write path.
+
+A rollup holds the counters ``collect_metrics`` reports for one user and
+one UTC day. Storing an interaction or asset updates the rollup of the day
+of its timestamp, and saving a lead updates the rollup of its day, so a
+daily report reads one small file instead of the day's records. Rollups can
+always be recomputed from the raw data with ``compute_rollups`` (see
+``smallbizpal/scripts/rebuild_rollups.py``); users whose data predates
+their rollups get them computed the first time they are read.
+"""
+
+import json
+import os
+import threading
+from datetime import date
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Tuple
+
+from smallbizpal.shared.utils.files import write_file_atomic
+from smallbizpal.shared.utils.timestamps import record_epoch_ms, utc_day
+
+from .question_clusters import QUESTION_CLUSTER_FIELD, question_text
+
+ROLLUPS_DIR_NAME = "rollups"
+# Marks rollups that account for all of a user's stored data
+ROLLUPS_BUILT_FILE_NAME = ".built"
+
+LEAD_INTERACTION_TYPE = "meeting_request"
+TOP_QUESTIONS = 5
+
+# Same shape as knowledge_base.Operation (kept local to avoid a circular import)
+Operation = Tuple[Any, ...]
+
+# Locks of each user's rollups directory, shared by every store over it
+_locks: Dict[str, threading.RLock] = {}
+_locks_guard = threading.Lock()
+
+
+def normalize_email(email: str) -> str:
+    """Normalize an email address for lookups (trimmed, lowercase)."""
+    return (email or "").strip().lower()
+
+
+def empty_rollup(day: str) -> Dict[str, Any]:
+    """Get the rollup of a day without any activity."""
+    return {
+        "date": day,
+        "interactions_count": 0,
+        "interaction_types": {},
+        "questions": {},
+        "meeting_requests": 0,
+        "meeting_request_emails": [],
+        "lead_emails": [],
+        "marketing_assets_count": 0,
+    }
+
+
+def _add_distinct(values: List[str], value: str) -> None:
+    if value not in values:
+        values.append(value)
+
+
+def add_interaction(rollup: Dict[str, Any], interaction: Dict[str, Any]) -> None:
+    """Count a customer interaction in its day's rollup."""
+    interaction_type = interaction.get("type")
+    rollup["interactions_count"] += 1
+    types = rollup["interaction_types"]
+    types[str(interaction_type)] = types.get(str(interaction_type), 0) + 1
+    if interaction_type == LEAD_INTERACTION_TYPE:
+        rollup["meeting_requests"] += 1
+        _add_distinct(
+            rollup["meeting_request_emails"],
+            normalize_email(interaction.get("customer_email", "")),
+        )
+    # Near-duplicate questions are counted under their cluster's label
+    question = interaction.get(QUESTION_CLUSTER_FIELD) or question_text(interaction)
+    if question:
+        questions = rollup["questions"]
+        questions[question] = questions.get(question, 0) + 1
+
+
+def add_asset(rollup: Dict[str, Any], asset: Dict[str, Any]) -> None:
+    """Count a marketing asset in its day's rollup."""
+    rollup["marketing_assets_count"] += 1
+
+
+def add_lead(rollup: Dict[str, Any], lead: Dict[str, Any]) -> None:
+    """Count a lead saved in the lead store in its day's rollup."""
+    _add_distinct(rollup["lead_emails"], normalize_email(lead.get("email", "")))
+
+
+# How records of each section are counted, and their timestamp field
+RECORD_ROLLUPS = {
+    "customer_interactions": (add_interaction, "timestamp"),
+    "marketing_assets": (add_asset, "created_at"),
+}
+
+
+def merge_rollups(rollup: Dict[str, Any], other: Dict[str, Any]) -> Dict[str, Any]:
+    """Add the counters of another rollup of the same day to a rollup."""
+    for field in ("interactions_count", "meeting_requests", "marketing_assets_count"):
+        rollup[field] += other[field]
+    for field in ("interaction_types", "questions"):
+        for key, count in other[field].items():
+            rollup[field][key] = rollup[field].get(key, 0) + count
+    for field in ("meeting_request_emails", "lead_emails"):
+        for value in other[field]:
+            _add_distinct(rollup[field], value)
+    return rollup
+
+
+def compute_rollups(
+    interactions: Iterable[Dict[str, Any]] = (),
+    assets: Iterable[Dict[str, Any]] = (),
+    leads: Iterable[Dict[str, Any]] = (),
+) -> Dict[str, Dict[str, Any]]:
+    """Compute rollups from raw records, keyed by day (YYYY-MM-DD).
+
+    Records without a parseable timestamp belong to no day and are skipped,
+    like they are by per-day queries.
+    """
+    rollups: Dict[str, Dict[str, Any]] = {}
+    for records, (add, field) in (
+        (interactions, RECORD_ROLLUPS["customer_interactions"]),
+        (assets, RECORD_ROLLUPS["marketing_assets"]),
+        (leads, (add_lead, "timestamp")),
+    ):
+        for record in records:
+            day = utc_day(record_epoch_ms(record, field))
+            if day is not None:
+                key = day.isoformat()
+                add(rollups.setdefault(key, empty_rollup(key)), record)
+    return rollups
+
+
+def operation_rollups(operations: Iterable[Operation]) -> Dict[str, Dict[str, Any]]:
+    """Compute the rollup increments of queued knowledge base operations."""
+    rollups: Dict[str, Dict[str, Any]] = {}
+    for operation in operations:
+        if operation[0] != "append" or operation[1] not in RECORD_ROLLUPS:
+            continue
+        add, field = RECORD_ROLLUPS[operation[1]]
+        day = utc_day(record_epoch_ms(operation[2], field))
+        if day is not None:
+            key = day.isoformat()
+            add(rollups.setdefault(key, empty_rollup(key)), operation[2])
+    return rollups
+
+
+def rollup_metrics(rollup: Dict[str, Any]) -> Dict[str, Any]:
+    """Get the metrics reported by ``collect_metrics`` from a day's rollup.
+
+    Leads are meeting requests plus saved leads whose email was not already
+    seen in a meeting request that day.
+    """
+    extra_leads = set(rollup["lead_emails"]) - set(rollup["meeting_request_emails"])
+    questions = sorted(rollup["questions"].items(), key=lambda item: -item[1])
+    return {
+        "leads_count": rollup["meeting_requests"] + len(extra_leads),
+        "interactions_count": rollup["interactions_count"],
+        "top_questions": [
+            {"question": question, "frequency": count}
+            for question, count in questions[:TOP_QUESTIONS]
+        ],
+        "marketing_assets_count": rollup["marketing_assets_count"],
+    }
+
+
+class DailyRollupStore:
+    """Per-user, per-day rollup files.
+
+    Layout per user::
+
+        data/<user_id>/rollups/<YYYY-MM-DD>.json
+        data/<user_id>/rollups/.built
+
+    The knowledge base and the lead store each hold a rollup store; stores
+    over the same directory share their locks, so their updates of a day's
+    rollup do not overwrite each other.
+    """
+
+    def __init__(self, base_storage_path: str = "data"):
+        """Initialize the rollup store.
+
+        Args:
+            base_storage_path: Directory holding each user's data directory
+        """
+        self.base_storage_path = Path(base_storage_path)
+
+    def _user_lock(self, user_id: str) -> threading.RLock:
+        """Get the lock serializing rollup updates of a user."""
+        key = os.path.abspath(self._get_rollups_dir(user_id))
+        with _locks_guard:
+            return _locks.setdefault(key, threading.RLock())
+
+    def _get_rollups_dir(self, user_id: str) -> Path:
+        return self.base_storage_path / user_id / ROLLUPS_DIR_NAME
+
+    def get(self, user_id: str, day: date) -> Dict[str, Any]:
+        """Get a user's rollup of a day (empty if nothing was recorded)."""
+        key = day.isoformat()
+        try:
+            return json.loads(
+                (self._get_rollups_dir(user_id) / f"{key}.json").read_text()
+            )
+        except (FileNotFoundError, ValueError):
+            return empty_rollup(key)
+
+    def days(self, user_id: str) -> List[str]:
+        """Get the days a user has rollups for, oldest first."""
+        rollups_dir = self._get_rollups_dir(user_id)
+        if not rollups_dir.exists():
+            return []
+        return sorted(path.stem for path in rollups_dir.glob("*.json"))
+
+    def add(self, user_id: str, increments: Dict[str, Dict[str, Any]]) -> None:
+        """Add rollup increments, keyed by day, to a user's stored rollups."""
+        if not increments:
+            return
+        rollups_dir = self._get_rollups_dir(user_id)
+        with self._user_lock(user_id):
+            rollups_dir.mkdir(parents=True, exist_ok=True)
+            for key, increment in increments.items():
+                rollup = merge_rollups(
+                    self.get(user_id, date.fromisoformat(key)), increment
+                )
+                write_file_atomic(rollups_dir / f"{key}.json", json.dumps(rollup))
+
+    def apply(self, user_id: str, operations: Iterable[Operation]) -> None:
+        """Count stored knowledge base operations in a user's rollups."""
+        self.add(user_id, operation_rollups(operations))
+
+    def record_lead(self, user_id: str, lead: Dict[str, Any]) -> None:
+        """Count a lead saved outside the knowledge base in its day's rollup."""
+        self.add(user_id, compute_rollups(leads=[lead]))
+
+    def replace(self, user_id: str, rollups: Dict[str, Dict[str, Any]]) -> None:
+        """Replace all of a user's rollups, e.g. with ones rebuilt from raw data."""
+        rollups_dir = self._get_rollups_dir(user_id)
+        with self._user_lock(user_id):
+            for key in self.days(user_id):
+                if key not in rollups:
+                    (rollups_dir / f"{key}.json").unlink()
+            rollups_dir.mkdir(parents=True, exist_ok=True)
+            for key, rollup in rollups.items():
+                write_file_atomic(rollups_dir / f"{key}.json", json.dumps(rollup))
+            (rollups_dir / ROLLUPS_BUILT_FILE_NAME).touch()
+
+    def ensure_built(
+        self, user_id: str, compute: Callable[[], Dict[str, Dict[str, Any]]]
+    ) -> None:
+        """Compute a user's rollups from raw data if that was never done.
+
+        Rollups only count what is stored while they exist, so users with
+        data from before them would report zeros until rebuilt.
+
+        Args:
+            user_id: The ID of the user.
+            compute: Computes the user's rollups from raw data (see
+                ``compute_rollups``); called under the user's rollup lock
+        """
+        built = self._get_rollups_dir(user_id) / ROLLUPS_BUILT_FILE_NAME
+        if built.exists():
+            return
+        with self._user_lock(user_id):
+            if not built.exists():
+                self.replace(user_id, compute())
+
+    def clear(self, user_id: str) -> None:
+        """Delete all of a user's rollups."""
+        self.replace(user_id, {})
+
+
+def verify_rollups(
+    stored: Dict[str, Dict[str, Any]], expected: Dict[str, Dict[str, Any]]
+) -> List[str]:
+    """Compare stored rollups with rollups recomputed from raw data.
+
+    Returns:
+        The days whose reported metrics differ
+    """
+    mismatched = []
+    for key in sorted(set(stored) | set(expected)):
+        empty = empty_rollup(key)
+        if rollup_metrics(stored.get(key, empty)) != rollup_metrics(
+            expected.get(key, empty)
+        ):
+            mismatched.append(key)
+    return mismatched
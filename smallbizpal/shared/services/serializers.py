@@ -0,0 +1,237 @@
+#   Copyright 2025 Akshat Deepak Joshi
+
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+
+#       http://www.apache.org/licenses/LICENSE-2.0
+
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+"""
+On-disk encodings of knowledge base documents.
+
+Three formats are supported:
+
+- ``json``: indented JSON, the original human-readable format
+- ``compact``: JSON without whitespace, encoded with orjson when installed
+- ``msgpack``: MessagePack (requires the optional ``msgpack`` package)
+
+Readers never need to know which format a file was written in:
+``decode_document`` detects JSON versus MessagePack from the first byte, so
+files in any format can be mixed in one data directory. ``iter_document_array``
+does the same for list documents while holding only one element in memory.
+"""
+
+import codecs
+import json
+import re
+from datetime import date, datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator
+
+from pydantic import BaseModel
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None  # type: ignore[assignment]
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - optional dependency
+    msgpack = None  # type: ignore[assignment]
+
+# Encoders for types that are not natively serializable, looked up by exact
+# type before falling back to duck typing
+_TYPE_ENCODERS: Dict[type, Callable[[Any], Any]] = {
+    datetime: datetime.isoformat,
+    date: date.isoformat,
+}
+
+
+def encode_default(obj: Any) -> Any:
+    """Convert a value the encoder does not support natively.
+
+    Datetimes and pydantic models are handled first; anything else falls
+    back to ``isoformat()``, ``model_dump()``, ``__dict__`` or ``str()``.
+    """
+    encoder = _TYPE_ENCODERS.get(type(obj))
+    if encoder is not None:
+        return encoder(obj)
+    if isinstance(obj, BaseModel):
+        return obj.model_dump()
+    if hasattr(obj, "isoformat"):
+        return obj.isoformat()
+    if hasattr(obj, "model_dump"):
+        return obj.model_dump()
+    if hasattr(obj, "__dict__"):
+        return obj.__dict__
+    return str(obj)
+
+
+class Serializer:
+    """Encodes knowledge base documents to bytes."""
+
+    name = ""
+
+    def encode(self, data: Any) -> bytes:
+        """Encode a document."""
+        raise NotImplementedError
+
+
+class PrettyJSONSerializer(Serializer):
+    """Indented JSON, readable and diffable but slow for large documents."""
+
+    name = "json"
+
+    def encode(self, data: Any) -> bytes:
+        return json.dumps(data, indent=2, default=encode_default).encode()
+
+
+class CompactJSONSerializer(Serializer):
+    """JSON without whitespace, using orjson's native datetime support if present."""
+
+    name = "compact"
+
+    def encode(self, data: Any) -> bytes:
+        if orjson is not None:
+            return orjson.dumps(
+                data, default=encode_default, option=orjson.OPT_NON_STR_KEYS
+            )
+        return json.dumps(data, separators=(",", ":"), default=encode_default).encode()
+
+
+class MsgpackSerializer(Serializer):
+    """MessagePack, the smallest and fastest format to parse."""
+
+    name = "msgpack"
+
+    def __init__(self) -> None:
+        if msgpack is None:
+            raise ImportError(
+                "The msgpack knowledge base format requires the 'msgpack' package"
+            )
+
+    def encode(self, data: Any) -> bytes:
+        return msgpack.packb(data, default=encode_default, use_bin_type=True)
+
+
+SERIALIZERS: Dict[str, Callable[[], Serializer]] = {
+    PrettyJSONSerializer.name: PrettyJSONSerializer,
+    CompactJSONSerializer.name: CompactJSONSerializer,
+    MsgpackSerializer.name: MsgpackSerializer,
+}
+
+
+def get_serializer(name: str) -> Serializer:
+    """Get the serializer for a format name ("json", "compact" or "msgpack")."""
+    try:
+        return SERIALIZERS[name]()
+    except KeyError:
+        raise ValueError(f"Unknown knowledge base format: {name}") from None
+
+
+def detect_format(raw: bytes) -> str:
+    """Detect whether encoded bytes are JSON or MessagePack."""
+    stripped = raw.lstrip()
+    if not stripped or stripped[:1] in (b"{", b"[", b'"'):
+        return "json"
+    return "msgpack"
+
+
+def decode_document(raw: bytes) -> Any:
+    """Decode a document written by any serializer.
+
+    Raises:
+        ValueError: If the bytes are not a valid document
+    """
+    if detect_format(raw) == "json":
+        if orjson is not None:
+            return orjson.loads(raw)
+        return json.loads(raw)
+    if msgpack is None:
+        raise ValueError("Document is MessagePack but 'msgpack' is not installed")
+    try:
+        return msgpack.unpackb(raw, raw=False, strict_map_key=False)
+    except Exception as e:
+        raise ValueError(f"Invalid MessagePack document: {e}") from e
+
+
+# Whitespace and element separators skipped between array elements
+_ARRAY_GAP = re.compile(r"[\s,]*")
+
+
+def iter_document_array(path: Path, chunk_size: int = 1 << 16) -> Iterator[Any]:
+    """Yield the elements of a list document one at a time.
+
+    The file is read in ``chunk_size`` pieces and each element is decoded as
+    soon as it is complete, so memory use is bounded by the largest element
+    rather than the document. A file replaced while it is being read keeps
+    yielding the old contents, since the open handle pins the old file.
+
+    Args:
+        path: File holding a JSON or MessagePack array
+        chunk_size: Bytes read per chunk
+
+    Raises:
+        ValueError: If the file is not a valid array document
+    """
+    with open(path, "rb") as f:
+        head = f.read(chunk_size)
+        if detect_format(head) != "json":
+            f.seek(0)
+            yield from _iter_msgpack_array(f, chunk_size)
+            return
+        yield from _iter_json_array(f, head, chunk_size)
+
+
+def _iter_json_array(f: Any, head: bytes, chunk_size: int) -> Iterator[Any]:
+    decoder = json.JSONDecoder()
+    # Chunks may end inside a multi-byte character
+    text = codecs.getincrementaldecoder("utf-8-sig")()
+    buffer = text.decode(head, final=not head)
+    pos = _ARRAY_GAP.match(buffer).end()
+    if pos == len(buffer):
+        return
+    if buffer[pos] != "[":
+        raise ValueError("Document is not a JSON array")
+    pos += 1
+    eof = False
+    while True:
+        pos = _ARRAY_GAP.match(buffer, pos).end()
+        if pos < len(buffer) and buffer[pos] == "]":
+            return
+        try:
+            element, end = decoder.raw_decode(buffer, pos)
+        except json.JSONDecodeError:
+            end = None
+        # An element ending exactly at the buffer end may be a truncated
+        # number, so decode it again once more data is available
+        if end is not None and (end < len(buffer) or eof):
+            yield element
+            pos = end
+            continue
+        if eof:
+            raise ValueError("Truncated JSON array document")
+        chunk = f.read(chunk_size)
+        eof = not chunk
+        buffer = buffer[pos:] + text.decode(chunk, final=eof)
+        pos = 0
+
+
+def _iter_msgpack_array(f: Any, chunk_size: int) -> Iterator[Any]:
+    if msgpack is None:
+        raise ValueError("Document is MessagePack but 'msgpack' is not installed")
+    unpacker = msgpack.Unpacker(
+        f, read_size=chunk_size, raw=False, strict_map_key=False
+    )
+    try:
+        for _ in range(unpacker.read_array_header()):
+            yield unpacker.unpack()
+    except Exception as e:
+        raise ValueError(f"Invalid MessagePack document: {e}") from e
@@ -0,0 +1,498 @@
+#   Copyright 2025 Akshat Deepak Joshi
+
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+
+#       http://www.apache.org/licenses/LICENSE-2.0
+
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+import json
+import sqlite3
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
+
+from smallbizpal.shared.models.business_profile import BusinessProfile
+from smallbizpal.shared.utils.timestamps import (
+    epoch_field,
+    record_epoch_ms,
+    to_epoch_ms,
+    with_epoch_ms,
+)
+
+from .knowledge_base import (
+    RECORD_SECTIONS,
+    TIMESTAMP_FIELDS,
+    KnowledgeBaseService,
+    Operation,
+    PageKey,
+    empty_knowledge_base,
+    group_operations,
+    json_serializer,
+    record_field,
+)
+from .write_behind import WriteBehindBuffer
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS business_profiles (
+    user_id TEXT PRIMARY KEY,
+    created_at TEXT,
+    updated_at TEXT,
+    total_updates INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS profile_fields (
+    user_id TEXT NOT NULL,
+    key TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    value TEXT,
+    PRIMARY KEY (user_id, key)
+);
+CREATE TABLE IF NOT EXISTS profile_meta (
+    user_id TEXT PRIMARY KEY,
+    body TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS marketing_assets (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id TEXT NOT NULL,
+    ts INTEGER,
+    content_type TEXT,
+    platform TEXT,
+    body TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_assets_user_ts ON marketing_assets (user_id, ts);
+CREATE INDEX IF NOT EXISTS idx_assets_user_content_type
+    ON marketing_assets (user_id, content_type, ts);
+CREATE INDEX IF NOT EXISTS idx_assets_user_platform
+    ON marketing_assets (user_id, platform, ts);
+CREATE TABLE IF NOT EXISTS customer_interactions (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id TEXT NOT NULL,
+    ts INTEGER,
+    type TEXT,
+    body TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_interactions_user_ts
+    ON customer_interactions (user_id, ts);
+CREATE INDEX IF NOT EXISTS idx_interactions_user_type
+    ON customer_interactions (user_id, type, ts);
+CREATE TABLE IF NOT EXISTS performance_data (
+    user_id TEXT NOT NULL,
+    metric_name TEXT NOT NULL,
+    body TEXT NOT NULL,
+    PRIMARY KEY (user_id, metric_name)
+);
+CREATE TABLE IF NOT EXISTS section_versions (
+    user_id TEXT NOT NULL,
+    section TEXT NOT NULL,
+    version INTEGER NOT NULL,
+    PRIMARY KEY (user_id, section)
+);
+"""
+
+# Rows fetched per query when streaming a record table
+ITER_BATCH_SIZE = 500
+
+# Indexed columns of each record table, in insert order after user_id and ts
+RECORD_COLUMNS = {
+    "marketing_assets": ("content_type", "platform"),
+    "customer_interactions": ("type",),
+}
+
+
+class SQLiteKnowledgeBaseService(KnowledgeBaseService):
+    """Knowledge base stored in a single SQLite database shared by all users.
+
+    Profile fields, marketing assets, customer interactions and performance
+    data each live in their own table. Record tables keep the full record as
+    JSON plus indexed ``user_id``, timestamp (epoch milliseconds), and
+    ``content_type``/``platform``/``type`` columns, so filtered reads are
+    index lookups instead of Python-side scans. A transaction is applied as a
+    single SQLite transaction, which also increments the version counter of
+    every section it touches.
+
+    Data stored by a file backend (section files, a legacy
+    ``knowledge_base.json`` or append-only segments) is imported into the
+    database the first time a user without any rows is accessed.
+    """
+
+    def __init__(
+        self,
+        base_storage_path: str = "data",
+        write_behind: Optional[WriteBehindBuffer] = None,
+    ):
+        """Initialize the SQLite knowledge base service.
+
+        Args:
+            base_storage_path: Directory holding ``knowledge_base.sqlite3``
+            write_behind: Buffer enabling write-behind mode (None writes through)
+        """
+        super().__init__(base_storage_path, write_behind=write_behind)
+        self.base_storage_path.mkdir(parents=True, exist_ok=True)
+        self.db_path: Path = self.base_storage_path / "knowledge_base.sqlite3"
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(SCHEMA)
+        self._conn.commit()
+        # Users whose file-backend data has been imported (or who had none)
+        self._imported_users: Set[str] = set()
+
+    def close(self) -> None:
+        """Flush buffered operations and close the database connection."""
+        super().close()
+        with self._lock:
+            self._conn.close()
+
+    def _read_file_data(self, user_id: str) -> Dict[str, Any]:
+        """Read a user's data as stored by the file backend that wrote it."""
+        user_dir = self.base_storage_path / user_id
+        if not user_dir.is_dir():
+            return {}
+        segments_dir = user_dir / "segments"
+        file_service: KnowledgeBaseService
+        if any((segments_dir / section).is_dir() for section in RECORD_SECTIONS):
+            from .partitioned_knowledge_base import PartitionedKnowledgeBaseService
+
+            file_service = PartitionedKnowledgeBaseService(str(self.base_storage_path))
+        elif segments_dir.is_dir():
+            from .append_only_knowledge_base import AppendOnlyKnowledgeBaseService
+
+            file_service = AppendOnlyKnowledgeBaseService(str(self.base_storage_path))
+        else:
+            file_service = KnowledgeBaseService(str(self.base_storage_path))
+        return file_service._load_data(user_id)
+
+    def stored_user_ids(self) -> List[str]:
+        # Users in the database, plus users whose files are not imported yet
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT DISTINCT user_id FROM section_versions"
+            ).fetchall()
+        return sorted({user_id for (user_id,) in rows} | set(super().stored_user_ids()))
+
+    def _has_stored_files(self, user_dir: Path) -> bool:
+        # Files of any file backend are imported
+        return (user_dir / "segments").is_dir() or super()._has_stored_files(user_dir)
+
+    def _has_rows(self, user_id: str) -> bool:
+        """Check whether anything was ever written for a user in the database."""
+        row = self._conn.execute(
+            "SELECT 1 FROM section_versions WHERE user_id = ? LIMIT 1", (user_id,)
+        ).fetchone()
+        return row is not None
+
+    def _import_file_data(self, user_id: str) -> None:
+        """Import a user's file-backend data the first time the user is accessed.
+
+        Users with rows in the database are never imported again, so data
+        written here is not replaced by older files.
+        """
+        if user_id in self._imported_users:
+            return
+        with self._lock:
+            if user_id in self._imported_users:
+                return
+            if not self._has_rows(user_id):
+                data = self._read_file_data(user_id)
+                if any(data.values()):
+                    with self._conn:
+                        # Take the write lock before checking again, so two
+                        # processes cannot both import the user
+                        self._conn.execute("BEGIN IMMEDIATE")
+                        if not self._has_rows(user_id):
+                            for section in empty_knowledge_base():
+                                self._replace_section(user_id, section, data[section])
+            self._imported_users.add(user_id)
+
+    def _load_data(self, user_id: str) -> Dict[str, Any]:
+        return {
+            section: self._read_section(user_id, section)
+            for section in empty_knowledge_base()
+        }
+
+    def _save_data(self, user_id: str, data: Dict[str, Any]) -> None:
+        self._import_file_data(user_id)
+        with self._lock, self._conn:
+            for section in empty_knowledge_base():
+                self._replace_section(
+                    user_id, section, data.get(section, empty_knowledge_base()[section])
+                )
+
+    def _read_section(self, user_id: str, section: str) -> Any:
+        self._import_file_data(user_id)
+        with self._lock:
+            if section == "business_profile":
+                return self._read_profile(user_id)
+            if section == "profile_meta":
+                row = self._conn.execute(
+                    "SELECT body FROM profile_meta WHERE user_id = ?", (user_id,)
+                ).fetchone()
+                return json.loads(row[0]) if row else {}
+            if section == "performance_data":
+                rows = self._conn.execute(
+                    "SELECT metric_name, body FROM performance_data WHERE user_id = ?",
+                    (user_id,),
+                ).fetchall()
+                return {name: json.loads(body) for name, body in rows}
+            rows = self._conn.execute(
+                f"SELECT body FROM {section} WHERE user_id = ? ORDER BY id",
+                (user_id,),
+            ).fetchall()
+            return [json.loads(body) for (body,) in rows]
+
+    def _read_profile(self, user_id: str) -> Dict[str, Any]:
+        """Assemble a user's profile from its metadata row and field rows."""
+        meta = self._conn.execute(
+            "SELECT created_at, updated_at, total_updates FROM business_profiles "
+            "WHERE user_id = ?",
+            (user_id,),
+        ).fetchone()
+        if meta is None:
+            return {}
+        fields = self._conn.execute(
+            "SELECT key, value FROM profile_fields WHERE user_id = ? ORDER BY position",
+            (user_id,),
+        ).fetchall()
+        return {
+            "data": {key: json.loads(value) for key, value in fields},
+            "created_at": meta[0],
+            "updated_at": meta[1],
+            "total_updates": meta[2],
+        }
+
+    def _write_section(self, user_id: str, section: str, value: Any) -> None:
+        self._import_file_data(user_id)
+        with self._lock, self._conn:
+            self._replace_section(user_id, section, value)
+
+    def _backfill_epoch_ms(self, user_id: str, section: str) -> int:
+        # Update bodies in place so row ids (record positions) are kept
+        field = TIMESTAMP_FIELDS[section]
+        self._import_file_data(user_id)
+        with self._lock, self._conn:
+            rows = self._conn.execute(
+                f"SELECT id, body FROM {section} WHERE user_id = ? ORDER BY id",
+                (user_id,),
+            ).fetchall()
+            updates = []
+            for row_id, body in rows:
+                record = json.loads(body)
+                if epoch_field(field) not in record:
+                    with_epoch_ms(record, field)
+                    updates.append(
+                        (json.dumps(record, default=json_serializer), row_id)
+                    )
+            if updates:
+                self._conn.executemany(
+                    f"UPDATE {section} SET body = ? WHERE id = ?", updates
+                )
+                self._bump_version(user_id, section)
+        return len(updates)
+
+    def _section_version(self, user_id: str, section: str) -> str:
+        self._import_file_data(user_id)
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT version FROM section_versions WHERE user_id = ? AND section = ?",
+                (user_id, section),
+            ).fetchone()
+        return str(row[0]) if row else "0"
+
+    def _bump_version(self, user_id: str, section: str) -> None:
+        """Increment a section's version; the caller holds the lock and transaction."""
+        self._conn.execute(
+            "INSERT INTO section_versions VALUES (?, ?, 1) "
+            "ON CONFLICT (user_id, section) DO UPDATE SET version = version + 1",
+            (user_id, section),
+        )
+
+    def _replace_section(self, user_id: str, section: str, value: Any) -> None:
+        """Replace a section's rows; the caller holds the lock and transaction."""
+        self._bump_version(user_id, section)
+        if section == "business_profile":
+            self._conn.execute(
+                "DELETE FROM business_profiles WHERE user_id = ?", (user_id,)
+            )
+            self._conn.execute(
+                "DELETE FROM profile_fields WHERE user_id = ?", (user_id,)
+            )
+            if not value:
+                return
+            self._conn.execute(
+                "INSERT INTO business_profiles VALUES (?, ?, ?, ?)",
+                (
+                    user_id,
+                    json_serializer(value.get("created_at")),
+                    json_serializer(value.get("updated_at")),
+                    value.get("total_updates", 0),
+                ),
+            )
+            self._conn.executemany(
+                "INSERT INTO profile_fields VALUES (?, ?, ?, ?)",
+                [
+                    (user_id, key, position, json.dumps(item, default=json_serializer))
+                    for position, (key, item) in enumerate(
+                        value.get("data", {}).items()
+                    )
+                ],
+            )
+        elif section == "profile_meta":
+            self._conn.execute("DELETE FROM profile_meta WHERE user_id = ?", (user_id,))
+            if value:
+                self._conn.execute(
+                    "INSERT INTO profile_meta VALUES (?, ?)",
+                    (user_id, json.dumps(value, default=json_serializer)),
+                )
+        elif section == "performance_data":
+            self._conn.execute(
+                "DELETE FROM performance_data WHERE user_id = ?", (user_id,)
+            )
+            for key, item in value.items():
+                self._upsert_metric(user_id, key, item)
+        else:
+            self._conn.execute(f"DELETE FROM {section} WHERE user_id = ?", (user_id,))
+            for record in value:
+                self._insert_record(user_id, section, record)
+
+    def _insert_record(
+        self, user_id: str, section: str, record: Dict[str, Any]
+    ) -> None:
+        """Insert one record row with its indexed columns populated."""
+        columns = RECORD_COLUMNS[section]
+        placeholders = ", ".join("?" for _ in range(len(columns) + 3))
+        self._conn.execute(
+            f"INSERT INTO {section} (user_id, ts, {', '.join(columns)}, body) "
+            f"VALUES ({placeholders})",
+            (
+                user_id,
+                record_epoch_ms(record, TIMESTAMP_FIELDS[section]),
+                *(record_field(record, column) for column in columns),
+                json.dumps(record, default=json_serializer),
+            ),
+        )
+
+    def _upsert_metric(self, user_id: str, metric_name: str, value: Any) -> None:
+        """Insert or replace one performance metric row."""
+        self._conn.execute(
+            "INSERT OR REPLACE INTO performance_data VALUES (?, ?, ?)",
+            (user_id, metric_name, json.dumps(value, default=json_serializer)),
+        )
+
+    def _apply_batch(
+        self, user_id: str, operations: List[Operation]
+    ) -> Optional[BusinessProfile]:
+        profile_updates, appends, puts = group_operations(operations)
+        self._import_file_data(user_id)
+        with self._lock, self._conn:
+            profile = None
+            if profile_updates:
+                profile = self._updated_profile(
+                    self._read_profile(user_id), profile_updates
+                )
+                self._replace_section(user_id, "business_profile", profile.model_dump())
+                self._replace_section(
+                    user_id,
+                    "profile_meta",
+                    self._updated_profile_meta(user_id, profile),
+                )
+            for section, records in appends.items():
+                self._bump_version(user_id, section)
+                for record in records:
+                    self._insert_record(user_id, section, record)
+            for section, entries in puts.items():
+                self._bump_version(user_id, section)
+                for key, value in entries.items():
+                    self._upsert_metric(user_id, key, value)
+        return profile
+
+    def _query_records(
+        self,
+        user_id: str,
+        section: str,
+        filters: Dict[str, Any],
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+    ) -> List[Dict[str, Any]]:
+        self._import_file_data(user_id)
+        clauses, params = self._record_clauses(user_id, filters, start, end)
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT body FROM {section} WHERE {' AND '.join(clauses)} ORDER BY id",
+                params,
+            ).fetchall()
+        return [json.loads(body) for (body,) in rows]
+
+    def _query_page(
+        self,
+        user_id: str,
+        section: str,
+        filters: Dict[str, Any],
+        start: Optional[datetime],
+        end: Optional[datetime],
+        after: Optional[PageKey],
+        limit: int,
+        descending: bool,
+    ) -> List[Tuple[PageKey, Dict[str, Any]]]:
+        # Same order as page_key, with the row ID as the storage position
+        self._import_file_data(user_id)
+        clauses, params = self._record_clauses(user_id, filters, start, end)
+        if after is not None:
+            clauses.append(f"(IFNULL(ts, 0), id) {'<' if descending else '>'} (?, ?)")
+            params.extend(after)
+        direction = "DESC" if descending else "ASC"
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT IFNULL(ts, 0), id, body FROM {section} "
+                f"WHERE {' AND '.join(clauses)} "
+                f"ORDER BY IFNULL(ts, 0) {direction}, id {direction} LIMIT ?",
+                [*params, limit],
+            ).fetchall()
+        return [((ts, row_id), json.loads(body)) for ts, row_id, body in rows]
+
+    def _iter_section(
+        self, user_id: str, section: str, after: Optional[int]
+    ) -> Iterator[Tuple[int, Dict[str, Any]]]:
+        # Keyset batches on the row ID, so the lock is only held per batch
+        self._import_file_data(user_id)
+        last_id = after if after is not None else 0
+        while True:
+            with self._lock:
+                rows = self._conn.execute(
+                    f"SELECT id, body FROM {section} WHERE user_id = ? AND id > ? "
+                    "ORDER BY id LIMIT ?",
+                    (user_id, last_id, ITER_BATCH_SIZE),
+                ).fetchall()
+            for row_id, body in rows:
+                yield row_id, json.loads(body)
+            if len(rows) < ITER_BATCH_SIZE:
+                return
+            last_id = rows[-1][0]
+
+    def _record_clauses(
+        self,
+        user_id: str,
+        filters: Dict[str, Any],
+        start: Optional[datetime],
+        end: Optional[datetime],
+    ) -> Tuple[List[str], List[Any]]:
+        """Build the WHERE clauses selecting a user's matching record rows."""
+        clauses = ["user_id = ?"]
+        params: List[Any] = [user_id]
+        for field, value in filters.items():
+            if value:
+                clauses.append(f"{field} = ?")
+                params.append(value)
+        if start is not None:
+            clauses.append("ts >= ?")
+            params.append(to_epoch_ms(start))
+        if end is not None:
+            clauses.append("ts < ?")
+            params.append(to_epoch_ms(end))
+        return clauses, params
@@ -0,0 +1,108 @@
+#   Copyright 2025 Akshat Deepak Joshi
+
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+
+#       http://www.apache.org/licenses/LICENSE-2.0
+
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from smallbizpal.shared.utils.logging import logger
+
+# Same shape as knowledge_base.Operation (kept local to avoid a circular import)
+Operation = Tuple[Any, ...]
+
+
+class WriteBehindBuffer:
+    """Per-user buffer of knowledge base mutations awaiting a group commit.
+
+    The buffer only holds operations; the owning KnowledgeBaseService decides
+    how to apply them. ``add`` reports when a user's buffer reaches
+    ``max_operations`` so the caller can flush it, and a background thread
+    calls the service's flush function every ``flush_interval`` seconds.
+    """
+
+    def __init__(self, max_operations: int = 100, flush_interval: float = 1.0):
+        """Initialize the buffer.
+
+        Args:
+            max_operations: Buffered operations per user that trigger a flush
+            flush_interval: Seconds between background flushes
+        """
+        self.max_operations = max_operations
+        self.flush_interval = flush_interval
+        self._pending: Dict[str, List[Operation]] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._flush: Optional[Callable[[], None]] = None
+
+    def start(self, flush: Callable[[], None]) -> None:
+        """Register the function flushing every user; started on first add."""
+        self._flush = flush
+
+    def add(self, user_id: str, operations: List[Operation]) -> bool:
+        """Buffer operations for a user.
+
+        Returns:
+            True if the user's buffer reached ``max_operations``
+        """
+        with self._lock:
+            pending = self._pending.setdefault(user_id, [])
+            pending.extend(operations)
+            if self._thread is None and self._flush is not None:
+                self._thread = threading.Thread(
+                    target=self._run, name="knowledge-base-flush", daemon=True
+                )
+                self._thread.start()
+            return len(pending) >= self.max_operations
+
+    def pending(self, user_id: str) -> List[Operation]:
+        """Get a copy of the operations buffered for a user, oldest first."""
+        with self._lock:
+            return list(self._pending.get(user_id, ()))
+
+    def users(self) -> List[str]:
+        """Get the users with buffered operations."""
+        with self._lock:
+            return list(self._pending)
+
+    def remove(self, user_id: str, count: int) -> None:
+        """Drop the ``count`` oldest operations of a user after they were stored."""
+        with self._lock:
+            pending = self._pending.get(user_id, [])
+            del pending[:count]
+            if not pending:
+                self._pending.pop(user_id, None)
+
+    def discard(self, user_id: str) -> None:
+        """Drop every buffered operation of a user without storing it."""
+        with self._lock:
+            self._pending.pop(user_id, None)
+
+    def size(self) -> int:
+        """Get the total number of buffered operations."""
+        with self._lock:
+            return sum(len(pending) for pending in self._pending.values())
+
+    def stop(self) -> None:
+        """Stop the background flush thread."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.flush_interval):
+            try:
+                self._flush()
+            except Exception as e:
+                # Operations stay buffered and are retried on the next flush
+                logger.error(f"Knowledge base write-behind flush failed: {e}")
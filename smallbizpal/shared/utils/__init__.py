@@ -12,6 +12,25 @@
 #   See the License for the specific language governing permissions and
 #   limitations under the License.
 
+from .files import write_file_atomic
 from .logging import logger, setup_logging
+from .timestamps import (
+    day_bounds,
+    epoch_field,
+    record_epoch_ms,
+    to_epoch_ms,
+    utc_day,
+    with_epoch_ms,
+)
 
-__all__ = ["setup_logging", "logger"]
+__all__ = [
+    "setup_logging",
+    "logger",
+    "to_epoch_ms",
+    "epoch_field",
+    "record_epoch_ms",
+    "with_epoch_ms",
+    "day_bounds",
+    "utc_day",
+    "write_file_atomic",
+]
@@ -0,0 +1,114 @@
+#   Copyright 2025 Akshat Deepak Joshi
+
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+
+#       http://www.apache.org/licenses/LICENSE-2.0
+
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+from datetime import UTC, date, datetime, time, timedelta
+from typing import Any, Dict, Optional, Tuple
+
+# Suffix of the integer epoch-millis field stored next to a timestamp field
+EPOCH_FIELD_SUFFIX = "_ms"
+
+
+def to_epoch_ms(value: Any) -> Optional[int]:
+    """Convert a stored timestamp to integer epoch milliseconds (UTC).
+
+    Accepts datetime objects, ISO format strings and epoch milliseconds.
+    Naive values are treated as UTC.
+
+    Args:
+        value: Timestamp as datetime, ISO string or epoch milliseconds
+
+    Returns:
+        Epoch milliseconds or None if the value cannot be parsed
+    """
+    if isinstance(value, int) and not isinstance(value, bool):
+        return value
+    if isinstance(value, datetime):
+        dt = value
+    elif isinstance(value, date):
+        dt = datetime.combine(value, time.min)
+    else:
+        try:
+            dt = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+        except ValueError:
+            return None
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=UTC)
+    return int(dt.timestamp() * 1000)
+
+
+def epoch_field(field: str) -> str:
+    """Get the name of the epoch-millis field stored next to a timestamp field."""
+    return field + EPOCH_FIELD_SUFFIX
+
+
+def record_epoch_ms(record: Dict[str, Any], field: str) -> Optional[int]:
+    """Get a record's timestamp in epoch milliseconds.
+
+    Uses the integer field written at store time (e.g. ``created_at_ms``)
+    and only parses the timestamp string for records stored before it
+    existed.
+
+    Args:
+        record: Stored record
+        field: Name of the record's timestamp field
+
+    Returns:
+        Epoch milliseconds or None if the record has no valid timestamp
+    """
+    value = record.get(epoch_field(field))
+    if isinstance(value, int) and not isinstance(value, bool):
+        return value
+    return to_epoch_ms(record.get(field, ""))
+
+
+def with_epoch_ms(record: Dict[str, Any], field: str) -> Dict[str, Any]:
+    """Add the epoch-millis field of a record's timestamp, in place.
+
+    The original timestamp field is kept. The epoch field is None when the
+    timestamp cannot be parsed.
+
+    Returns:
+        The record
+    """
+    record[epoch_field(field)] = to_epoch_ms(record.get(field, ""))
+    return record
+
+
+def utc_day(value: Any) -> Optional[date]:
+    """Get the UTC calendar day of a stored timestamp.
+
+    Args:
+        value: Timestamp as datetime, ISO string (naive values are UTC) or
+            epoch milliseconds
+
+    Returns:
+        The day, or None if the value cannot be parsed
+    """
+    ts = to_epoch_ms(value)
+    if ts is None:
+        return None
+    return datetime.fromtimestamp(ts / 1000, UTC).date()
+
+
+def day_bounds(day: date) -> Tuple[datetime, datetime]:
+    """Get the half-open UTC datetime range [start, end) covering a day.
+
+    Args:
+        day: The calendar day
+
+    Returns:
+        Tuple of (start of day, start of next day) in UTC
+    """
+    start = datetime.combine(day, time.min, tzinfo=UTC)
+    return start, start + timedelta(days=1)
@@ -0,0 +1,138 @@
+#   Copyright 2025 Akshat Deepak Joshi
+
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+
+#       http://www.apache.org/licenses/LICENSE-2.0
+
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+import tempfile
+from types import SimpleNamespace
+
+import pytest
+
+import smallbizpal.agents.kb_proxy.tools as kb_proxy_tools
+from customer_engagement.tools import knowledge_base_tools
+from smallbizpal.shared.services.answer_cache import AnswerCache, normalize_query
+from smallbizpal.shared.services.knowledge_base import KnowledgeBaseService
+
+
+class FakeClock:
+    """Manually advanced time source."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_normalized_queries_share_an_entry():
+    """Test that case, punctuation and spacing do not change the cache key."""
+
+    cache = AnswerCache()
+    assert normalize_query("  Are you OPEN on Sunday?? ") == "are you open on sunday"
+
+    assert cache.get("user1", "Are you open on Sunday?", 1) is None
+    cache.put("user1", "Are you open on Sunday?", 1, "9am-3pm")
+
+    assert cache.get("user1", "are you open on sunday", 1) == "9am-3pm"
+    assert cache.get("user2", "are you open on sunday", 1) is None
+    assert cache.stats("user1") == {
+        "hits": 1,
+        "misses": 1,
+        "hit_ratio": 0.5,
+        "entries": 1,
+    }
+    assert cache.stats()["hit_ratio"] == pytest.approx(1 / 3)
+
+
+def test_profile_version_bump_invalidates_answers():
+    """Test that a newer profile version drops every cached answer of the user."""
+
+    cache = AnswerCache()
+    cache.put("user1", "hours", 1, "old hours")
+    cache.put("user1", "parking", 1, "old parking")
+    cache.put("user2", "hours", 1, "other business")
+
+    assert cache.get("user1", "hours", 2) is None
+    assert cache.stats("user1")["entries"] == 0
+    assert cache.stats()["invalidations"] == 1
+    assert cache.get("user2", "hours", 1) == "other business"
+
+    # An answer computed before the update must not be cached afterwards
+    cache.put("user1", "hours", 1, "old hours")
+    assert cache.get("user1", "hours", 2) is None
+
+
+def test_ttl_and_size_bounds():
+    """Test that answers expire and each user keeps at most max_entries."""
+
+    clock = FakeClock()
+    cache = AnswerCache(max_entries=2, ttl_seconds=10, max_users=2, clock=clock)
+
+    cache.put("user1", "a", 1, "A")
+    clock.now = 9
+    assert cache.get("user1", "a", 1) == "A"
+    clock.now = 10
+    assert cache.get("user1", "a", 1) is None
+
+    for query in ("a", "b", "c"):
+        cache.put("user1", query, 1, query.upper())
+    assert cache.get("user1", "a", 1) is None
+    assert cache.get("user1", "c", 1) == "C"
+    assert cache.stats()["evictions"] == 1
+
+    cache.put("user2", "a", 1, "A")
+    cache.put("user3", "a", 1, "A")
+    assert cache.stats()["users"] == 2
+    assert cache.get("user1", "c", 1) is None
+
+
+def test_disabled_cache_stores_nothing():
+    """Test that a cache with no entries never returns an answer."""
+
+    cache = AnswerCache(max_entries=0)
+    cache.put("user1", "hours", 1, "9am")
+    assert cache.get("user1", "hours", 1) is None
+
+
+def test_ask_internal_kb_reuses_answers_until_profile_update(monkeypatch):
+    """Test that repeated questions skip retrieval until the profile changes."""
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        kb_service = KnowledgeBaseService(temp_dir)
+        kb_service.update_business_profile("user1", {"hours": "9am-5pm"})
+        retrievals = []
+
+        def answer_from_kb(user_id, query):
+            retrievals.append(query)
+            return f"- hours: {kb_service.get_business_data(user_id)['hours']}"
+
+        monkeypatch.setattr(kb_proxy_tools, "answer_from_kb", answer_from_kb)
+        monkeypatch.setattr(knowledge_base_tools, "knowledge_base_service", kb_service)
+        monkeypatch.setattr(knowledge_base_tools, "answer_cache", AnswerCache())
+        tool_context = SimpleNamespace(
+            _invocation_context=SimpleNamespace(
+                session=SimpleNamespace(user_id="user1")
+            )
+        )
+        ask = knowledge_base_tools.ask_internal_kb
+
+        assert ask("What are your hours?", tool_context) == "- hours: 9am-5pm"
+        assert ask("what are your hours", tool_context) == "- hours: 9am-5pm"
+        assert len(retrievals) == 1
+
+        kb_service.update_business_profile("user1", {"hours": "8am-4pm"})
+        assert ask("What are your hours?", tool_context) == "- hours: 8am-4pm"
+        assert len(retrievals) == 2
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,155 @@
+#   Copyright 2025 Akshat Deepak Joshi
+
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+
+#       http://www.apache.org/licenses/LICENSE-2.0
+
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+import tempfile
+from pathlib import Path
+
+import pytest
+
+from smallbizpal.shared.services import append_only_knowledge_base
+from smallbizpal.shared.services.append_only_knowledge_base import (
+    AppendOnlyKnowledgeBaseService,
+)
+from smallbizpal.shared.services.knowledge_base import KnowledgeBaseService
+
+
+def test_append_only_writes_append_to_segments():
+    """Test that each store call appends a single line to its section segment."""
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        kb_service = AppendOnlyKnowledgeBaseService(base_storage_path=temp_dir)
+
+        kb_service.store_customer_interaction("user1", {"type": "inquiry"})
+        kb_service.store_customer_interaction("user1", {"type": "meeting_request"})
+        kb_service.store_marketing_asset("user1", {"content": "Hello"})
+
+        segment = Path(temp_dir) / "user1" / "segments" / "customer_interactions.jsonl"
+        assert len(segment.read_text().splitlines()) == 2
+
+        interactions = kb_service.get_customer_interactions("user1")
+        assert [i["type"] for i in interactions] == ["inquiry", "meeting_request"]
+        assert kb_service.get_marketing_assets("user1")[0]["content"] == "Hello"
+
+
+def test_append_only_performance_data_last_write_wins():
+    """Test that replaying the metrics segment keeps the latest value per metric."""
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        kb_service = AppendOnlyKnowledgeBaseService(base_storage_path=temp_dir)
+
+        kb_service.store_performance_data("user1", "daily", {"leads": 1})
+        kb_service.store_performance_data("user1", "daily", {"leads": 3})
+        kb_service.store_performance_data("user1", "weekly", {"leads": 7})
+
+        assert kb_service.get_performance_data("user1", "daily") == {"leads": 3}
+        assert set(kb_service.get_performance_data("user1")) == {"daily", "weekly"}
+
+
+def test_append_only_migrates_legacy_knowledge_base():
+    """Test that data stored by the default backend is converted into segments."""
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        legacy_service = KnowledgeBaseService(base_storage_path=temp_dir)
+        legacy_service.update_business_profile("user1", {"business_name": "Cafe"})
+        legacy_service.store_marketing_asset("user1", {"content": "Old post"})
+
+        kb_service = AppendOnlyKnowledgeBaseService(base_storage_path=temp_dir)
+        kb_service.store_marketing_asset("user1", {"content": "New post"})
+
+        profile = kb_service.get_business_profile("user1")
+        assert profile is not None
+        assert profile.get_all_data()["business_name"] == "Cafe"
+        assets = kb_service.get_marketing_assets("user1")
+        assert [a["content"] for a in assets] == ["Old post", "New post"]
+
+
+def test_append_only_migration_retries_after_crash(monkeypatch):
+    """Test that an interrupted migration leaves no segments and runs again."""
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        legacy_service = KnowledgeBaseService(base_storage_path=temp_dir)
+        legacy_service.update_business_profile("user1", {"business_name": "Cafe"})
+        legacy_service.store_marketing_asset("user1", {"content": "Old post"})
+
+        write_file_atomic = append_only_knowledge_base.write_file_atomic
+        written = []
+
+        def crash_after_first_write(path, content):
+            if written:
+                raise OSError("disk full")
+            written.append(path)
+            write_file_atomic(path, content)
+
+        monkeypatch.setattr(
+            append_only_knowledge_base, "write_file_atomic", crash_after_first_write
+        )
+        kb_service = AppendOnlyKnowledgeBaseService(base_storage_path=temp_dir)
+        with pytest.raises(OSError):
+            kb_service.get_marketing_assets("user1")
+        assert not (Path(temp_dir) / "user1" / "segments").exists()
+
+        monkeypatch.setattr(
+            append_only_knowledge_base, "write_file_atomic", write_file_atomic
+        )
+        assets = kb_service.get_marketing_assets("user1")
+        assert [a["content"] for a in assets] == ["Old post"]
+        profile = kb_service.get_business_profile("user1")
+        assert profile is not None
+        assert profile.get_all_data()["business_name"] == "Cafe"
+
+
+def test_append_only_append_does_not_mutate_earlier_reads():
+    """Test that values returned before an append are not changed by it."""
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        kb_service = AppendOnlyKnowledgeBaseService(
+            base_storage_path=temp_dir, cache_max_bytes=1024 * 1024
+        )
+        kb_service.store_customer_interaction("user1", {"type": "inquiry"})
+        kb_service.store_performance_data("user1", "daily", {"leads": 1})
+
+        interactions = kb_service._read_section("user1", "customer_interactions")
+        metrics = kb_service._read_section("user1", "performance_data")
+        kb_service.store_customer_interaction("user1", {"type": "meeting_request"})
+        kb_service.store_performance_data("user1", "weekly", {"leads": 7})
+
+        assert [i["type"] for i in interactions] == ["inquiry"]
+        assert set(metrics) == {"daily"}
+        assert len(kb_service.get_customer_interactions("user1")) == 2
+        assert set(kb_service._read_section("user1", "performance_data")) == {
+            "daily",
+            "weekly",
+        }
+
+
+def test_append_only_skips_torn_trailing_line():
+    """Test that a partially written last line does not break reads."""
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        kb_service = AppendOnlyKnowledgeBaseService(base_storage_path=temp_dir)
+        kb_service.store_customer_interaction("user1", {"type": "inquiry"})
+
+        segment = Path(temp_dir) / "user1" / "segments" / "customer_interactions.jsonl"
+        with open(segment, "a") as f:
+            f.write('{"type": "trunc')
+
+        assert len(kb_service.get_customer_interactions("user1")) == 1
+
+        kb_service.store_customer_interaction("user1", {"type": "meeting_request"})
+        interactions = kb_service.get_customer_interactions("user1")
+        assert [i["type"] for i in interactions] == ["inquiry", "meeting_request"]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
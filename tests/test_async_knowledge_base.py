@@ -0,0 +1,71 @@
+#   Copyright 2025 Akshat Deepak Joshi
+
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+
+#       http://www.apache.org/licenses/LICENSE-2.0
+
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+import asyncio
+import tempfile
+import threading
+import time
+
+import pytest
+
+from smallbizpal.shared.services.async_knowledge_base import (
+    AsyncKnowledgeBaseService,
+)
+from smallbizpal.shared.services.knowledge_base import KnowledgeBaseService
+
+
+async def test_async_facade_round_trip():
+    """Test that async methods read and write through the wrapped service."""
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        akb = AsyncKnowledgeBaseService(KnowledgeBaseService(temp_dir))
+
+        result = await akb.aupdate_business_profile("user1", {"name": "Cafe"})
+        await akb.astore_marketing_asset("user1", {"platform": "twitter"})
+        await akb.astore_customer_interaction("user1", {"type": "inquiry"})
+
+        assert result["status"] == "success"
+        profile = await akb.aget_business_profile("user1")
+        assert profile is not None and profile.get_all_data() == {"name": "Cafe"}
+        assets = await akb.aget_marketing_assets("user1", platform="twitter")
+        assert len(assets) == 1
+        assert len(await akb.aget_customer_interactions("user1")) == 1
+        akb.shutdown()
+
+
+async def test_async_facade_bounds_concurrency():
+    """Test that no more than max_concurrency calls run at the same time."""
+
+    akb = AsyncKnowledgeBaseService(KnowledgeBaseService(), max_concurrency=2)
+    lock = threading.Lock()
+    running = 0
+    peak = 0
+
+    def blocking_call() -> None:
+        nonlocal running, peak
+        with lock:
+            running += 1
+            peak = max(peak, running)
+        time.sleep(0.02)
+        with lock:
+            running -= 1
+
+    await asyncio.gather(*(akb.run(blocking_call) for _ in range(6)))
+
+    assert peak == 2
+    akb.shutdown()
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
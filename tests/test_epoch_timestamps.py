@@ -0,0 +1,172 @@
+#   Copyright 2025 Akshat Deepak Joshi
+
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+
+#       http://www.apache.org/licenses/LICENSE-2.0
+
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+import json
+import tempfile
+from datetime import UTC, date, datetime
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+from customer_engagement.tools import meeting_tools
+from smallbizpal.shared import services
+from smallbizpal.shared.services.append_only_knowledge_base import (
+    AppendOnlyKnowledgeBaseService,
+)
+from smallbizpal.shared.services.knowledge_base import KnowledgeBaseService
+from smallbizpal.shared.services.lead_store import LeadStore
+from smallbizpal.shared.services.partitioned_knowledge_base import (
+    PartitionedKnowledgeBaseService,
+)
+from smallbizpal.shared.services.sqlite_knowledge_base import (
+    SQLiteKnowledgeBaseService,
+)
+from smallbizpal.shared.utils.timestamps import day_bounds, record_epoch_ms
+
+BACKENDS = [
+    KnowledgeBaseService,
+    AppendOnlyKnowledgeBaseService,
+    PartitionedKnowledgeBaseService,
+    SQLiteKnowledgeBaseService,
+]
+
+JUNE_1_MS = 1748736000000
+
+
+def test_record_epoch_ms_prefers_stored_field():
+    """Test that the stored epoch field is used instead of parsing the string."""
+
+    assert record_epoch_ms({"timestamp_ms": 5, "timestamp": "bad"}, "timestamp") == 5
+    assert (
+        record_epoch_ms({"timestamp": "2025-06-01T00:00:00Z"}, "timestamp") == JUNE_1_MS
+    )
+    assert record_epoch_ms({"timestamp_ms": None, "timestamp": ""}, "timestamp") is None
+
+
+@pytest.mark.parametrize("service_class", BACKENDS)
+def test_records_stored_with_epoch_ms(service_class):
+    """Test that records keep their timestamp string and gain epoch millis."""
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        kb_service = service_class(base_storage_path=temp_dir)
+        kb_service.store_marketing_asset(
+            "user1", {"content": "Post", "created_at": datetime(2025, 6, 1, tzinfo=UTC)}
+        )
+        kb_service.store_marketing_asset("user1", {"content": "Undated"})
+        kb_service.store_customer_interaction(
+            "user1", {"type": "inquiry", "timestamp": "2025-06-01T02:00:00+02:00"}
+        )
+
+        assets = kb_service.get_marketing_assets("user1")
+        dated = next(a for a in assets if a["content"] == "Post")
+        undated = next(a for a in assets if a["content"] == "Undated")
+        assert dated["created_at"] == "2025-06-01 00:00:00+00:00"
+        assert dated["created_at_ms"] == JUNE_1_MS
+        assert undated["created_at"] == "" and undated["created_at_ms"] is None
+        interaction = kb_service.get_customer_interactions("user1")[0]
+        assert interaction["timestamp"] == "2025-06-01T02:00:00+02:00"
+        assert interaction["timestamp_ms"] == JUNE_1_MS
+        kb_service.close()
+
+
+@pytest.mark.parametrize("service_class", BACKENDS)
+def test_backfill_adds_epoch_ms_and_keeps_positions(service_class):
+    """Test that records stored without epoch millis are backfilled once."""
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        kb_service = service_class(base_storage_path=temp_dir)
+        for day in (2, 1):
+            kb_service.store_customer_interaction(
+                "user1", {"type": "inquiry", "timestamp": f"2025-06-0{day}T10:00:00"}
+            )
+        # Simulate records written before epoch fields existed
+        records = [
+            {k: v for k, v in record.items() if k != "timestamp_ms"}
+            for record in kb_service.get_customer_interactions("user1")
+        ]
+        kb_service._write_section("user1", "customer_interactions", records)
+        before = list(kb_service.iter_records("user1", "customer_interactions"))
+        assert all("timestamp_ms" not in record for _, record in before)
+
+        assert kb_service.backfill_epoch_timestamps("user1") == 2
+        assert kb_service.backfill_epoch_timestamps("user1") == 0
+
+        after = list(kb_service.iter_records("user1", "customer_interactions"))
+        assert [position for position, _ in after] == [p for p, _ in before]
+        expected = {
+            "2025-06-01T10:00:00": JUNE_1_MS + 36000000,
+            "2025-06-02T10:00:00": JUNE_1_MS + 86400000 + 36000000,
+        }
+        for _, record in after:
+            assert record["timestamp_ms"] == expected[record["timestamp"]]
+        start, end = day_bounds(date(2025, 6, 1))
+        assert len(kb_service.get_customer_interactions("user1", None, start, end)) == 1
+        kb_service.close()
+
+
+def test_leads_stored_and_backfilled_with_epoch_ms():
+    """Test that leads gain timestamp_ms on append and on backfill."""
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        leads_dir = Path(temp_dir) / "user1" / "leads"
+        leads_dir.mkdir(parents=True)
+        (leads_dir / "leads.json").write_text(
+            json.dumps([{"email": "a@example.com", "timestamp": "2025-06-01"}])
+        )
+
+        store = LeadStore(base_storage_path=temp_dir)
+        store.append("user1", {"email": "b@example.com", "timestamp": "2025-06-01"})
+        assert [lead.get("timestamp_ms") for lead in store.get_leads("user1")] == [
+            None,
+            JUNE_1_MS,
+        ]
+
+        assert store.backfill_epoch_timestamps("user1") == 1
+        assert store.backfill_epoch_timestamps("user1") == 0
+        assert [lead["timestamp_ms"] for lead in store.get_leads("user1")] == [
+            JUNE_1_MS,
+            JUNE_1_MS,
+        ]
+        assert len(store.get_leads_by_day("user1", date(2025, 6, 1))) == 2
+
+
+def test_scheduled_meetings_stored_in_utc(monkeypatch):
+    """Test that schedule_meeting writes timezone-aware UTC timestamps."""
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        kb_service = KnowledgeBaseService(base_storage_path=temp_dir)
+        leads = LeadStore(base_storage_path=temp_dir)
+        monkeypatch.setattr(meeting_tools, "lead_store", leads)
+        monkeypatch.setattr(services, "knowledge_base_service", kb_service)
+        tool_context = SimpleNamespace(
+            _invocation_context=SimpleNamespace(
+                session=SimpleNamespace(user_id="user1")
+            )
+        )
+
+        meeting_tools.schedule_meeting(
+            "Ada", "ada@example.com", "Catering", tool_context
+        )
+
+        [lead] = leads.get_leads("user1")
+        [interaction] = kb_service.get_customer_interactions("user1")
+        for timestamp in [lead["timestamp"], interaction["timestamp"]]:
+            assert datetime.fromisoformat(timestamp).utcoffset().total_seconds() == 0
+        day = datetime.now(UTC).date()
+        assert leads.get_leads_by_day("user1", day) == [lead]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,96 @@
+#   Copyright 2025 Akshat Deepak Joshi
+
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+
+#       http://www.apache.org/licenses/LICENSE-2.0
+
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+import tempfile
+
+import pytest
+
+from smallbizpal.shared.services.append_only_knowledge_base import (
+    AppendOnlyKnowledgeBaseService,
+)
+from smallbizpal.shared.services.knowledge_base import KnowledgeBaseService
+from smallbizpal.shared.services.partitioned_knowledge_base import (
+    PartitionedKnowledgeBaseService,
+)
+from smallbizpal.shared.services.sqlite_knowledge_base import (
+    SQLiteKnowledgeBaseService,
+)
+from smallbizpal.shared.services.write_behind import WriteBehindBuffer
+
+BACKENDS = [
+    KnowledgeBaseService,
+    AppendOnlyKnowledgeBaseService,
+    PartitionedKnowledgeBaseService,
+    SQLiteKnowledgeBaseService,
+]
+ASSETS = ["marketing_assets"]
+ENGAGEMENT = ["customer_interactions", "performance_data"]
+PROFILE = ["business_profile", "profile_meta"]
+
+
+@pytest.mark.parametrize("service_class", BACKENDS)
+def test_etag_changes_only_with_its_sections(service_class):
+    """Test that a section's ETag changes on its writes and on no others."""
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        kb_service = service_class(temp_dir)
+        assets = kb_service.get_etag("user1", ASSETS)
+        engagement = kb_service.get_etag("user1", ENGAGEMENT)
+        profile = kb_service.get_etag("user1", PROFILE)
+        assert kb_service.get_etag("user1", ASSETS) == assets
+
+        kb_service.store_marketing_asset("user1", {"content": "a"})
+        assert kb_service.get_etag("user1", ASSETS) != assets
+        assert kb_service.get_etag("user1", ENGAGEMENT) == engagement
+        assets = kb_service.get_etag("user1", ASSETS)
+
+        # Consecutive writes of the same size still change the tag
+        kb_service.store_performance_data("user1", "reach", {"value": 1})
+        engagement = kb_service.get_etag("user1", ENGAGEMENT)
+        kb_service.store_performance_data("user1", "reach", {"value": 2})
+        assert kb_service.get_etag("user1", ENGAGEMENT) != engagement
+
+        kb_service.update_business_profile("user1", {"name": "Cafe"})
+        assert kb_service.get_etag("user1", PROFILE) != profile
+        assert kb_service.get_etag("user1", ASSETS) == assets
+        assert kb_service.get_etag("user2", ASSETS) != assets
+
+        kb_service.clear_all_data("user1")
+        assert kb_service.get_etag("user1", ASSETS) != assets
+
+
+@pytest.mark.parametrize("service_class", BACKENDS)
+def test_etag_tracks_buffered_writes(service_class):
+    """Test that writes still in the write-behind buffer change the ETag."""
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        kb_service = service_class(
+            temp_dir, write_behind=WriteBehindBuffer(flush_interval=60)
+        )
+        initial = kb_service.get_etag("user1", ENGAGEMENT)
+        assets = kb_service.get_etag("user1", ASSETS)
+
+        kb_service.store_customer_interaction("user1", {"type": "inquiry"})
+        buffered = kb_service.get_etag("user1", ENGAGEMENT)
+        assert buffered != initial
+        assert kb_service.get_etag("user1", ASSETS) == assets
+
+        kb_service.flush()
+        flushed = kb_service.get_etag("user1", ENGAGEMENT)
+        assert flushed not in (initial, buffered)
+        kb_service.close()
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
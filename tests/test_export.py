@@ -0,0 +1,173 @@
+#   Copyright 2025 Akshat Deepak Joshi
+
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+
+#       http://www.apache.org/licenses/LICENSE-2.0
+
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+import json
+import tempfile
+from pathlib import Path
+
+import pytest
+
+from smallbizpal.shared.services.append_only_knowledge_base import (
+    AppendOnlyKnowledgeBaseService,
+)
+from smallbizpal.shared.services.export import export_records, ndjson_lines
+from smallbizpal.shared.services.knowledge_base import KnowledgeBaseService
+from smallbizpal.shared.services.lead_store import LeadStore
+from smallbizpal.shared.services.partitioned_knowledge_base import (
+    PartitionedKnowledgeBaseService,
+)
+from smallbizpal.shared.services.serializers import iter_document_array
+from smallbizpal.shared.services.sqlite_knowledge_base import (
+    SQLiteKnowledgeBaseService,
+)
+from smallbizpal.shared.services.write_behind import WriteBehindBuffer
+
+BACKENDS = [
+    KnowledgeBaseService,
+    AppendOnlyKnowledgeBaseService,
+    PartitionedKnowledgeBaseService,
+    SQLiteKnowledgeBaseService,
+]
+
+
+def test_iter_document_array_reads_in_chunks():
+    """Test that list documents are decoded element by element across chunks."""
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        records = [{"n": i, "text": "café " * i} for i in range(50)] + [12345]
+        for name, text in [
+            ("pretty.json", json.dumps(records, indent=2)),
+            ("compact.json", json.dumps(records, separators=(",", ":"))),
+        ]:
+            path = Path(temp_dir) / name
+            path.write_text(text, encoding="utf-8")
+            assert list(iter_document_array(path, chunk_size=5)) == records
+
+        truncated = Path(temp_dir) / "truncated.json"
+        truncated.write_text('[{"n": 1}, {"n"')
+        with pytest.raises(ValueError):
+            list(iter_document_array(truncated, chunk_size=4))
+
+
+@pytest.mark.parametrize("service_class", BACKENDS)
+def test_iter_records_resumes_after_position(service_class):
+    """Test that streamed records can be resumed from the last position seen."""
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        kb_service = service_class(base_storage_path=temp_dir)
+        for i in range(3):
+            kb_service.store_customer_interaction("user1", {"type": f"t{i}"})
+        kb_service.store_customer_interaction("user2", {"type": "other"})
+
+        first = list(kb_service.iter_records("user1", "customer_interactions"))
+        assert [record["type"] for _, record in first] == ["t0", "t1", "t2"]
+
+        kb_service.store_customer_interaction("user1", {"type": "t3"})
+        since = first[-1][0]
+        newer = list(kb_service.iter_records("user1", "customer_interactions", since))
+        assert [record["type"] for _, record in newer] == ["t3"]
+        assert list(kb_service.iter_records("user3", "marketing_assets")) == []
+
+        with pytest.raises(ValueError):
+            kb_service.iter_records("user1", "performance_data")
+        kb_service.close()
+
+
+def test_iter_records_stores_buffered_writes_first():
+    """Test that an export includes records still in the write-behind buffer."""
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        kb_service = KnowledgeBaseService(
+            temp_dir, write_behind=WriteBehindBuffer(flush_interval=60)
+        )
+        kb_service.store_marketing_asset("user1", {"platform": "twitter"})
+
+        records = list(kb_service.iter_records("user1", "marketing_assets"))
+        assert [record["platform"] for _, record in records] == ["twitter"]
+        assert kb_service.write_behind.size() == 0
+        kb_service.close()
+
+
+def test_export_leads_and_reports():
+    """Test that leads and reports are exported with resumable cursors."""
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        kb_service = KnowledgeBaseService(base_storage_path=temp_dir)
+        data_dir = Path(temp_dir)
+        leads_dir = data_dir / "user1" / "leads"
+        leads_dir.mkdir(parents=True)
+        (leads_dir / "leads.json").write_text(
+            json.dumps([{"email": "a@example.com"}, {"email": "b@example.com"}])
+        )
+        reports_dir = data_dir / "user1" / "reports"
+        reports_dir.mkdir(parents=True)
+        (reports_dir / "2025-06-02_report.md").write_text("# June 2")
+        (reports_dir / "2025-06-01_report.md").write_text("# June 1")
+
+        lines = list(
+            ndjson_lines(export_records(kb_service, "user1", "leads", None, data_dir))
+        )
+        leads = [json.loads(line) for line in lines]
+        assert [lead["email"] for lead in leads] == ["a@example.com", "b@example.com"]
+        assert all(line.endswith(b"\n") for line in lines)
+
+        newer = export_records(
+            kb_service, "user1", "leads", leads[0]["_cursor"], data_dir
+        )
+        assert [lead["email"] for _, lead in newer] == ["b@example.com"]
+
+        reports = list(export_records(kb_service, "user1", "reports", None, data_dir))
+        assert [cursor for cursor, _ in reports] == [
+            "2025-06-01_report.md",
+            "2025-06-02_report.md",
+        ]
+        assert reports[0][1]["created_date"] == "2025-06-01"
+        newer = export_records(kb_service, "user1", "reports", reports[0][0], data_dir)
+        assert [report["content"] for _, report in newer] == ["# June 2"]
+
+        with pytest.raises(ValueError):
+            export_records(kb_service, "user1", "leads", "not-a-cursor", data_dir)
+        with pytest.raises(ValueError):
+            export_records(kb_service, "user1", "sessions", None, data_dir)
+
+
+def test_export_leads_streams_the_log(monkeypatch):
+    """Test that a lead export reads the log without indexing it and resumes."""
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        kb_service = KnowledgeBaseService(base_storage_path=temp_dir)
+        data_dir = Path(temp_dir)
+        store = LeadStore(base_storage_path=temp_dir)
+        for email in ["a@example.com", "b@example.com"]:
+            store.append("user1", {"email": email, "timestamp": "2025-06-01"})
+        monkeypatch.setattr(
+            LeadStore, "_index", lambda *args: pytest.fail("lead log indexed")
+        )
+
+        leads = list(export_records(kb_service, "user1", "leads", None, data_dir))
+        assert [lead["email"] for _, lead in leads] == [
+            "a@example.com",
+            "b@example.com",
+        ]
+
+        log = data_dir / "user1" / "leads" / "leads.jsonl"
+        with open(log, "a") as f:
+            f.write(json.dumps({"email": "c@example.com"}) + "\n")
+            f.write('{"email": "torn@exam')
+        newer = export_records(kb_service, "user1", "leads", leads[-1][0], data_dir)
+        assert [lead["email"] for _, lead in newer] == ["c@example.com"]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
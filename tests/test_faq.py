@@ -0,0 +1,212 @@
+#   Copyright 2025 Akshat Deepak Joshi
+
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+
+#       http://www.apache.org/licenses/LICENSE-2.0
+
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+import tempfile
+from types import SimpleNamespace
+
+import pytest
+from google.adk.models import LlmRequest
+from google.genai import types
+
+from customer_engagement import agent as engagement_agent
+from smallbizpal.shared.services.append_only_knowledge_base import (
+    AppendOnlyKnowledgeBaseService,
+)
+from smallbizpal.shared.services.faq import FAQMatcher, build_faq, is_faq_question
+from smallbizpal.shared.services.knowledge_base import KnowledgeBaseService
+from smallbizpal.shared.services.sqlite_knowledge_base import (
+    SQLiteKnowledgeBaseService,
+)
+
+PROFILE = {
+    "business_name": "Blue Door Coffee",
+    "opening_hours": {"weekdays": "7am-6pm", "weekend": "9am-3pm"},
+    "address": "12 Harbour Road",
+    "menu": ["espresso", "oat milk latte"],
+    "pricing": "",
+}
+
+# Messages loosely resembling an FAQ question that the model must handle
+NOT_FAQ_MESSAGES = [
+    "what is your email address? my email is a@b.com, please set up a meeting",
+    "Are you open on Christmas?",
+    "how much does it cost to cater 200 people",
+    "What are your hours? Can I book a table for 6?",
+    "what is your phone number, mine is +1 555 123 4567",
+]
+
+
+def test_build_faq_from_profile_fields():
+    """Test that topics are answered from matching, non-empty fields."""
+
+    entries = {entry["topic"]: entry for entry in build_faq(PROFILE)}
+
+    assert set(entries) == {"hours", "location", "services"}
+    assert entries["hours"]["fields"] == ["opening_hours"]
+    assert entries["hours"]["answer"] == (
+        "Here are our opening hours:\n"
+        "- Opening hours: weekdays: 7am-6pm, weekend: 9am-3pm"
+    )
+    assert entries["services"]["answer"].endswith("- Menu: espresso, oat milk latte")
+
+
+def test_build_faq_serves_only_customer_facing_fields():
+    """Test that internal fields sharing a topic's words are never served."""
+
+    entries = build_faq(
+        {
+            "posting_schedule": "Instagram on Mondays",
+            "operating_cost": "$12k per month",
+            "contact_notes": "Supplier owes us a refund",
+            "location_scouting": "Considering a second shop",
+        }
+    )
+
+    assert entries == []
+
+
+def test_matcher_only_answers_confident_matches():
+    """Test that paraphrased FAQ questions match and other messages do not."""
+
+    entries = build_faq(PROFILE)
+    matcher = FAQMatcher()
+
+    assert matcher.match("What are your hours?", entries)[0]["topic"] == "hours"
+    assert matcher.match("what's your address", entries)[0]["topic"] == "location"
+    assert matcher.answer("I'd like to book a meeting next week", entries) is None
+    assert matcher.answer("hi!", entries) is None
+    assert matcher.answer("What are your hours?", []) is None
+
+
+def test_matcher_rejects_loose_and_lead_capturing_messages():
+    """Test that loose matches and messages needing lead capture do not match."""
+
+    entries = build_faq(
+        {
+            **PROFILE,
+            "pricing": "Coffee from $3",
+            "email": "hello@bluedoor.example",
+            "phone": "555-0100",
+        }
+    )
+    matcher = FAQMatcher()
+
+    for message in NOT_FAQ_MESSAGES:
+        assert matcher.match(message, entries) is None, message
+    assert matcher.match("what r ur hours", entries)[0]["topic"] == "hours"
+    assert matcher.match("What is your email address?", entries)[0]["topic"] == (
+        "contact"
+    )
+
+
+def test_is_faq_question():
+    """Test that only short, single questions without lead details qualify."""
+
+    assert is_faq_question("When are you open?")
+    assert not is_faq_question("Hi. When are you open? And where are you?")
+    assert not is_faq_question("Can I schedule an appointment?")
+    assert not is_faq_question("reach me at jo@example.com")
+    assert not is_faq_question("call me on 555 123 4567")
+    assert not is_faq_question(
+        "what are your opening hours because we are planning a large team outing"
+    )
+    assert not is_faq_question("?!")
+
+
+@pytest.mark.parametrize(
+    "service_class",
+    [KnowledgeBaseService, AppendOnlyKnowledgeBaseService, SQLiteKnowledgeBaseService],
+)
+def test_faq_materialized_on_profile_update(service_class):
+    """Test that every profile update recomputes the stored FAQ entries."""
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        kb_service = service_class(temp_dir)
+        assert kb_service.get_faq("user1") == []
+
+        kb_service.update_business_profile("user1", PROFILE)
+        assert kb_service._read_section("user1", "profile_meta")["faq"] == build_faq(
+            PROFILE
+        )
+
+        kb_service.update_business_profile("user1", {"pricing": "Coffee from $3"})
+        topics = [entry["topic"] for entry in kb_service.get_faq("user1")]
+        assert "pricing" in topics
+
+        kb_service.clear_all_data("user1")
+        assert kb_service.get_faq("user1") == []
+
+
+def test_faq_built_for_profiles_without_stored_entries():
+    """Test that profiles stored before FAQ materialization still get entries."""
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        kb_service = KnowledgeBaseService(temp_dir)
+        kb_service.update_business_profile("user1", PROFILE)
+        meta = kb_service._read_section("user1", "profile_meta")
+        del meta["faq"]
+        kb_service._write_section("user1", "profile_meta", meta)
+
+        assert kb_service.get_faq("user1") == build_faq(PROFILE)
+
+
+def test_fast_path_callback(monkeypatch):
+    """Test that the engagement agent skips the model only for FAQ matches."""
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        kb_service = KnowledgeBaseService(temp_dir)
+        kb_service.update_business_profile("user1", PROFILE)
+        monkeypatch.setattr(engagement_agent, "knowledge_base_service", kb_service)
+        callback_context = SimpleNamespace(
+            _invocation_context=SimpleNamespace(
+                session=SimpleNamespace(user_id="user1")
+            )
+        )
+
+        def request(*parts):
+            return LlmRequest(contents=[types.Content(role="user", parts=list(parts))])
+
+        response = engagement_agent.faq_fast_path_callback(
+            callback_context, request(types.Part(text="When are you open?"))
+        )
+        assert response.content.parts[0].text.startswith("Here are our opening hours")
+
+        assert (
+            engagement_agent.faq_fast_path_callback(
+                callback_context, request(types.Part(text="Can we set up a meeting?"))
+            )
+            is None
+        )
+        for message in NOT_FAQ_MESSAGES:
+            assert (
+                engagement_agent.faq_fast_path_callback(
+                    callback_context, request(types.Part(text=message))
+                )
+                is None
+            ), message
+        tool_result = types.Part(
+            function_response=types.FunctionResponse(
+                name="ask_internal_kb", response={"result": "hours"}
+            )
+        )
+        assert (
+            engagement_agent.faq_fast_path_callback(
+                callback_context, request(tool_result)
+            )
+            is None
+        )
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
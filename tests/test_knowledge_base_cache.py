@@ -0,0 +1,108 @@
+#   Copyright 2025 Akshat Deepak Joshi
+
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+
+#       http://www.apache.org/licenses/LICENSE-2.0
+
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+import json
+import os
+import tempfile
+from pathlib import Path
+
+import pytest
+
+from smallbizpal.shared.services.append_only_knowledge_base import (
+    AppendOnlyKnowledgeBaseService,
+)
+from smallbizpal.shared.services.cache import KnowledgeBaseCache
+from smallbizpal.shared.services.knowledge_base import KnowledgeBaseService
+
+
+def test_repeated_reads_hit_cache():
+    """Test that reading the same user twice parses the file once."""
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        kb_service = KnowledgeBaseService(temp_dir, cache_max_bytes=1024 * 1024)
+        kb_service.update_business_profile("user1", {"business_name": "Cafe"})
+
+        kb_service.get_business_profile("user1")
+        kb_service.get_business_data("user1")
+
+        stats = kb_service.cache_stats()
+        assert stats["misses"] == 1
+        assert stats["hits"] == 1
+
+
+def test_own_writes_invalidate_cache():
+    """Test that reads after a write see the new data."""
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        kb_service = KnowledgeBaseService(temp_dir, cache_max_bytes=1024 * 1024)
+        kb_service.store_marketing_asset("user1", {"content": "first"})
+        assert len(kb_service.get_marketing_assets("user1")) == 1
+
+        kb_service.store_marketing_asset("user1", {"content": "second"})
+        assert len(kb_service.get_marketing_assets("user1")) == 2
+
+
+def test_external_change_invalidates_cache():
+    """Test that a file rewritten by another process is re-read."""
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        kb_service = KnowledgeBaseService(temp_dir, cache_max_bytes=1024 * 1024)
+        kb_service.store_customer_interaction("user1", {"type": "inquiry"})
+        assert len(kb_service.get_customer_interactions("user1")) == 1
+
+        path = Path(temp_dir) / "user1" / "customer_interactions.json"
+        data = json.loads(path.read_text())
+        data.append({"type": "external"})
+        path.write_text(json.dumps(data))
+        stat = path.stat()
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+        assert len(kb_service.get_customer_interactions("user1")) == 2
+
+
+def test_append_only_append_drops_cached_segment():
+    """Test that appends drop the cached segment so the next read reloads it."""
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        kb_service = AppendOnlyKnowledgeBaseService(temp_dir, cache_max_bytes=1 << 20)
+        kb_service.store_customer_interaction("user1", {"type": "inquiry"})
+        kb_service.get_customer_interactions("user1")
+        misses = kb_service.cache_stats()["misses"]
+
+        kb_service.store_customer_interaction("user1", {"type": "meeting_request"})
+        interactions = kb_service.get_customer_interactions("user1")
+
+        assert [i["type"] for i in interactions] == ["inquiry", "meeting_request"]
+        assert kb_service.cache_stats()["misses"] == misses + 1
+
+
+def test_cache_evicts_least_recently_used():
+    """Test that the byte budget is enforced with LRU eviction."""
+
+    cache = KnowledgeBaseCache(max_bytes=100)
+    cache.put("a", (1, 40), "A", 40)
+    cache.put("b", (1, 40), "B", 40)
+    assert cache.get("a", (1, 40)) == "A"
+
+    cache.put("c", (1, 40), "C", 40)
+
+    assert cache.get("b", (1, 40)) is None
+    assert cache.get("a", (1, 40)) == "A"
+    stats = cache.stats()
+    assert stats["evictions"] == 1
+    assert stats["current_bytes"] == 80
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
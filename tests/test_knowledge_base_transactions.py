@@ -0,0 +1,113 @@
+#   Copyright 2025 Akshat Deepak Joshi
+
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+
+#       http://www.apache.org/licenses/LICENSE-2.0
+
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+import tempfile
+
+import pytest
+
+from smallbizpal.shared.services.append_only_knowledge_base import (
+    AppendOnlyKnowledgeBaseService,
+)
+from smallbizpal.shared.services.knowledge_base import KnowledgeBaseService
+from smallbizpal.shared.services.partitioned_knowledge_base import (
+    PartitionedKnowledgeBaseService,
+)
+from smallbizpal.shared.services.sqlite_knowledge_base import (
+    SQLiteKnowledgeBaseService,
+)
+
+BACKENDS = [
+    KnowledgeBaseService,
+    AppendOnlyKnowledgeBaseService,
+    PartitionedKnowledgeBaseService,
+    SQLiteKnowledgeBaseService,
+]
+
+
+def test_transaction_writes_each_section_once(monkeypatch):
+    """Test that a multi-section transaction writes each touched section once."""
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        kb_service = KnowledgeBaseService(base_storage_path=temp_dir)
+        kb_service.update_business_profile("user1", {"name": "Cafe"})
+
+        writes = []
+        original_write = kb_service._write_section
+        monkeypatch.setattr(
+            kb_service,
+            "_write_section",
+            lambda user_id, section, value: writes.append(section)
+            or original_write(user_id, section, value),
+        )
+
+        with kb_service.transaction("user1") as tx:
+            tx.update_business_profile({"city": "Oslo"})
+            tx.store_marketing_asset({"platform": "twitter", "content": "a"})
+            tx.store_marketing_asset({"platform": "linkedin", "content": "b"})
+            tx.store_performance_data("reach", {"value": 10})
+
+        assert sorted(writes) == [
+            "business_profile",
+            "marketing_assets",
+            "performance_data",
+            "profile_meta",
+        ]
+        assert tx.profile is not None
+        assert tx.profile.total_updates == 2
+        assert kb_service.get_business_data("user1") == {"name": "Cafe", "city": "Oslo"}
+        assert len(kb_service.get_marketing_assets("user1")) == 2
+
+
+@pytest.mark.parametrize("service_class", BACKENDS)
+def test_transaction_applies_all_operations(service_class):
+    """Test that every queued mutation is stored on each backend."""
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        kb_service = service_class(base_storage_path=temp_dir)
+
+        with kb_service.transaction("user1") as tx:
+            tx.update_business_profile({"name": "Cafe"})
+            tx.update_business_profile({"city": "Oslo"})
+            tx.store_marketing_asset({"platform": "twitter", "content": "a"})
+            tx.store_customer_interaction({"type": "inquiry"})
+            tx.store_performance_data("reach", {"value": 10})
+            tx.store_performance_data("reach", {"value": 12})
+
+        assert kb_service.get_business_data("user1") == {"name": "Cafe", "city": "Oslo"}
+        assert kb_service.get_business_profile("user1").total_updates == 2
+        assert [a["content"] for a in kb_service.get_marketing_assets("user1")] == ["a"]
+        assert len(kb_service.get_customer_interactions("user1")) == 1
+        assert kb_service.get_performance_data("user1") == {"reach": {"value": 12}}
+        assert kb_service.get_performance_data("user2") == {}
+
+
+@pytest.mark.parametrize("service_class", BACKENDS)
+def test_transaction_discarded_on_error(service_class):
+    """Test that nothing is stored when the transaction block raises."""
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        kb_service = service_class(base_storage_path=temp_dir)
+
+        with pytest.raises(RuntimeError):
+            with kb_service.transaction("user1") as tx:
+                tx.update_business_profile({"name": "Cafe"})
+                tx.store_marketing_asset({"platform": "twitter", "content": "a"})
+                raise RuntimeError("generation failed")
+
+        assert kb_service.get_business_profile("user1") is None
+        assert kb_service.get_marketing_assets("user1") == []
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,160 @@
+#   Copyright 2025 Akshat Deepak Joshi
+
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+
+#       http://www.apache.org/licenses/LICENSE-2.0
+
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+import json
+import tempfile
+from datetime import date
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+from smallbizpal.agents.performance_reporting.tools import metrics_tools
+from smallbizpal.shared.services.knowledge_base import KnowledgeBaseService
+from smallbizpal.shared.services.lead_store import LeadStore
+
+
+def test_leads_appended_and_indexed():
+    """Test that leads are appended as lines and found by day."""
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        store = LeadStore(base_storage_path=temp_dir)
+        assert (
+            store.append(
+                "user1",
+                {"email": "Ann@Example.com", "timestamp": "2025-06-01T09:00:00"},
+            )
+            == 0
+        )
+        assert (
+            store.append(
+                "user1",
+                {"email": "bob@example.com", "timestamp": "2025-06-02T09:00:00"},
+            )
+            == 1
+        )
+        store.append(
+            "user1", {"email": " ann@example.com", "timestamp": "2025-06-03T09:00:00"}
+        )
+
+        log = Path(temp_dir) / "user1" / "leads" / "leads.jsonl"
+        assert len(log.read_text().splitlines()) == 3
+        assert [
+            lead["email"] for lead in store.get_leads_by_day("user1", date(2025, 6, 2))
+        ] == ["bob@example.com"]
+        assert (
+            len(store.get_leads_between("user1", date(2025, 6, 2), date(2025, 6, 3)))
+            == 2
+        )
+        assert store.get_leads("user2") == []
+
+
+def test_lines_appended_elsewhere_are_indexed():
+    """Test that leads appended by another store instance are picked up."""
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        store = LeadStore(base_storage_path=temp_dir)
+        other = LeadStore(base_storage_path=temp_dir)
+        store.append("user1", {"email": "a@example.com", "timestamp": "2025-06-01"})
+        assert len(other.get_leads("user1")) == 1
+
+        log = Path(temp_dir) / "user1" / "leads" / "leads.jsonl"
+        with open(log, "a") as f:
+            f.write('{"email": "torn@exam')
+        assert len(other.get_leads("user1")) == 1
+
+        other.append("user1", {"email": "b@example.com", "timestamp": "2025-06-01"})
+        assert [lead["email"] for lead in store.get_leads("user1")] == [
+            "a@example.com",
+            "b@example.com",
+        ]
+
+        store.clear("user1")
+        assert other.get_leads("user1") == []
+
+
+def test_store_keeps_a_bounded_number_of_indexes():
+    """Test that the least recently read users' indexes are dropped."""
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        store = LeadStore(base_storage_path=temp_dir, max_users=2)
+        for user_id in ["user1", "user2", "user3"]:
+            store.append(user_id, {"email": "a@example.com", "timestamp": "2025-06-01"})
+        assert list(store._indexes) == ["user2", "user3"]
+
+        store.get_leads("user2")
+        store.get_leads("user1")
+        assert list(store._indexes) == ["user2", "user1"]
+        assert [lead["email"] for lead in store.get_leads("user3")] == ["a@example.com"]
+
+
+def test_legacy_leads_file_converted_once():
+    """Test that a leads.json array is converted to the lead log."""
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        leads_dir = Path(temp_dir) / "user1" / "leads"
+        leads_dir.mkdir(parents=True)
+        (leads_dir / "leads.json").write_text(
+            json.dumps([{"email": "a@example.com", "timestamp": "2025-06-01"}])
+        )
+
+        store = LeadStore(base_storage_path=temp_dir)
+        store.append("user1", {"email": "b@example.com", "timestamp": "2025-06-01"})
+
+        assert not (leads_dir / "leads.json").exists()
+        assert (leads_dir / "leads.json.migrated").exists()
+        assert [lead["email"] for lead in store.get_leads("user1")] == [
+            "a@example.com",
+            "b@example.com",
+        ]
+
+
+def test_daily_details_dedupes_leads_by_email(monkeypatch):
+    """Test that stored leads matching a meeting request are listed once."""
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        kb_service = KnowledgeBaseService(base_storage_path=temp_dir)
+        kb_service.store_customer_interaction(
+            "user1",
+            {
+                "type": "meeting_request",
+                "customer_email": "a@example.com",
+                "timestamp": "2025-06-01T10:00:00",
+            },
+        )
+        store = LeadStore(base_storage_path=temp_dir)
+        for email in ["A@example.com", "b@example.com", "b@example.com"]:
+            store.append("user1", {"email": email, "timestamp": "2025-06-01T10:00:00"})
+        monkeypatch.setattr(metrics_tools, "knowledge_base_service", kb_service)
+        monkeypatch.setattr(metrics_tools, "lead_store", store)
+
+        details = metrics_tools.daily_details("user1", date(2025, 6, 1))
+        assert [lead["email"] for lead in details["leads_details"]] == [
+            "a@example.com",
+            "b@example.com",
+        ]
+
+        tool_context = SimpleNamespace(
+            _invocation_context=SimpleNamespace(
+                session=SimpleNamespace(user_id="user1")
+            )
+        )
+        result = metrics_tools.collect_metrics_range(
+            tool_context, "2025-06-01", "2025-06-01"
+        )
+        assert result["series"]["leads_count"] == [2]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
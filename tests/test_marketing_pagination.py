@@ -0,0 +1,162 @@
+#   Copyright 2025 Akshat Deepak Joshi
+
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+
+#       http://www.apache.org/licenses/LICENSE-2.0
+
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+import tempfile
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+
+from smallbizpal.agents.marketing_generator.tools import storage_tools
+from smallbizpal.shared.services.append_only_knowledge_base import (
+    AppendOnlyKnowledgeBaseService,
+)
+from smallbizpal.shared.services.knowledge_base import KnowledgeBaseService
+from smallbizpal.shared.services.partitioned_knowledge_base import (
+    PartitionedKnowledgeBaseService,
+)
+from smallbizpal.shared.services.sqlite_knowledge_base import (
+    SQLiteKnowledgeBaseService,
+)
+from smallbizpal.shared.services.write_behind import WriteBehindBuffer
+
+BACKENDS = [
+    KnowledgeBaseService,
+    AppendOnlyKnowledgeBaseService,
+    PartitionedKnowledgeBaseService,
+    SQLiteKnowledgeBaseService,
+]
+
+# Stored out of creation order, with a tie and a legacy asset_type record
+ASSETS = [
+    {"id": "c", "platform": "twitter", "content_type": "slogan", "day": 3},
+    {"id": "a", "platform": "linkedin", "content_type": "ad_copy", "day": 1},
+    {"id": "e", "platform": "twitter", "asset_type": "slogan", "day": 5},
+    {"id": "b", "platform": "twitter", "content_type": "ad_copy", "day": 2},
+    {"id": "d", "platform": "linkedin", "content_type": "slogan", "day": 3},
+]
+
+
+def store_assets(kb_service):
+    """Store the test assets with a content body and metadata."""
+    for asset in ASSETS:
+        record = {k: v for k, v in asset.items() if k != "day"}
+        record["created_at"] = datetime(2025, 6, asset["day"], 12)
+        record["content"] = f"Content {asset['id']}"
+        record["metadata"] = {"tone": "playful"}
+        kb_service.store_marketing_asset("user1", record)
+
+
+def all_pages(kb_service, **kwargs):
+    """Follow cursors until the last page; return the IDs per page."""
+    pages, cursor = [], None
+    while True:
+        page = kb_service.query_marketing_assets("user1", cursor=cursor, **kwargs)
+        pages.append([asset["id"] for asset in page["items"]])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            return pages
+
+
+@pytest.mark.parametrize("service_class", BACKENDS)
+def test_cursor_pages_follow_created_at(service_class):
+    """Test that pages cover every asset once, ordered by creation time."""
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        kb_service = service_class(temp_dir)
+        store_assets(kb_service)
+
+        assert all_pages(kb_service, limit=2) == [["a", "b"], ["c", "d"], ["e"]]
+        assert all_pages(kb_service, limit=2, descending=True) == [
+            ["e", "d"],
+            ["c", "b"],
+            ["a"],
+        ]
+        assert all_pages(kb_service, limit=5) == [["a", "b", "c", "d", "e"]]
+        assert all_pages(kb_service, limit=2, platform="twitter") == [["b", "c"], ["e"]]
+
+
+@pytest.mark.parametrize("service_class", BACKENDS)
+def test_filters_and_projection(service_class):
+    """Test content type, date range and field projection on a page."""
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        kb_service = service_class(temp_dir)
+        store_assets(kb_service)
+
+        page = kb_service.query_marketing_assets(
+            "user1",
+            content_type="slogan",
+            start=datetime(2025, 6, 3),
+            end=datetime(2025, 6, 5),
+            fields=["id", "platform"],
+        )
+        assert page == {
+            "items": [
+                {"id": "c", "platform": "twitter"},
+                {"id": "d", "platform": "linkedin"},
+            ],
+            "next_cursor": None,
+        }
+        slogans = kb_service.query_marketing_assets("user1", content_type="slogan")
+        assert [asset["id"] for asset in slogans["items"]] == ["c", "d", "e"]
+
+        with pytest.raises(ValueError):
+            kb_service.query_marketing_assets("user1", cursor="not-a-cursor")
+
+
+def test_buffered_assets_are_paginated():
+    """Test that write-behind assets are stored before a page is read."""
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        kb_service = KnowledgeBaseService(
+            temp_dir, write_behind=WriteBehindBuffer(flush_interval=60)
+        )
+        store_assets(kb_service)
+
+        assert all_pages(kb_service, limit=3) == [["a", "b", "c"], ["d", "e"]]
+        assert kb_service.write_behind.size() == 0
+        kb_service.close()
+
+
+def test_list_marketing_assets_uses_pages(monkeypatch):
+    """Test that the marketing tool lists newest first and returns a cursor."""
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        kb_service = KnowledgeBaseService(temp_dir)
+        store_assets(kb_service)
+        monkeypatch.setattr(storage_tools, "knowledge_base_service", kb_service)
+        tool_context = SimpleNamespace(
+            _invocation_context=SimpleNamespace(
+                session=SimpleNamespace(user_id="user1")
+            )
+        )
+
+        first = storage_tools.list_marketing_assets(
+            tool_context, include_metadata=False, limit=3
+        )
+        assert [asset["id"] for asset in first["assets"]] == ["e", "d", "c"]
+        assert first["assets"][0]["content_type"] == "slogan"
+        assert "metadata" not in first["assets"][0]
+
+        second = storage_tools.list_marketing_assets(
+            tool_context, limit=3, cursor=first["next_cursor"]
+        )
+        assert [asset["id"] for asset in second["assets"]] == ["b", "a"]
+        assert second["assets"][0]["metadata"] == {"tone": "playful"}
+        assert second["next_cursor"] is None
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
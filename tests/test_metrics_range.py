@@ -0,0 +1,182 @@
+#   Copyright 2025 Akshat Deepak Joshi
+
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+
+#       http://www.apache.org/licenses/LICENSE-2.0
+
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+import tempfile
+from datetime import date
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from smallbizpal.agents.performance_reporting.tools import metrics_tools
+from smallbizpal.shared.services.knowledge_base import KnowledgeBaseService
+from smallbizpal.shared.services.lead_store import LeadStore
+
+INTERACTIONS = [
+    ("2025-05-31T23:00:00", "inquiry"),
+    ("2025-06-01T10:00:00", "inquiry"),
+    ("2025-06-02T10:00:00", "meeting_request"),
+    ("2025-06-09T10:00:00", "question"),
+    ("2025-06-30T23:59:00", "feedback"),
+    ("2025-07-01T00:00:00", "inquiry"),
+]
+
+
+@pytest.fixture
+def tool_context(monkeypatch):
+    """Point the metrics tools at a temporary knowledge base with sample data."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        kb_service = KnowledgeBaseService(base_storage_path=temp_dir)
+        for timestamp, interaction_type in INTERACTIONS:
+            kb_service.store_customer_interaction(
+                "user1",
+                {
+                    "type": interaction_type,
+                    "timestamp": timestamp,
+                    "topic": "Opening hours?",
+                    "customer_email": "a@example.com",
+                },
+            )
+        kb_service.store_marketing_asset(
+            "user1", {"content": "Post", "created_at": "2025-06-03T08:00:00"}
+        )
+        leads = LeadStore(base_storage_path=temp_dir)
+        leads.append(
+            "user1", {"email": "A@example.com", "timestamp": "2025-06-02T10:00:00"}
+        )
+        leads.append(
+            "user1", {"email": "b@example.com", "timestamp": "2025-06-16T10:00:00"}
+        )
+        monkeypatch.setattr(metrics_tools, "knowledge_base_service", kb_service)
+        monkeypatch.setattr(metrics_tools, "lead_store", leads)
+        yield SimpleNamespace(
+            _invocation_context=SimpleNamespace(
+                session=SimpleNamespace(user_id="user1")
+            )
+        )
+
+
+def test_bucket_indices_by_granularity():
+    """Test that epoch days map to day, Monday-based week and month buckets."""
+
+    days = np.array(
+        [(date(2025, 6, d) - date(1970, 1, 1)).days for d in (1, 2, 8, 9, 30)]
+    )
+    first_week = metrics_tools.bucket_start(date(2025, 6, 1), "week")
+    assert first_week == date(2025, 5, 26)
+    assert metrics_tools.bucket_indices(days, date(2025, 6, 1), "day").tolist() == [
+        0,
+        1,
+        7,
+        8,
+        29,
+    ]
+    assert metrics_tools.bucket_indices(days, first_week, "week").tolist() == [
+        0,
+        1,
+        1,
+        2,
+        5,
+    ]
+    assert (
+        metrics_tools.bucket_indices(days, date(2025, 5, 1), "month").tolist()
+        == [1] * 5
+    )
+
+
+def test_range_buckets_by_week(tool_context):
+    """Test that a range is counted per week in one call."""
+
+    result = metrics_tools.collect_metrics_range(
+        tool_context, "2025-06-01", "2025-06-30", "week"
+    )
+
+    assert result["success"] is True
+    assert result["buckets"] == [
+        "2025-05-26",
+        "2025-06-02",
+        "2025-06-09",
+        "2025-06-16",
+        "2025-06-23",
+        "2025-06-30",
+    ]
+    assert result["series"] == {
+        "interactions_count": [1, 1, 1, 0, 0, 1],
+        "leads_count": [0, 1, 0, 1, 0, 0],
+        "questions_count": [1, 0, 1, 0, 0, 0],
+        "marketing_assets_count": [0, 1, 0, 0, 0, 0],
+    }
+    assert result["totals"]["interactions_count"] == 4
+    assert result["top_questions"] == [{"question": "Opening hours?", "frequency": 2}]
+
+
+def test_range_matches_daily_metrics(tool_context):
+    """Test that daily buckets agree with per-day collect_metrics counts."""
+
+    result = metrics_tools.collect_metrics_range(
+        tool_context, "2025-06-01", "2025-06-03", "day"
+    )
+    for position, day in enumerate(result["buckets"]):
+        daily = metrics_tools.collect_metrics(tool_context, day)
+        assert result["series"]["interactions_count"][position] == (
+            daily["interactions_count"]
+        )
+        assert result["series"]["marketing_assets_count"][position] == (
+            daily["marketing_assets_count"]
+        )
+
+    month = metrics_tools.collect_metrics_range(
+        tool_context, "2025-06-01", "2025-07-31", "month"
+    )
+    assert month["buckets"] == ["2025-06", "2025-07"]
+    assert month["series"]["interactions_count"] == [4, 1]
+
+
+def test_range_reads_each_record_type_once(tool_context, monkeypatch):
+    """Test that a month of daily buckets reads the records only once."""
+
+    kb_service = metrics_tools.knowledge_base_service
+    calls = []
+    for name in ("get_customer_interactions", "get_marketing_assets"):
+        original = getattr(kb_service, name)
+
+        def counted(*args, _original=original, _name=name, **kwargs):
+            calls.append(_name)
+            return _original(*args, **kwargs)
+
+        monkeypatch.setattr(kb_service, name, counted)
+
+    result = metrics_tools.collect_metrics_range(
+        tool_context, "2025-06-01", "2025-06-30", "day"
+    )
+
+    assert len(result["buckets"]) == 30
+    assert sorted(calls) == ["get_customer_interactions", "get_marketing_assets"]
+
+
+def test_range_rejects_invalid_arguments(tool_context):
+    """Test that bad dates and granularities are reported as errors."""
+
+    for args in [
+        ("2025-06-30", "2025-06-01", "day"),
+        ("June", "2025-06-30", "day"),
+        ("2025-06-01", "2025-06-30", "year"),
+    ]:
+        result = metrics_tools.collect_metrics_range(tool_context, *args)
+        assert result["success"] is False
+        assert "error" in result
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,163 @@
+#   Copyright 2025 Akshat Deepak Joshi
+
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+
+#       http://www.apache.org/licenses/LICENSE-2.0
+
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+import json
+import tempfile
+from datetime import date
+from pathlib import Path
+
+import pytest
+
+from smallbizpal.agents.performance_reporting.batch import (
+    checkpoint_path,
+    load_checkpoint,
+    run_batch,
+    tenant_ids,
+)
+from smallbizpal.agents.performance_reporting.report_template import (
+    NO_ACTIVITY_MESSAGE,
+    render_report,
+)
+from smallbizpal.shared.services.append_only_knowledge_base import (
+    AppendOnlyKnowledgeBaseService,
+)
+from smallbizpal.shared.services.knowledge_base import KnowledgeBaseService
+from smallbizpal.shared.services.partitioned_knowledge_base import (
+    PartitionedKnowledgeBaseService,
+)
+from smallbizpal.shared.services.report_store import ReportStore
+from smallbizpal.shared.services.sqlite_knowledge_base import (
+    SQLiteKnowledgeBaseService,
+)
+
+DAY = date(2025, 6, 1)
+
+
+def test_render_report_shows_only_sections_with_data():
+    """Test that the template leaves out empty sections."""
+
+    report = render_report(
+        {
+            "date": "2025-06-01",
+            "leads_count": 1,
+            "interactions_count": 3,
+            "marketing_assets_count": 0,
+            "top_questions": [{"question": "Hours?", "frequency": 2}],
+            "leads_details": [{"name": "Ann", "email": "a@example.com"}],
+            "marketing_assets": [],
+        }
+    )
+
+    assert report.startswith("# Daily Performance Report: 2025-06-01")
+    assert "- **1 new lead**" in report
+    assert "- **3 customer interactions**" in report
+    assert "1. Hours? (2 times)" in report
+    assert "- **Ann** (a@example.com)" in report
+    assert "marketing asset" not in report.lower()
+
+    empty = render_report({"date": "2025-06-02"})
+    assert NO_ACTIVITY_MESSAGE in empty
+    assert "## Summary" not in empty
+
+
+def test_batch_reports_every_tenant_and_resumes():
+    """Test that each tenant gets a report and done tenants are skipped."""
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        data_dir = Path(temp_dir)
+        kb_service = KnowledgeBaseService(base_storage_path=temp_dir)
+        for user_id in ["alice", "bob", "carol"]:
+            kb_service.store_customer_interaction(
+                user_id,
+                {
+                    "type": "question",
+                    "question": "What are your hours?",
+                    "timestamp": "2025-06-01T10:00:00",
+                },
+            )
+        (data_dir / ".hidden").mkdir()
+        (data_dir / "scratch").mkdir()
+        assert tenant_ids(data_dir) == ["alice", "bob", "carol"]
+
+        # bob finished in an earlier run, interrupted while recording carol
+        checkpoint = checkpoint_path(data_dir, DAY)
+        checkpoint.write_text(
+            json.dumps({"tenant": "bob", "status": "done"}) + '\n{"tenant": "ca'
+        )
+        finished = []
+        summary = run_batch(
+            data_dir,
+            DAY,
+            workers=2,
+            progress=lambda user_id, result: finished.append(user_id),
+        )
+
+        assert sorted(finished) == ["alice", "carol"]
+        assert summary["tenants"] == 3
+        assert summary["skipped"] == 1
+        assert summary["generated"] == 2
+        assert summary["failed"] == 0
+        assert summary["bytes_written"] > 0
+
+        reports = ReportStore(base_storage_path=temp_dir)
+        items = reports.list_reports("alice")["items"]
+        assert [item["filename"] for item in items] == ["2025-06-01_report.md"]
+        content = reports.get_report_path("alice", "2025-06-01_report.md").read_text()
+        assert "What are your hours? (1 time)" in content
+        assert reports.list_reports("bob")["items"] == []
+
+        assert len(checkpoint.read_text().splitlines()) == 4
+        recorded = load_checkpoint(checkpoint)
+        assert {user: r["status"] for user, r in recorded.items()} == {
+            "alice": "done",
+            "bob": "done",
+            "carol": "done",
+        }
+        rerun = run_batch(data_dir, DAY, workers=1)
+        assert rerun["generated"] == 0 and rerun["skipped"] == 3
+
+
+def test_batch_rejects_unknown_renderer():
+    """Test that an unknown renderer fails before any tenant is processed."""
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        with pytest.raises(ValueError):
+            run_batch(Path(temp_dir), DAY, renderer="fancy")
+
+
+@pytest.mark.parametrize(
+    "service_class",
+    [
+        KnowledgeBaseService,
+        AppendOnlyKnowledgeBaseService,
+        PartitionedKnowledgeBaseService,
+        SQLiteKnowledgeBaseService,
+    ],
+)
+def test_stored_user_ids_skip_directories_without_data(service_class):
+    """Test that only users with stored knowledge base data are listed."""
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        kb_service = service_class(base_storage_path=temp_dir)
+        kb_service.store_marketing_asset("alice", {"content": "Post"})
+        kb_service.update_business_profile("bob", {"business_name": "Bob's"})
+        (Path(temp_dir) / "reports-only" / "reports").mkdir(parents=True)
+        (Path(temp_dir) / ".nightly").mkdir()
+
+        assert kb_service.stored_user_ids() == ["alice", "bob"]
+        kb_service.close()
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,181 @@
+#   Copyright 2025 Akshat Deepak Joshi
+
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+
+#       http://www.apache.org/licenses/LICENSE-2.0
+
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+import json
+import tempfile
+from datetime import date, datetime
+from pathlib import Path
+
+import pytest
+
+from smallbizpal.shared.services.append_only_knowledge_base import (
+    AppendOnlyKnowledgeBaseService,
+)
+from smallbizpal.shared.services.export import export_records
+from smallbizpal.shared.services.partitioned_knowledge_base import (
+    PartitionedKnowledgeBaseService,
+)
+from smallbizpal.shared.utils.timestamps import day_bounds
+
+
+def test_records_partitioned_by_utc_day():
+    """Test that records land in one segment per UTC day plus a manifest."""
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        kb_service = PartitionedKnowledgeBaseService(base_storage_path=temp_dir)
+        for timestamp in [
+            "2025-06-01T09:00:00",
+            "2025-06-01T23:30:00-02:00",
+            "2025-06-02T10:00:00Z",
+            "",
+        ]:
+            kb_service.store_customer_interaction(
+                "user1", {"type": "inquiry", "timestamp": timestamp}
+            )
+
+        partition_dir = Path(temp_dir) / "user1" / "segments" / "customer_interactions"
+        manifest = json.loads((partition_dir / "manifest.json").read_text())
+        assert manifest["next_position"] == 4
+        assert {
+            name: partition["runs"]
+            for name, partition in manifest["partitions"].items()
+        } == {"2025-06-01": [[0, 1]], "2025-06-02": [[1, 2]], "undated": [[3, 1]]}
+        assert len((partition_dir / "2025-06-02.jsonl").read_text().splitlines()) == 2
+        assert len(kb_service.get_customer_interactions("user1")) == 4
+
+
+def test_day_query_reads_only_that_partition(monkeypatch):
+    """Test that a per-day query opens only the partition of that day."""
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        kb_service = PartitionedKnowledgeBaseService(
+            base_storage_path=temp_dir, cache_max_bytes=0
+        )
+        for day in range(1, 6):
+            kb_service.store_marketing_asset(
+                "user1", {"content": f"day {day}", "created_at": f"2025-06-0{day}"}
+            )
+
+        opened = []
+        original = kb_service._iter_segment
+        monkeypatch.setattr(
+            kb_service,
+            "_iter_segment",
+            lambda path: opened.append(path.name) or original(path),
+        )
+        start, end = day_bounds(date(2025, 6, 3))
+        assets = kb_service.get_marketing_assets("user1", start=start, end=end)
+
+        assert [a["content"] for a in assets] == ["day 3"]
+        assert opened == ["2025-06-03.jsonl"]
+
+        opened.clear()
+        assets = kb_service.get_marketing_assets(
+            "user1", start=datetime(2025, 6, 4, 12), end=datetime(2025, 6, 10)
+        )
+        assert [a["content"] for a in assets] == ["day 5"]
+        assert opened == ["2025-06-04.jsonl", "2025-06-05.jsonl"]
+
+
+def test_append_only_segments_split_into_partitions():
+    """Test that unpartitioned segments are split into partitions once."""
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        legacy_service = AppendOnlyKnowledgeBaseService(base_storage_path=temp_dir)
+        legacy_service.store_customer_interaction(
+            "user1", {"type": "inquiry", "timestamp": "2025-06-01T10:00:00"}
+        )
+        legacy_service.store_customer_interaction(
+            "user1", {"type": "question", "timestamp": "2025-06-02T10:00:00"}
+        )
+
+        kb_service = PartitionedKnowledgeBaseService(base_storage_path=temp_dir)
+        kb_service.store_customer_interaction(
+            "user1", {"type": "meeting_request", "timestamp": "2025-06-02T11:00:00"}
+        )
+
+        segments_dir = Path(temp_dir) / "user1" / "segments"
+        assert not (segments_dir / "customer_interactions.jsonl").exists()
+        assert (segments_dir / "customer_interactions.jsonl.migrated").exists()
+        start, end = day_bounds(date(2025, 6, 2))
+        assert [
+            i["type"]
+            for i in kb_service.get_customer_interactions("user1", start=start, end=end)
+        ] == ["question", "meeting_request"]
+
+
+def test_cursor_sees_undated_and_backdated_appends():
+    """Test that records appended after a cursor are exported whatever their day."""
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        kb_service = PartitionedKnowledgeBaseService(base_storage_path=temp_dir)
+        for day in range(1, 4):
+            kb_service.store_customer_interaction(
+                "user1", {"type": "inquiry", "timestamp": f"2025-06-0{day}T10:00:00"}
+            )
+        last = list(export_records(kb_service, "user1", "interactions"))[-1][0]
+
+        kb_service.store_customer_interaction(
+            "user1", {"type": "question", "timestamp": ""}
+        )
+        kb_service.store_customer_interaction(
+            "user1", {"type": "meeting_request", "timestamp": "2025-05-01T10:00:00"}
+        )
+
+        exported = list(export_records(kb_service, "user1", "interactions", since=last))
+        assert [record["type"] for _, record in exported] == [
+            "question",
+            "meeting_request",
+        ]
+        assert [i["type"] for i in kb_service.get_customer_interactions("user1")] == [
+            "inquiry",
+            "inquiry",
+            "inquiry",
+            "question",
+            "meeting_request",
+        ]
+
+
+def test_unrecorded_append_gets_positions_on_next_append():
+    """Test that lines of an append that missed the manifest are not misnumbered."""
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        kb_service = PartitionedKnowledgeBaseService(base_storage_path=temp_dir)
+        kb_service.store_marketing_asset(
+            "user1", {"content": "first", "created_at": "2025-06-01"}
+        )
+        partition = (
+            Path(temp_dir)
+            / "user1"
+            / "segments"
+            / "marketing_assets"
+            / "2025-06-01.jsonl"
+        )
+        with open(partition, "a") as f:
+            f.write(
+                json.dumps({"content": "orphan", "created_at": "2025-06-01"}) + "\n"
+            )
+
+        kb_service.store_marketing_asset(
+            "user1", {"content": "second", "created_at": "2025-06-01"}
+        )
+
+        assert [
+            (position, record["content"])
+            for position, record in kb_service.iter_records("user1", "marketing_assets")
+        ] == [(0, "first"), (1, "orphan"), (2, "second")]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,109 @@
+#   Copyright 2025 Akshat Deepak Joshi
+
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+
+#       http://www.apache.org/licenses/LICENSE-2.0
+
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+import json
+import tempfile
+from pathlib import Path
+
+import pytest
+
+from smallbizpal.shared.models.business_profile import BusinessProfile
+from smallbizpal.shared.services.append_only_knowledge_base import (
+    AppendOnlyKnowledgeBaseService,
+)
+from smallbizpal.shared.services.knowledge_base import KnowledgeBaseService
+from smallbizpal.shared.services.partitioned_knowledge_base import (
+    PartitionedKnowledgeBaseService,
+)
+from smallbizpal.shared.services.sqlite_knowledge_base import (
+    SQLiteKnowledgeBaseService,
+)
+
+BACKENDS = [
+    KnowledgeBaseService,
+    AppendOnlyKnowledgeBaseService,
+    PartitionedKnowledgeBaseService,
+    SQLiteKnowledgeBaseService,
+]
+
+
+@pytest.mark.parametrize("service_class", BACKENDS)
+def test_summary_is_read_without_validating_profile(service_class, monkeypatch):
+    """Test that the stored summary matches the profile and skips validation."""
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        kb_service = service_class(base_storage_path=temp_dir)
+        kb_service.update_business_profile("user1", {"name": "Cafe"})
+        kb_service.update_business_profile("user1", {"city": "Oslo"})
+        expected = kb_service.get_business_profile("user1").get_summary()
+
+        def fail(*args, **kwargs):
+            raise AssertionError("profile was validated")
+
+        monkeypatch.setattr(BusinessProfile, "model_validate", fail)
+        summary = kb_service.get_profile_summary("user1")
+
+        assert summary == {**expected, "profile_exists": True, "version": 2}
+        assert summary["sample_fields"] == ["name", "city"]
+
+
+@pytest.mark.parametrize("service_class", BACKENDS)
+def test_profile_version_increases_monotonically(service_class):
+    """Test that profile updates and resets bump the version, other writes don't."""
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        kb_service = service_class(base_storage_path=temp_dir)
+        assert kb_service.get_profile_version("user1") == 0
+
+        kb_service.update_business_profile("user1", {"name": "Cafe"})
+        kb_service.store_marketing_asset("user1", {"content": "post"})
+        assert kb_service.get_profile_version("user1") == 1
+
+        with kb_service.transaction("user1") as tx:
+            tx.update_business_profile({"city": "Oslo"})
+            tx.update_business_profile({"hours": "9-5"})
+        assert kb_service.get_profile_version("user1") == 2
+
+        kb_service.clear_all_data("user1")
+        assert kb_service.get_profile_version("user1") == 3
+        assert kb_service.get_profile_summary("user1")["profile_exists"] is False
+
+        kb_service.update_business_profile("user1", {"name": "Bakery"})
+        assert kb_service.get_profile_version("user1") == 4
+
+
+def test_summary_of_profile_without_metadata():
+    """Test that profiles stored before metadata existed are still summarized."""
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        user_dir = Path(temp_dir) / "user1"
+        user_dir.mkdir()
+        profile = BusinessProfile(data={"name": "Cafe"}, total_updates=1)
+        (user_dir / "business_profile.json").write_text(profile.model_dump_json())
+
+        kb_service = KnowledgeBaseService(temp_dir)
+        summary = kb_service.get_profile_summary("user1")
+
+        assert summary["profile_exists"] is True
+        assert summary["total_fields"] == 1
+        assert summary["version"] == 0
+
+        kb_service.update_business_profile("user1", {"city": "Oslo"})
+        meta = json.loads((user_dir / "profile_meta.json").read_text())
+        assert meta["version"] == 1
+        assert meta["summary"]["total_fields"] == 2
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
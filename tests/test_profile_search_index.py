@@ -0,0 +1,98 @@
+#   Copyright 2025 Akshat Deepak Joshi
+
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+
+#       http://www.apache.org/licenses/LICENSE-2.0
+
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+import tempfile
+
+import pytest
+
+from smallbizpal.shared.models.business_profile import BusinessProfile
+from smallbizpal.shared.services.knowledge_base import KnowledgeBaseService
+
+
+def make_profile():
+    """Create a profile with flat and nested fields."""
+    return BusinessProfile(
+        data={
+            "business_name": "Blue Door Coffee",
+            "opening_hours": {"weekdays": "7-18", "weekend": "9-15"},
+            "products": ["espresso", "pastries", "cold brew"],
+            "target_audience": "students and remote workers",
+        }
+    )
+
+
+def test_search_matches_keys_and_nested_values():
+    """Test that tokens in keys, nested keys and nested values are found."""
+
+    profile = make_profile()
+
+    assert list(profile.search_data(["hours"])) == ["opening_hours"]
+    assert list(profile.search_data(["weekend"])) == ["opening_hours"]
+    assert list(profile.search_data(["brew"])) == ["products"]
+    assert list(profile.search_data(["coff"])) == ["business_name"]
+    assert profile.search_data(["pizza"]) == {}
+    assert profile.search_data([]) == {}
+
+
+def test_search_ranks_and_intersects_terms():
+    """Test that fields matching more terms rank first and match_all intersects."""
+
+    profile = make_profile()
+
+    results = profile.search_data(["students", "coffee", "business"])
+    assert list(results) == ["business_name", "target_audience"]
+
+    assert list(profile.search_data(["remote workers"])) == ["target_audience"]
+    assert profile.search_data(["remote pastries"]) == {}
+    assert profile.search_data(["espresso", "students"], match_all=True) == {}
+    assert list(profile.search_data(["cold", "espresso"], match_all=True)) == [
+        "products"
+    ]
+
+
+def test_update_data_maintains_built_index():
+    """Test that updates re-index changed fields instead of rebuilding."""
+
+    profile = make_profile()
+    index = profile.get_search_index()
+
+    profile.update_data({"products": ["tea"], "city": "Oslo"})
+
+    assert profile.get_search_index() is index
+    assert profile.search_data(["espresso"]) == {}
+    assert list(profile.search_data(["tea"])) == ["products"]
+    assert list(profile.search_data(["oslo"])) == ["city"]
+
+
+def test_service_reuses_index_until_profile_changes():
+    """Test that the service keeps a user's index while the version is unchanged."""
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        kb_service = KnowledgeBaseService(temp_dir)
+        kb_service.update_business_profile("user1", make_profile().data)
+
+        assert list(kb_service.search_business_data("user1", ["espresso"])) == [
+            "products"
+        ]
+        cached = kb_service._search_profiles["user1"][1]
+        kb_service.search_business_data("user1", ["students"])
+        assert kb_service._search_profiles["user1"][1] is cached
+
+        kb_service.update_business_profile("user1", {"products": ["tea"]})
+        assert kb_service.search_business_data("user1", ["espresso"]) == {}
+        assert list(kb_service.search_business_data("user1", ["tea"])) == ["products"]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,207 @@
+#   Copyright 2025 Akshat Deepak Joshi
+
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+
+#       http://www.apache.org/licenses/LICENSE-2.0
+
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+import json
+import tempfile
+from datetime import date
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+from smallbizpal.agents.performance_reporting.tools import metrics_tools
+from smallbizpal.shared.services.knowledge_base import KnowledgeBaseService
+from smallbizpal.shared.services.question_clusters import (
+    QuestionClusters,
+    QuestionClusterStore,
+    normalize_question,
+)
+from smallbizpal.shared.services.rollups import rollup_metrics
+from smallbizpal.shared.services.write_behind import WriteBehindBuffer
+
+QUESTIONS = [
+    "What are your hours?",
+    "what r ur hours",
+    "Do you have parking?",
+    "What are your HOURS??",
+    "Is there parking nearby?",
+    "How much is a haircut?",
+]
+
+
+def test_normalize_question():
+    """Test that case, punctuation, shorthand and stopwords are normalized away."""
+
+    assert normalize_question("What r ur hours?") == "hours"
+    assert normalize_question("what are your HOURS") == "hours"
+    assert normalize_question("What's the price?") == "price"
+    assert normalize_question("?!") == ""
+
+
+def test_near_duplicates_share_a_cluster():
+    """Test that near-duplicate questions are assigned to the same cluster."""
+
+    clusters = QuestionClusters()
+    labels = [clusters.assign(question) for question in QUESTIONS]
+
+    assert labels == [
+        "What are your hours?",
+        "What are your hours?",
+        "Do you have parking?",
+        "What are your hours?",
+        "Do you have parking?",
+        "How much is a haircut?",
+    ]
+    assert clusters.assign("   ") is None
+    assert clusters.top(2) == [
+        {"question": "What are your hours?", "frequency": 3},
+        {"question": "Do you have parking?", "frequency": 2},
+    ]
+
+
+def test_clusters_persist_across_instances():
+    """Test that clusters written by one store are used by another."""
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        store = QuestionClusterStore(base_storage_path=temp_dir)
+        first = {"type": "question", "question": "What are your hours?"}
+        store.assign("user1", [first])
+
+        other = QuestionClusterStore(base_storage_path=temp_dir)
+        second = {"type": "inquiry", "topic": "what r ur hours"}
+        meeting = {"type": "meeting_request", "topic": "Hours"}
+        other.assign("user1", [second, meeting])
+
+        assert second["question_cluster"] == "What are your hours?"
+        assert "question_cluster" not in meeting
+        assert store.top_questions("user1") == [
+            {"question": "What are your hours?", "frequency": 2}
+        ]
+        store.clear("user1")
+        assert store.top_questions("user1") == []
+
+
+def test_cluster_cache_evicts_least_recently_used_user():
+    """Test that only max_users users' clusters are kept in memory."""
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        store = QuestionClusterStore(base_storage_path=temp_dir, max_users=2)
+        for user_id in ("user1", "user2", "user3"):
+            store.assign(user_id, [{"type": "question", "question": "Hours?"}])
+        assert list(store._clusters) == ["user2", "user3"]
+
+        store.top_questions("user2")
+        store.assign("user1", [{"type": "question", "question": "Hours?"}])
+        assert list(store._clusters) == ["user2", "user1"]
+        assert store.top_questions("user1") == [{"question": "Hours?", "frequency": 2}]
+
+
+@pytest.mark.parametrize("write_behind", [False, True])
+def test_top_questions_counted_per_cluster(write_behind, monkeypatch):
+    """Test that stored interactions are labelled and rolled up by cluster."""
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        kb_service = KnowledgeBaseService(
+            temp_dir,
+            write_behind=WriteBehindBuffer(flush_interval=60) if write_behind else None,
+        )
+        for question in QUESTIONS:
+            kb_service.store_customer_interaction(
+                "user1",
+                {
+                    "type": "question",
+                    "question": question,
+                    "timestamp": "2025-06-01T10:00:00",
+                },
+            )
+
+        metrics = rollup_metrics(kb_service.get_daily_rollup("user1", date(2025, 6, 1)))
+        assert metrics["top_questions"][:2] == [
+            {"question": "What are your hours?", "frequency": 3},
+            {"question": "Do you have parking?", "frequency": 2},
+        ]
+
+        monkeypatch.setattr(metrics_tools, "knowledge_base_service", kb_service)
+        tool_context = SimpleNamespace(
+            _invocation_context=SimpleNamespace(
+                session=SimpleNamespace(user_id="user1")
+            )
+        )
+        result = metrics_tools.collect_metrics_range(
+            tool_context, "2025-06-01", "2025-06-01"
+        )
+        assert result["top_questions"][0] == {
+            "question": "What are your hours?",
+            "frequency": 3,
+        }
+        stored = kb_service.get_customer_interactions("user1")
+        assert stored[1]["question"] == "what r ur hours"
+        assert stored[1]["question_cluster"] == "What are your hours?"
+        kb_service.close()
+
+
+def test_assignments_appended_to_log():
+    """Test that each assignment appends a line instead of rewriting clusters."""
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        store = QuestionClusterStore(base_storage_path=temp_dir)
+        for question in QUESTIONS:
+            store.assign("user1", [{"type": "question", "question": question}])
+
+        log = Path(temp_dir) / "user1" / "question_clusters.jsonl"
+        entries = [json.loads(line) for line in log.read_text().splitlines()]
+        assert len(entries) == len(QUESTIONS)
+        assert entries[0]["label"] == "What are your hours?"
+        assert entries[1] == {"cluster": 0}
+
+        other = QuestionClusterStore(base_storage_path=temp_dir)
+        assert other.top_questions("user1", 2) == [
+            {"question": "What are your hours?", "frequency": 3},
+            {"question": "Do you have parking?", "frequency": 2},
+        ]
+
+
+def test_failed_or_discarded_writes_not_counted(monkeypatch):
+    """Test that only stored interactions are counted in their cluster."""
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        kb_service = KnowledgeBaseService(temp_dir)
+        interaction = {"type": "question", "question": "What are your hours?"}
+
+        def fail(*args):
+            raise OSError("disk full")
+
+        monkeypatch.setattr(kb_service, "_apply_batch", fail)
+        with pytest.raises(OSError):
+            kb_service.store_customer_interaction("user1", dict(interaction))
+        assert kb_service.question_clusters.top_questions("user1") == []
+
+        monkeypatch.undo()
+        kb_service.store_customer_interaction("user1", dict(interaction))
+        assert kb_service.question_clusters.top_questions("user1") == [
+            {"question": "What are your hours?", "frequency": 1}
+        ]
+
+        buffered = KnowledgeBaseService(
+            temp_dir, write_behind=WriteBehindBuffer(flush_interval=60)
+        )
+        buffered.store_customer_interaction("user2", dict(interaction))
+        buffered.write_behind.discard("user2")
+        buffered.flush()
+        assert buffered.question_clusters.top_questions("user2") == []
+        buffered.close()
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
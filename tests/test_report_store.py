@@ -0,0 +1,139 @@
+#   Copyright 2025 Akshat Deepak Joshi
+
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+
+#       http://www.apache.org/licenses/LICENSE-2.0
+
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+import hashlib
+import inspect
+import tempfile
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+from smallbizpal.agents.performance_reporting.tools import report_storage_tools
+from smallbizpal.config.settings import DATA_DIRECTORY
+from smallbizpal.shared.services import (
+    export_records,
+    knowledge_base_service,
+    lead_store,
+    report_store,
+)
+from smallbizpal.shared.services.report_store import ReportStore
+
+
+def test_save_maintains_index():
+    """Test that saving reports records their metadata in the index."""
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        store = ReportStore(temp_dir)
+        content = "# Weekly summary\n\nReach grew."
+        entry = store.save("user1", "2025-06-01_report.md", content, "2025-06-01T09:00")
+
+        assert entry == {
+            "filename": "2025-06-01_report.md",
+            "date": "2025-06-01",
+            "title": "Weekly summary",
+            "size_bytes": len(content.encode()),
+            "checksum": hashlib.sha256(content.encode()).hexdigest(),
+            "path": "reports/2025-06-01_report.md",
+            "created_at": "2025-06-01T09:00",
+        }
+
+        store.save("user1", "2025-06-01_report.md", "# Replaced", "2025-06-01T10:00")
+        items = store.list_reports("user1")["items"]
+        assert [item["title"] for item in items] == ["Replaced"]
+        assert store.get_report_path("user1", "2025-06-01_report.md").read_text() == (
+            "# Replaced"
+        )
+
+
+def test_list_reports_paginates_without_reading_reports(monkeypatch):
+    """Test that listing pages through the index only."""
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        store = ReportStore(temp_dir)
+        for day in range(1, 6):
+            store.save("user1", f"2025-06-0{day}_report.md", f"# Day {day}", "")
+
+        monkeypatch.setattr(
+            Path, "read_text", lambda *args, **kwargs: pytest.fail("report read")
+        )
+        first = store.list_reports("user1", limit=2)
+        assert [item["date"] for item in first["items"]] == ["2025-06-05", "2025-06-04"]
+        second = store.list_reports("user1", limit=2, cursor=first["next_cursor"])
+        assert [item["date"] for item in second["items"]] == [
+            "2025-06-03",
+            "2025-06-02",
+        ]
+        last = store.list_reports("user1", limit=2, cursor=second["next_cursor"])
+        assert [item["date"] for item in last["items"]] == ["2025-06-01"]
+        assert last["next_cursor"] is None
+
+        oldest = store.list_reports("user1", limit=1, descending=False)
+        assert oldest["items"][0]["date"] == "2025-06-01"
+
+
+def test_index_built_for_existing_reports():
+    """Test that reports written before the index existed are indexed once."""
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        reports_dir = Path(temp_dir) / "user1" / "reports"
+        reports_dir.mkdir(parents=True)
+        (reports_dir / "2025-05-01_report.md").write_text("Plain first line\nmore")
+
+        store = ReportStore(temp_dir)
+        items = store.list_reports("user1")["items"]
+        assert [item["title"] for item in items] == ["Plain first line"]
+        assert (reports_dir / "index.json").exists()
+        assert store.list_reports("user2") == {"items": [], "next_cursor": None}
+
+        assert store.get_report_path("user1", "../../etc/passwd") is None
+        assert store.get_report_path("user1", "2025-05-02_report.md") is None
+
+
+def test_store_report_tool_updates_index(monkeypatch):
+    """Test that the store_report tool writes through the report store."""
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        store = ReportStore(temp_dir)
+        monkeypatch.setattr(report_storage_tools, "report_store", store)
+        tool_context = SimpleNamespace(
+            _invocation_context=SimpleNamespace(
+                session=SimpleNamespace(user_id="user1")
+            )
+        )
+
+        result = report_storage_tools.store_report(
+            "# June report", "2025-06-30", tool_context
+        )
+
+        assert result["success"] is True
+        assert result["filename"] == "2025-06-30_report.md"
+        entry = store.list_reports("user1")["items"][0]
+        assert entry["title"] == "June report"
+        assert entry["size_bytes"] == result["size_bytes"]
+
+
+def test_global_stores_use_configured_data_directory():
+    """Test that reports, leads and exports live under DATA_DIRECTORY."""
+
+    data_dir = Path(DATA_DIRECTORY)
+    assert knowledge_base_service.base_storage_path == data_dir
+    assert report_store.base_storage_path == data_dir
+    assert lead_store.base_storage_path == data_dir
+    data_dir_parameter = inspect.signature(export_records).parameters["data_dir"]
+    assert data_dir_parameter.default == data_dir
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
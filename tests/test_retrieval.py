@@ -0,0 +1,288 @@
+#   Copyright 2025 Akshat Deepak Joshi
+
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+
+#       http://www.apache.org/licenses/LICENSE-2.0
+
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+import tempfile
+
+import pytest
+
+from smallbizpal.shared.services.knowledge_base import KnowledgeBaseService
+from smallbizpal.shared.services.retrieval import (
+    VECTOR_INDEX_FILE_NAME,
+    BM25Index,
+    HashingEncoder,
+    HybridRetriever,
+    KnowledgeRetriever,
+    VectorIndex,
+    VectorRetriever,
+)
+
+PROFILE = {
+    "business_name": "Blue Door Coffee",
+    "opening_hours": {"weekdays": "7am-6pm", "weekend": "9am-3pm"},
+    "menu": ["espresso", "oat milk latte", "almond croissant"],
+    "parking": "Free street parking on Elm Street after 6pm",
+    "wifi": "Free wifi for customers, ask the barista for the password",
+}
+
+
+def test_bm25_prefers_rare_terms_and_supports_removal():
+    """Test BM25 ranking and incremental document removal."""
+
+    index = BM25Index()
+    index.add("a", "free parking on the street")
+    index.add("b", "free wifi for customers")
+    index.add("c", "free coffee refills")
+
+    assert index.search("free wifi", top_k=3)[0][0] == "b"
+
+    index.remove("b")
+    assert [doc for doc, _ in index.search("wifi", top_k=3)] == []
+    assert len(index) == 2
+    assert index.doc_freqs["free"] == 2
+
+
+def test_search_returns_relevant_snippets_only():
+    """Test that a question retrieves matching fields instead of the profile."""
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        kb_service = KnowledgeBaseService(temp_dir)
+        kb_service.update_business_profile("user1", PROFILE)
+        kb_service.store_marketing_asset(
+            "user1",
+            {
+                "platform": "instagram",
+                "content_type": "social_post",
+                "content": "Try our new almond croissant this weekend!",
+            },
+        )
+        retriever = KnowledgeRetriever(kb_service)
+
+        snippets = retriever.search("user1", "Is there parking?", top_k=2)
+        assert snippets[0]["id"] == "profile:parking"
+
+        ids = [s["id"] for s in retriever.search("user1", "almond croissant")]
+        assert set(ids) == {"profile:menu", "asset:0"}
+
+        generic = retriever.search("user1", "tell me about you", top_k=2)
+        assert [s["id"] for s in generic] == [
+            "profile:business_name",
+            "profile:opening_hours",
+        ]
+
+
+def test_search_respects_character_budget():
+    """Test that snippets are cut to the configured character budget."""
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        kb_service = KnowledgeBaseService(temp_dir)
+        kb_service.update_business_profile("user1", PROFILE)
+        retriever = KnowledgeRetriever(kb_service)
+
+        snippets = retriever.search("user1", "free parking wifi", max_chars=60)
+
+        assert sum(len(s["text"]) for s in snippets) <= 60
+        assert snippets[0]["text"].endswith("...")
+
+
+def test_index_follows_profile_and_asset_changes():
+    """Test that only changed fields and new assets are re-indexed."""
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        kb_service = KnowledgeBaseService(temp_dir)
+        kb_service.update_business_profile("user1", PROFILE)
+        retriever = KnowledgeRetriever(kb_service)
+        retriever.search("user1", "parking")
+        user_index = retriever._indexes["user1"]
+
+        added = []
+        original_add = user_index.index.add
+        user_index.index.add = lambda doc_id, text: added.append(doc_id) or (
+            original_add(doc_id, text)
+        )
+        kb_service.update_business_profile("user1", {"parking": "No parking"})
+        kb_service.store_marketing_asset("user1", {"content": "Summer specials"})
+
+        assert retriever.search("user1", "summer")[0]["id"] == "asset:0"
+        assert added == ["profile:parking", "asset:0"]
+        assert retriever.search("user1", "parking")[0]["text"] == "parking: No parking"
+
+        kb_service.clear_all_data("user1")
+        assert retriever.search("user1", "parking") == []
+
+
+def test_index_replaces_assets_after_clear():
+    """Test that assets stored after a clear replace the cleared ones."""
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        kb_service = KnowledgeBaseService(temp_dir)
+        kb_service.store_marketing_asset(
+            "user1", {"content": "secret discount code ALPHA"}
+        )
+        retriever = KnowledgeRetriever(kb_service)
+        assert retriever.search("user1", "discount")[0]["text"].endswith("ALPHA")
+
+        kb_service.clear_all_data("user1")
+        kb_service.store_marketing_asset("user1", {"content": "Fresh bread daily"})
+        kb_service.store_marketing_asset("user1", {"content": "Weekend brunch"})
+
+        assert retriever.search("user1", "discount") == []
+        assert retriever.search("user1", "bread")[0]["text"].endswith("bread daily")
+
+
+def test_search_reads_assets_only_when_they_change():
+    """Test that unchanged assets are not read again and new ones are read once."""
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        kb_service = KnowledgeBaseService(temp_dir)
+        kb_service.update_business_profile("user1", PROFILE)
+        kb_service.store_marketing_asset("user1", {"content": "Summer specials"})
+        retriever = KnowledgeRetriever(kb_service)
+        retriever.search("user1", "summer")
+
+        reads = []
+        iter_records = kb_service.iter_records
+        kb_service.iter_records = lambda user_id, section, since=None: (
+            reads.append(since) or iter_records(user_id, section, since)
+        )
+        retriever.search("user1", "summer")
+        assert reads == []
+
+        kb_service.store_marketing_asset("user1", {"content": "Winter specials"})
+        assert retriever.search("user1", "winter")[0]["id"] == "asset:1"
+        assert reads == [0]
+
+
+class CountingEncoder(HashingEncoder):
+    """Hashing encoder recording every text it encodes."""
+
+    def __init__(self):
+        super().__init__()
+        self.encoded = []
+
+    def encode(self, texts):
+        self.encoded.extend(texts)
+        return super().encode(texts)
+
+
+def test_vector_index_add_replace_remove():
+    """Test that rows stay consistent when documents are replaced and removed."""
+
+    index = VectorIndex()
+    index.add("a", "free street parking")
+    index.add("b", "delivery on saturday and sunday")
+    index.add("c", "cash and credit cards accepted")
+    index.add("a", "parking garage next door")
+
+    assert len(index) == 3
+    assert index.search("where to park", top_k=1)[0][0] == "a"
+
+    index.remove("a")
+    assert sorted(index.doc_ids) == ["b", "c"]
+    assert index.rows == {doc_id: row for row, doc_id in enumerate(index.doc_ids)}
+    assert index.search("do you deliver on weekends", top_k=1)[0][0] == "b"
+    assert index.search("card payment", top_k=1)[0][0] == "c"
+
+
+def test_vector_retriever_matches_paraphrases():
+    """Test that semantic retrieval finds fields sharing no exact word."""
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        kb_service = KnowledgeBaseService(temp_dir)
+        kb_service.update_business_profile(
+            "user1", {**PROFILE, "delivery": "We deliver on Saturday and Sunday"}
+        )
+        lexical = KnowledgeRetriever(kb_service)
+        semantic = VectorRetriever(kb_service)
+
+        assert lexical.search("user1", "deliveries?", top_k=1)[0]["score"] == 0.0
+        assert semantic.search("user1", "deliveries?", top_k=1)[0]["id"] == (
+            "profile:delivery"
+        )
+
+        hybrid = HybridRetriever([lexical, semantic])
+        ids = [s["id"] for s in hybrid.search("user1", "parking deliveries", top_k=2)]
+        assert set(ids) == {"profile:parking", "profile:delivery"}
+        assert hybrid.search("user1", "xyzzy", top_k=1)[0]["id"] == (
+            "profile:business_name"
+        )
+
+
+def test_vector_index_is_persisted_and_updated_incrementally():
+    """Test that a restarted retriever only encodes chunks written since."""
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        kb_service = KnowledgeBaseService(temp_dir)
+        kb_service.update_business_profile("user1", PROFILE)
+        VectorRetriever(kb_service).search("user1", "parking")
+        assert (
+            kb_service.base_storage_path / "user1" / VECTOR_INDEX_FILE_NAME
+        ).exists()
+
+        kb_service.update_business_profile("user1", {"wifi": "No wifi"})
+        kb_service.store_marketing_asset("user1", {"content": "Summer specials"})
+
+        encoder = CountingEncoder()
+        restarted = VectorRetriever(kb_service, encoder=encoder)
+        assert restarted.search("user1", "summer specials")[0]["id"] == "asset:0"
+        assert encoder.encoded == [
+            "wifi: No wifi",
+            "content for any platform: Summer specials",
+            "summer specials",
+        ]
+
+        other_encoder = VectorRetriever(kb_service, encoder=HashingEncoder(dim=64))
+        assert other_encoder.search("user1", "parking")[0]["id"] == "profile:parking"
+
+
+def test_vector_index_drops_cleared_assets_after_restart():
+    """Test that a saved index does not keep assets cleared while it was down."""
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        kb_service = KnowledgeBaseService(temp_dir)
+        kb_service.store_marketing_asset(
+            "user1", {"content": "secret discount code ALPHA"}
+        )
+        VectorRetriever(kb_service).search("user1", "discount")
+
+        kb_service.clear_all_data("user1")
+        kb_service.store_marketing_asset("user1", {"content": "Fresh bread daily"})
+
+        restarted = VectorRetriever(kb_service)
+        snippets = restarted.search("user1", "discount code")
+        assert all("ALPHA" not in snippet["text"] for snippet in snippets)
+        assert restarted.search("user1", "bread")[0]["id"] == "asset:0"
+        assert "ALPHA" not in str(restarted._indexes["user1"].chunks)
+
+
+def test_retriever_keeps_a_bounded_number_of_indexes():
+    """Test that the least recently searched user's index is evicted."""
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        kb_service = KnowledgeBaseService(temp_dir)
+        for user_id in ("user1", "user2", "user3"):
+            kb_service.update_business_profile(user_id, PROFILE)
+        retriever = VectorRetriever(kb_service, max_users=2)
+
+        retriever.search("user1", "parking")
+        retriever.search("user2", "parking")
+        retriever.search("user1", "parking")
+        retriever.search("user3", "parking")
+
+        assert list(retriever._indexes) == ["user1", "user3"]
+        assert set(retriever._locks) == {"user1", "user3"}
+        assert retriever.search("user2", "parking")[0]["id"] == "profile:parking"
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,205 @@
+#   Copyright 2025 Akshat Deepak Joshi
+
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+
+#       http://www.apache.org/licenses/LICENSE-2.0
+
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+import shutil
+import tempfile
+from datetime import date
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+from smallbizpal.agents.performance_reporting.tools import metrics_tools
+from smallbizpal.scripts.rebuild_rollups import stored_rollups
+from smallbizpal.shared.services.append_only_knowledge_base import (
+    AppendOnlyKnowledgeBaseService,
+)
+from smallbizpal.shared.services.knowledge_base import KnowledgeBaseService
+from smallbizpal.shared.services.lead_store import LeadStore
+from smallbizpal.shared.services.rollups import (
+    compute_rollups,
+    rollup_metrics,
+    verify_rollups,
+)
+from smallbizpal.shared.services.sqlite_knowledge_base import (
+    SQLiteKnowledgeBaseService,
+)
+from smallbizpal.shared.services.write_behind import WriteBehindBuffer
+
+DAY = date(2025, 6, 1)
+
+INTERACTIONS = [
+    {"type": "inquiry", "topic": "Hours?", "timestamp": "2025-06-01T09:00:00"},
+    {"type": "question", "question": "Hours?", "timestamp": "2025-06-01T10:00:00"},
+    {"type": "question", "question": "Parking?", "timestamp": "2025-06-01T11:00:00"},
+    {
+        "type": "meeting_request",
+        "customer_email": "a@example.com",
+        "timestamp": "2025-06-01T12:00:00",
+    },
+    {"type": "inquiry", "topic": "Next day", "timestamp": "2025-06-02T09:00:00"},
+]
+
+
+def store_activity(kb_service, user_id="user1"):
+    """Store the sample interactions and one asset for the sample day."""
+    for interaction in INTERACTIONS:
+        kb_service.store_customer_interaction(user_id, dict(interaction))
+    kb_service.store_marketing_asset(
+        user_id, {"content": "Post", "created_at": "2025-06-01T08:00:00"}
+    )
+
+
+@pytest.mark.parametrize(
+    "service_class",
+    [KnowledgeBaseService, AppendOnlyKnowledgeBaseService, SQLiteKnowledgeBaseService],
+)
+def test_rollups_maintained_on_write(service_class):
+    """Test that storing records keeps the day's counters up to date."""
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        kb_service = service_class(base_storage_path=temp_dir)
+        store_activity(kb_service)
+        leads = LeadStore(base_storage_path=temp_dir)
+        leads.append(
+            "user1", {"email": "a@example.com", "timestamp": "2025-06-01T12:00:00"}
+        )
+        leads.append(
+            "user1", {"email": "B@example.com ", "timestamp": "2025-06-01T13:00:00"}
+        )
+
+        metrics = rollup_metrics(kb_service.get_daily_rollup("user1", DAY))
+        assert metrics == {
+            "leads_count": 2,
+            "interactions_count": 4,
+            "top_questions": [
+                {"question": "Hours?", "frequency": 2},
+                {"question": "Parking?", "frequency": 1},
+            ],
+            "marketing_assets_count": 1,
+        }
+        next_day = kb_service.get_daily_rollup("user1", date(2025, 6, 2))
+        assert next_day["interactions_count"] == 1
+
+        kb_service.clear_all_data("user1")
+        assert kb_service.get_daily_rollup("user1", DAY)["interactions_count"] == 0
+        kb_service.close()
+
+
+def test_rollups_include_buffered_writes():
+    """Test that the day's counters include records not yet flushed."""
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        kb_service = KnowledgeBaseService(
+            temp_dir, write_behind=WriteBehindBuffer(flush_interval=60)
+        )
+        store_activity(kb_service)
+        assert kb_service.rollups.get("user1", DAY)["interactions_count"] == 0
+        assert kb_service.get_daily_rollup("user1", DAY)["interactions_count"] == 4
+
+        kb_service.flush()
+        assert kb_service.rollups.get("user1", DAY)["interactions_count"] == 4
+        assert kb_service.get_daily_rollup("user1", DAY)["interactions_count"] == 4
+        kb_service.close()
+
+
+def test_collect_metrics_reads_rollup(monkeypatch):
+    """Test that collect_metrics reports rollup counts and details unless turned off."""
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        kb_service = KnowledgeBaseService(base_storage_path=temp_dir)
+        store_activity(kb_service)
+        monkeypatch.setattr(metrics_tools, "knowledge_base_service", kb_service)
+        tool_context = SimpleNamespace(
+            _invocation_context=SimpleNamespace(
+                session=SimpleNamespace(user_id="user1")
+            )
+        )
+        monkeypatch.setattr(
+            kb_service,
+            "get_customer_interactions",
+            lambda *args, **kwargs: pytest.fail("raw interactions read"),
+        )
+
+        metrics = metrics_tools.collect_metrics(
+            tool_context, "2025-06-01", include_details=False
+        )
+        assert metrics["success"] is True
+        assert metrics["interactions_count"] == 4
+        assert metrics["leads_count"] == 1
+        assert metrics["top_questions"][0] == {"question": "Hours?", "frequency": 2}
+        assert metrics["leads_details"] == []
+
+        monkeypatch.undo()
+        monkeypatch.setattr(metrics_tools, "knowledge_base_service", kb_service)
+        detailed = metrics_tools.collect_metrics(tool_context, "2025-06-01")
+        assert [lead["email"] for lead in detailed["leads_details"]] == [
+            "a@example.com"
+        ]
+        assert [asset["content"] for asset in detailed["marketing_assets"]] == ["Post"]
+
+
+def test_rebuild_verifies_against_raw_data():
+    """Test that drifted rollups are detected and replaced by recomputed ones."""
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        kb_service = KnowledgeBaseService(base_storage_path=temp_dir)
+        store_activity(kb_service)
+        expected = compute_rollups(
+            kb_service.get_customer_interactions("user1"),
+            kb_service.get_marketing_assets("user1"),
+        )
+        assert verify_rollups(stored_rollups(kb_service, "user1"), expected) == []
+
+        kb_service.rollups.replace("user1", {})
+        assert verify_rollups(stored_rollups(kb_service, "user1"), expected) == [
+            "2025-06-01",
+            "2025-06-02",
+        ]
+
+        kb_service.rollups.replace("user1", expected)
+        assert verify_rollups(stored_rollups(kb_service, "user1"), expected) == []
+
+
+@pytest.mark.parametrize(
+    "service_class", [KnowledgeBaseService, AppendOnlyKnowledgeBaseService]
+)
+def test_rollups_built_from_data_stored_before_them(service_class):
+    """Test that users with data predating rollups get them on first read."""
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        kb_service = service_class(base_storage_path=temp_dir)
+        store_activity(kb_service)
+        LeadStore(base_storage_path=temp_dir).append(
+            "user1", {"email": "c@example.com", "timestamp": "2025-06-01T14:00:00"}
+        )
+        # Data stored by a version without rollups
+        shutil.rmtree(Path(temp_dir) / "user1" / "rollups")
+
+        metrics = rollup_metrics(kb_service.get_daily_rollup("user1", DAY))
+        assert metrics["interactions_count"] == 4
+        assert metrics["leads_count"] == 2
+        assert metrics["marketing_assets_count"] == 1
+
+        # Later writes add to the built rollups
+        kb_service.store_marketing_asset(
+            "user1", {"content": "Post 2", "created_at": "2025-06-01T15:00:00"}
+        )
+        metrics = rollup_metrics(kb_service.get_daily_rollup("user1", DAY))
+        assert metrics["marketing_assets_count"] == 2
+        kb_service.close()
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
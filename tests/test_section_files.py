@@ -0,0 +1,82 @@
+#   Copyright 2025 Akshat Deepak Joshi
+
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+
+#       http://www.apache.org/licenses/LICENSE-2.0
+
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+import json
+import tempfile
+from pathlib import Path
+
+import pytest
+
+from smallbizpal.shared.services.knowledge_base import KnowledgeBaseService
+
+
+def test_sections_are_stored_in_separate_files():
+    """Test that each section is written to its own file."""
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        kb_service = KnowledgeBaseService(temp_dir)
+        kb_service.update_business_profile("user1", {"name": "Cafe"})
+        kb_service.store_marketing_asset("user1", {"content": "post"})
+
+        user_dir = Path(temp_dir) / "user1"
+        profile = json.loads((user_dir / "business_profile.json").read_text())
+        assets = json.loads((user_dir / "marketing_assets.json").read_text())
+        assert profile["data"] == {"name": "Cafe"}
+        assert [a["content"] for a in assets] == ["post"]
+        assert not (user_dir / "knowledge_base.json").exists()
+
+
+def test_profile_read_only_parses_profile_file():
+    """Test that reading the profile does not load the tenant's history."""
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        kb_service = KnowledgeBaseService(temp_dir, cache_max_bytes=1 << 20)
+        kb_service.update_business_profile("user1", {"name": "Cafe"})
+        with kb_service.transaction("user1") as tx:
+            for i in range(100):
+                tx.store_customer_interaction({"type": "inquiry", "n": i})
+
+        assert kb_service.get_business_data("user1") == {"name": "Cafe"}
+        assert kb_service.cache_stats()["entries"] == 1
+
+
+def test_legacy_file_is_split_on_first_access():
+    """Test that a single-file knowledge base is migrated into section files."""
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        user_dir = Path(temp_dir) / "user1"
+        user_dir.mkdir()
+        legacy = {
+            "business_profile": {"data": {"name": "Cafe"}, "total_updates": 1},
+            "marketing_assets": [{"content": "old post"}],
+            "customer_interactions": [],
+            "performance_data": {"reach": {"value": 3}},
+        }
+        (user_dir / "knowledge_base.json").write_text(json.dumps(legacy, indent=2))
+
+        kb_service = KnowledgeBaseService(temp_dir)
+        kb_service.store_marketing_asset("user1", {"content": "new post"})
+
+        assert kb_service.get_business_data("user1") == {"name": "Cafe"}
+        assert [a["content"] for a in kb_service.get_marketing_assets("user1")] == [
+            "old post",
+            "new post",
+        ]
+        assert kb_service.get_performance_data("user1") == {"reach": {"value": 3}}
+        assert not (user_dir / "knowledge_base.json").exists()
+        assert (user_dir / "knowledge_base.json.migrated").exists()
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,157 @@
+#   Copyright 2025 Akshat Deepak Joshi
+
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+
+#       http://www.apache.org/licenses/LICENSE-2.0
+
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+import tempfile
+from datetime import UTC, date, datetime
+
+import pytest
+
+from smallbizpal.shared.services.append_only_knowledge_base import (
+    AppendOnlyKnowledgeBaseService,
+)
+from smallbizpal.shared.services.knowledge_base import KnowledgeBaseService
+from smallbizpal.shared.services.sqlite_knowledge_base import (
+    SQLiteKnowledgeBaseService,
+)
+from smallbizpal.shared.utils.timestamps import day_bounds
+
+
+def test_sqlite_profile_round_trip():
+    """Test that profile fields keep their values and order in SQLite."""
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        kb_service = SQLiteKnowledgeBaseService(base_storage_path=temp_dir)
+
+        kb_service.update_business_profile("user1", {"name": "Cafe", "city": "Oslo"})
+        kb_service.update_business_profile("user1", {"hours": {"mon": "9-5"}})
+        kb_service.update_business_profile("user2", {"name": "Bakery"})
+
+        profile = kb_service.get_business_profile("user1")
+        assert profile is not None
+        assert list(profile.get_all_data()) == ["name", "city", "hours"]
+        assert profile.get_all_data()["hours"] == {"mon": "9-5"}
+        assert profile.total_updates == 2
+        assert kb_service.get_business_data("user2") == {"name": "Bakery"}
+        kb_service.close()
+
+
+@pytest.mark.parametrize(
+    "service_class", [KnowledgeBaseService, SQLiteKnowledgeBaseService]
+)
+def test_filtered_queries_match_across_backends(service_class):
+    """Test that platform, type and date filters behave the same on each backend."""
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        kb_service = service_class(base_storage_path=temp_dir)
+
+        kb_service.store_marketing_asset(
+            "user1",
+            {
+                "platform": "twitter",
+                "content_type": "social_post",
+                "content": "a",
+                "created_at": datetime(2025, 6, 1, 10, tzinfo=UTC),
+            },
+        )
+        kb_service.store_marketing_asset(
+            "user1",
+            {
+                "platform": "linkedin",
+                "asset_type": "social_post",
+                "content": "b",
+                "created_at": "2025-06-02T09:00:00+00:00",
+            },
+        )
+        kb_service.store_customer_interaction(
+            "user1", {"type": "inquiry", "timestamp": "2025-06-01T23:59:00"}
+        )
+        kb_service.store_customer_interaction(
+            "user1", {"type": "meeting_request", "timestamp": "2025-06-02T00:00:00"}
+        )
+
+        twitter = kb_service.get_marketing_assets("user1", platform="twitter")
+        assert [a["content"] for a in twitter] == ["a"]
+
+        posts = kb_service.get_marketing_assets("user1", content_type="social_post")
+        assert [a["content"] for a in posts] == ["a", "b"]
+
+        start, end = day_bounds(date(2025, 6, 1))
+        day_assets = kb_service.get_marketing_assets("user1", start=start, end=end)
+        assert [a["content"] for a in day_assets] == ["a"]
+
+        day_interactions = kb_service.get_customer_interactions(
+            "user1", start=start, end=end
+        )
+        assert [i["type"] for i in day_interactions] == ["inquiry"]
+        assert len(kb_service.get_customer_interactions("user1")) == 2
+        assert (
+            len(
+                kb_service.get_customer_interactions(
+                    "user1", interaction_type="inquiry"
+                )
+            )
+            == 1
+        )
+
+
+def test_sqlite_filters_use_indexes():
+    """Test that date range and platform filters are served by an index."""
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        kb_service = SQLiteKnowledgeBaseService(base_storage_path=temp_dir)
+        plan = kb_service._conn.execute(
+            "EXPLAIN QUERY PLAN SELECT body FROM marketing_assets "
+            "WHERE user_id = ? AND platform = ? AND ts >= ? AND ts < ?",
+            ("user1", "twitter", 0, 1),
+        ).fetchall()
+        assert any("USING INDEX" in row[-1] for row in plan)
+        kb_service.close()
+
+
+@pytest.mark.parametrize(
+    "file_service_class", [KnowledgeBaseService, AppendOnlyKnowledgeBaseService]
+)
+def test_sqlite_imports_file_backend_data(file_service_class):
+    """Test that tenants stored by a file backend keep their data in SQLite."""
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        file_service = file_service_class(base_storage_path=temp_dir)
+        file_service.update_business_profile("user1", {"business_name": "Cafe"})
+        file_service.store_marketing_asset("user1", {"content": "Old post"})
+        file_service.store_customer_interaction("user1", {"type": "inquiry"})
+        file_service.store_performance_data("user1", "daily", {"leads": 2})
+
+        kb_service = SQLiteKnowledgeBaseService(base_storage_path=temp_dir)
+        kb_service.store_marketing_asset("user1", {"content": "New post"})
+
+        assert kb_service.get_business_data("user1") == {"business_name": "Cafe"}
+        assert kb_service.get_profile_version("user1") == 1
+        assets = kb_service.get_marketing_assets("user1")
+        assert [a["content"] for a in assets] == ["Old post", "New post"]
+        assert len(kb_service.get_customer_interactions("user1")) == 1
+        assert kb_service.get_performance_data("user1", "daily") == {"leads": 2}
+        kb_service.close()
+
+        # Data written in SQLite is never replaced by the files again
+        reopened = SQLiteKnowledgeBaseService(base_storage_path=temp_dir)
+        reopened.clear_all_data("user1")
+        assert reopened.get_marketing_assets("user1") == []
+        reopened.close()
+        reopened = SQLiteKnowledgeBaseService(base_storage_path=temp_dir)
+        assert reopened.get_marketing_assets("user1") == []
+        reopened.close()
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,115 @@
+#   Copyright 2025 Akshat Deepak Joshi
+
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+
+#       http://www.apache.org/licenses/LICENSE-2.0
+
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+import json
+import tempfile
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+
+from smallbizpal.scripts.migrate_storage import iter_documents, migrate_file
+from smallbizpal.shared.services.append_only_knowledge_base import (
+    AppendOnlyKnowledgeBaseService,
+)
+from smallbizpal.shared.services.knowledge_base import KnowledgeBaseService
+from smallbizpal.shared.services.serializers import (
+    decode_document,
+    detect_format,
+    get_serializer,
+)
+
+FORMATS = ["json", "compact", "msgpack"]
+
+
+def serializer_or_skip(name):
+    """Get a serializer, skipping the test if its optional package is missing."""
+    if name == "msgpack":
+        pytest.importorskip("msgpack")
+    return get_serializer(name)
+
+
+@pytest.mark.parametrize("name", FORMATS)
+def test_serializer_round_trip(name):
+    """Test that each format decodes back to the JSON-compatible document."""
+
+    serializer = serializer_or_skip(name)
+    document = {
+        "created_at": datetime(2025, 6, 1, 10, 30, 15, 123456),
+        "data": {"name": "Cafe", "tags": ["coffee", "bakery"], "seats": 12},
+    }
+
+    decoded = decode_document(serializer.encode(document))
+
+    assert decoded == json.loads(
+        json.dumps(document, default=lambda obj: obj.isoformat())
+    )
+    assert detect_format(serializer.encode(document)) == (
+        "msgpack" if name == "msgpack" else "json"
+    )
+
+
+def test_compact_format_is_smaller():
+    """Test that the compact format drops the indentation of the default one."""
+
+    document = {"records": [{"content": f"post {i}", "n": i} for i in range(50)]}
+
+    pretty = get_serializer("json").encode(document)
+    compact = get_serializer("compact").encode(document)
+
+    assert len(compact) < len(pretty)
+    assert decode_document(compact) == decode_document(pretty)
+
+
+@pytest.mark.parametrize(
+    "service_class", [KnowledgeBaseService, AppendOnlyKnowledgeBaseService]
+)
+@pytest.mark.parametrize("name", FORMATS)
+def test_services_read_files_in_any_format(service_class, name):
+    """Test that a service reads files written in a different format."""
+
+    serializer = serializer_or_skip(name)
+    with tempfile.TemporaryDirectory() as temp_dir:
+        writer = service_class(temp_dir, serializer=serializer)
+        writer.update_business_profile("user1", {"name": "Cafe"})
+        writer.store_marketing_asset("user1", {"platform": "twitter", "content": "a"})
+
+        reader = service_class(temp_dir)
+        assert reader.get_business_data("user1") == {"name": "Cafe"}
+        assert len(reader.get_marketing_assets("user1")) == 1
+
+
+def test_migrate_converts_data_directory_in_place():
+    """Test that the migration rewrites legacy pretty JSON files in place."""
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        kb_service = KnowledgeBaseService(temp_dir)
+        kb_service.update_business_profile("user1", {"name": "Cafe"})
+        kb_service.store_customer_interaction("user2", {"type": "inquiry"})
+
+        serializer = get_serializer("compact")
+        paths = list(iter_documents(Path(temp_dir)))
+        assert {p.parent.name for p in paths} == {"user1", "user2"}
+        for path in paths:
+            before, after = migrate_file(path, serializer)
+            assert after < before
+            assert b"\n" not in path.read_bytes()
+
+        migrated = KnowledgeBaseService(temp_dir)
+        assert migrated.get_business_data("user1") == {"name": "Cafe"}
+        assert len(migrated.get_customer_interactions("user2")) == 1
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -62,8 +62,8 @@ def test_user_specific_storage():
         assert data2["industry"] == "finance"
 
         # Verify files are created in separate directories
-        user1_path = Path(temp_dir) / user1_id / "knowledge_base.json"
-        user2_path = Path(temp_dir) / user2_id / "knowledge_base.json"
+        user1_path = Path(temp_dir) / user1_id / "business_profile.json"
+        user2_path = Path(temp_dir) / user2_id / "business_profile.json"
 
         assert user1_path.exists()
         assert user2_path.exists()
@@ -0,0 +1,157 @@
+#   Copyright 2025 Akshat Deepak Joshi
+
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+
+#       http://www.apache.org/licenses/LICENSE-2.0
+
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+import tempfile
+import time
+from datetime import datetime
+
+import pytest
+
+from smallbizpal.shared.services.append_only_knowledge_base import (
+    AppendOnlyKnowledgeBaseService,
+)
+from smallbizpal.shared.services.knowledge_base import KnowledgeBaseService
+from smallbizpal.shared.services.partitioned_knowledge_base import (
+    PartitionedKnowledgeBaseService,
+)
+from smallbizpal.shared.services.sqlite_knowledge_base import (
+    SQLiteKnowledgeBaseService,
+)
+from smallbizpal.shared.services.write_behind import WriteBehindBuffer
+
+
+def stored_interactions(kb_service, user_id):
+    """Read interactions straight from storage, bypassing the buffer."""
+    return kb_service._query_records(user_id, "customer_interactions", {})
+
+
+@pytest.mark.parametrize(
+    "service_class",
+    [
+        KnowledgeBaseService,
+        AppendOnlyKnowledgeBaseService,
+        PartitionedKnowledgeBaseService,
+        SQLiteKnowledgeBaseService,
+    ],
+)
+def test_reads_see_buffered_writes(service_class):
+    """Test that buffered writes are visible to reads before they are stored."""
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        kb_service = service_class(
+            temp_dir, write_behind=WriteBehindBuffer(flush_interval=60)
+        )
+
+        kb_service.store_customer_interaction(
+            "user1", {"type": "inquiry", "timestamp": "2025-06-01T10:00:00"}
+        )
+        kb_service.store_customer_interaction(
+            "user1", {"type": "meeting_scheduled", "timestamp": "2025-06-02T10:00:00"}
+        )
+        kb_service.store_performance_data("user1", "reach", {"value": 10})
+
+        assert stored_interactions(kb_service, "user1") == []
+        assert len(kb_service.get_customer_interactions("user1")) == 2
+        assert [
+            i["type"]
+            for i in kb_service.get_customer_interactions(
+                "user1", start=datetime(2025, 6, 2)
+            )
+        ] == ["meeting_scheduled"]
+        assert kb_service.get_performance_data("user1", "reach") == {"value": 10}
+
+        kb_service.flush()
+        assert len(stored_interactions(kb_service, "user1")) == 2
+        assert len(kb_service.get_customer_interactions("user1")) == 2
+        assert kb_service.write_behind.size() == 0
+        kb_service.close()
+
+
+def test_flush_on_size_threshold():
+    """Test that a user's buffer is stored as one group once it fills up."""
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        kb_service = KnowledgeBaseService(
+            temp_dir,
+            write_behind=WriteBehindBuffer(max_operations=3, flush_interval=60),
+        )
+
+        for i in range(2):
+            kb_service.store_customer_interaction("user1", {"type": f"t{i}"})
+        assert stored_interactions(kb_service, "user1") == []
+
+        kb_service.store_customer_interaction("user1", {"type": "t2"})
+        assert [i["type"] for i in stored_interactions(kb_service, "user1")] == [
+            "t0",
+            "t1",
+            "t2",
+        ]
+        kb_service.close()
+
+
+def test_background_flush():
+    """Test that the background thread stores buffered writes on its interval."""
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        kb_service = KnowledgeBaseService(
+            temp_dir, write_behind=WriteBehindBuffer(flush_interval=0.05)
+        )
+
+        kb_service.store_customer_interaction("user1", {"type": "inquiry"})
+        deadline = time.monotonic() + 5
+        while not stored_interactions(kb_service, "user1"):
+            assert time.monotonic() < deadline
+            time.sleep(0.01)
+        kb_service.close()
+
+
+def test_profile_update_writes_through_in_order():
+    """Test that a profile update stores buffered writes first, then itself."""
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        kb_service = KnowledgeBaseService(
+            temp_dir, write_behind=WriteBehindBuffer(flush_interval=60)
+        )
+
+        kb_service.store_customer_interaction("user1", {"type": "inquiry"})
+        result = kb_service.update_business_profile("user1", {"name": "Cafe"})
+
+        assert result["status"] == "success"
+        assert kb_service.write_behind.size() == 0
+        assert len(stored_interactions(kb_service, "user1")) == 1
+        assert kb_service._read_section("user1", "business_profile")["data"] == {
+            "name": "Cafe"
+        }
+        kb_service.close()
+
+
+def test_close_flushes_and_clear_discards():
+    """Test that close stores buffered writes and clear_all_data drops them."""
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        kb_service = KnowledgeBaseService(
+            temp_dir, write_behind=WriteBehindBuffer(flush_interval=60)
+        )
+        kb_service.store_customer_interaction("user1", {"type": "inquiry"})
+        kb_service.store_customer_interaction("user2", {"type": "inquiry"})
+        kb_service.clear_all_data("user2")
+        kb_service.close()
+
+        reopened = KnowledgeBaseService(temp_dir)
+        assert len(reopened.get_customer_interactions("user1")) == 1
+        assert reopened.get_customer_interactions("user2") == []
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])